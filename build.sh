@@ -5,6 +5,7 @@ pip install -r requirements.txt
 
 python manage.py collectstatic --noinput
 python manage.py migrate --noinput
+python manage.py classify_ships
 
 # Create/update a superuser without needing shell access
 python << 'PY'
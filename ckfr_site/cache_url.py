@@ -0,0 +1,52 @@
+"""Build a ``CACHES`` entry from a ``CACHE_URL``, like ``dj_database_url``.
+
+* ``""`` or ``locmem://[name]``: per-process memory (development, tests);
+* ``file:///absolute/path``: files shared by the workers of one node;
+* ``redis://``, ``rediss://`` or ``unix://``: Redis, shared by every node
+  (requires the ``redis`` package); several comma-separated URLs make the
+  first one the primary and the others read replicas;
+* ``dummy://``: no caching at all.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+}
+REDIS_SCHEMES = {"redis", "rediss", "unix"}
+
+
+def parse(url: str, *, key_prefix: str = "") -> dict:
+    """Return the ``CACHES`` entry described by ``url``."""
+
+    url = (url or "").strip()
+    scheme = urlsplit(url).scheme if url else "locmem"
+    if scheme in REDIS_SCHEMES:
+        if importlib.util.find_spec("redis") is None:
+            raise ImproperlyConfigured("A redis:// CACHE_URL requires the 'redis' package.")
+        config = {"BACKEND": BACKENDS["redis"], "LOCATION": url.split(",")}
+    elif scheme == "file":
+        path = urlsplit(url).path
+        if not path:
+            raise ImproperlyConfigured("A file:// CACHE_URL needs an absolute directory path.")
+        config = {"BACKEND": BACKENDS["file"], "LOCATION": path}
+    elif scheme == "locmem":
+        config = {"BACKEND": BACKENDS["locmem"], "LOCATION": urlsplit(url).netloc if url else ""}
+    elif scheme == "dummy":
+        config = {"BACKEND": BACKENDS["dummy"]}
+    else:
+        raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme: {scheme!r}.")
+    if key_prefix:
+        config["KEY_PREFIX"] = key_prefix
+    return config
+
+
+__all__ = ["parse"]
@@ -0,0 +1,118 @@
+"""How database connections are reused, selected with ``DB_POOL``.
+
+* ``native``: Django's psycopg connection pool (Postgres with
+  ``psycopg[pool]`` installed). Each gunicorn or uvicorn worker process keeps
+  between ``DB_POOL_MIN_SIZE`` and ``DB_POOL_MAX_SIZE`` connections and waits
+  at most ``DB_POOL_TIMEOUT`` seconds for a free one. Connections are checked
+  before being handed out, so a restarted database costs no failed request.
+  Keep ``workers × DB_POOL_MAX_SIZE`` below the server's ``max_connections``.
+* ``persistent``: one connection per thread, kept for ``DB_CONN_MAX_AGE``
+  seconds and checked with ``CONN_HEALTH_CHECKS`` at the start of each
+  request (psycopg2, SQLite).
+* ``off``: a new connection per request.
+* ``auto`` (default): ``native`` when it is available, else ``persistent``.
+
+``manage.py dbpool_stats`` shows the mode in use and the server's connections.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+
+from django.core.exceptions import ImproperlyConfigured
+
+MODES = {"auto", "native", "persistent", "off"}
+POSTGRES_ENGINES = {"django.db.backends.postgresql", "django.contrib.gis.db.backends.postgis"}
+
+
+def native_pool_available(database: dict) -> bool:
+    """Return whether ``database`` can use Django's psycopg pool."""
+
+    return (
+        database.get("ENGINE") in POSTGRES_ENGINES
+        and importlib.util.find_spec("psycopg") is not None
+        and importlib.util.find_spec("psycopg_pool") is not None
+    )
+
+
+def configure(
+    database: dict,
+    *,
+    mode: str = "auto",
+    conn_max_age: int = 600,
+    min_size: int = 2,
+    max_size: int = 10,
+    timeout: float = 10,
+) -> dict:
+    """Return ``database`` set up for the connection reuse ``mode``."""
+
+    mode = (mode or "auto").strip().lower()
+    if mode not in MODES:
+        raise ImproperlyConfigured(f"Unsupported DB_POOL mode: {mode!r}.")
+    if mode == "auto":
+        mode = "native" if native_pool_available(database) else "persistent"
+    elif mode == "native" and not native_pool_available(database):
+        raise ImproperlyConfigured(
+            "DB_POOL=native requires PostgreSQL and the 'psycopg[pool]' package."
+        )
+
+    database = {**database, "OPTIONS": dict(database.get("OPTIONS") or {})}
+    if mode == "native":
+        database["OPTIONS"]["pool"] = {
+            "min_size": min_size,
+            "max_size": max_size,
+            "timeout": timeout,
+        }
+        # The pool replaces persistent connections; Django rejects both. With
+        # CONN_HEALTH_CHECKS, Django has the pool check connections on checkout.
+        database["CONN_MAX_AGE"] = 0
+        database["CONN_HEALTH_CHECKS"] = True
+    elif mode == "persistent":
+        database["CONN_MAX_AGE"] = conn_max_age
+        database["CONN_HEALTH_CHECKS"] = True
+    else:
+        database["CONN_MAX_AGE"] = 0
+        database["CONN_HEALTH_CHECKS"] = False
+    return database
+
+
+def pool_mode(settings_dict: dict) -> str:
+    """Return the mode a configured database ended up in."""
+
+    if settings_dict.get("OPTIONS", {}).get("pool"):
+        return "native"
+    return "persistent" if settings_dict.get("CONN_MAX_AGE") else "off"
+
+
+def pool_stats(connection) -> dict:
+    """Return the settings and live counters of one database connection.
+
+    ``pool`` holds the psycopg pool counters of this process in native mode.
+    ``server`` counts the connections to the database by state, across every
+    process, on Postgres.
+    """
+
+    settings_dict = connection.settings_dict
+    stats = {
+        "alias": connection.alias,
+        "vendor": connection.vendor,
+        "mode": pool_mode(settings_dict),
+        "conn_max_age": settings_dict.get("CONN_MAX_AGE"),
+        "health_checks": bool(settings_dict.get("CONN_HEALTH_CHECKS")),
+        "pool": None,
+        "server": None,
+    }
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        stats["pool"] = dict(pool.get_stats())
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity"
+                " WHERE datname = current_database() GROUP BY 1 ORDER BY 1"
+            )
+            stats["server"] = dict(cursor.fetchall())
+    return stats
+
+
+__all__ = ["configure", "native_pool_available", "pool_mode", "pool_stats"]
@@ -0,0 +1,83 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from ckfr_site.models import UserSession
+from ckfr_site.session_store import session_user_id
+
+
+class Command(BaseCommand):
+    help = (
+        "Move active django.contrib.sessions rows into the user-indexed session "
+        "table and fill the user id of indexed sessions that lack one. "
+        "Migration ckfr_site 0002 already moved them once; this is for rows "
+        "written by an older release since."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        now = timezone.now()
+
+        copied = 0
+        legacy = Session.objects.filter(expire_date__gt=now).order_by("session_key")
+        while batch := list(legacy[:batch_size]):
+            copied += self._move(batch)
+
+        indexed = 0
+        batch = []
+        missing = UserSession.objects.filter(user_id__isnull=True, expire_date__gt=now)
+        for session in missing.iterator(chunk_size=batch_size):
+            session.user_id = session_user_id(session.get_decoded())
+            if session.user_id is not None:
+                batch.append(session)
+            if len(batch) >= batch_size:
+                indexed += self._update(batch)
+                batch = []
+        indexed += self._update(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{copied} session(s) copied, {indexed} session(s) indexed."
+            )
+        )
+
+    @staticmethod
+    def _move(batch) -> int:
+        """Copy the sessions not indexed yet, drop the batch from django_session.
+
+        The legacy rows are deleted so that a later run cannot bring back a
+        session ended by a logout or by the single-session rule.
+        """
+
+        keys = [session.session_key for session in batch]
+        with transaction.atomic():
+            existing = set(
+                UserSession.objects.filter(session_key__in=keys).values_list(
+                    "session_key", flat=True
+                )
+            )
+            new = [
+                UserSession(
+                    session_key=session.session_key,
+                    session_data=session.session_data,
+                    expire_date=session.expire_date,
+                    user_id=session_user_id(session.get_decoded()),
+                )
+                for session in batch
+                if session.session_key not in existing
+            ]
+            UserSession.objects.bulk_create(new)
+            Session.objects.filter(session_key__in=keys).delete()
+        return len(new)
+
+    @staticmethod
+    def _update(batch) -> int:
+        if not batch:
+            return 0
+        with transaction.atomic():
+            UserSession.objects.bulk_update(batch, ["user_id"])
+        return len(batch)
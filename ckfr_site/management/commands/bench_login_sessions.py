@@ -0,0 +1,82 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.sessions.backends.db import SessionStore as LegacySessionStore
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ckfr_site.models import UserSession
+from ckfr_site.session_management import _terminate_by_scan, terminate_previous_sessions
+from ckfr_site.session_store import SessionStore
+from ops.benchmarks import measure, rolled_back
+
+CURRENT_KEY = "benchcurrentsessionkey"
+TARGET_SESSIONS = 3
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark single-session enforcement on login with the user-indexed "
+        "session table and with the legacy decode-every-session scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000, 50000])
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument(
+            "--skip-scan",
+            action="store_true",
+            help="Only time the indexed lookup.",
+        )
+
+    def handle(self, *args, **options):
+        user_count = max(options["users"], 2)
+        self.stdout.write(f"{'sessions':>9} {'mode':>8} {'ms':>10} {'queries':>8}")
+        for session_count in options["sessions"]:
+            with rolled_back():
+                self._seed(session_count, user_count)
+                # The user logging in owns a fixed number of old sessions.
+                user = SimpleNamespace(pk=user_count + 1)
+                request = SimpleNamespace(session=SessionStore(session_key=CURRENT_KEY))
+                runs = [
+                    (
+                        "indexed",
+                        lambda: terminate_previous_sessions(None, request=request, user=user),
+                    )
+                ]
+                if not options["skip_scan"]:
+                    runs.append(("scan", lambda: _terminate_by_scan(user, CURRENT_KEY)))
+                for mode, func in runs:
+                    result = measure(func)
+                    self.stdout.write(
+                        f"{session_count:>9} {mode:>8} {result['ms']:>10.1f} {result['queries']:>8}"
+                    )
+
+    @staticmethod
+    def _seed(session_count, user_count):
+        expire_date = timezone.now() + timedelta(days=1)
+        encoded = {
+            user_id: LegacySessionStore().encode({"_auth_user_id": str(user_id)})
+            for user_id in range(1, user_count + 1)
+        }
+        indexed, legacy = [], []
+        encoded[user_count + 1] = LegacySessionStore().encode(
+            {"_auth_user_id": str(user_count + 1)}
+        )
+        for number in range(session_count):
+            user_id = user_count + 1 if number < TARGET_SESSIONS else number % user_count + 1
+            key = f"bench{number:020d}"
+            indexed.append(
+                UserSession(
+                    session_key=key,
+                    session_data=encoded[user_id],
+                    expire_date=expire_date,
+                    user_id=user_id,
+                )
+            )
+            legacy.append(
+                Session(session_key=key, session_data=encoded[user_id], expire_date=expire_date)
+            )
+        UserSession.objects.bulk_create(indexed, batch_size=2000)
+        Session.objects.bulk_create(legacy, batch_size=2000)
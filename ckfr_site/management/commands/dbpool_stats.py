@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ckfr_site.db_pool import pool_stats
+
+
+class Command(BaseCommand):
+    help = "Show how database connections are reused (see DB_POOL) and the server's connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", action="append", help="Only show these aliases.")
+        parser.add_argument("--json", action="store_true", help="Print the raw figures as JSON.")
+
+    def handle(self, *args, **options):
+        report = [pool_stats(connections[alias]) for alias in options["database"] or connections]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for stats in report:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{stats['alias']} ({stats['vendor']})"))
+            self.stdout.write(f"  mode: {stats['mode']}")
+            if stats["mode"] == "persistent":
+                self.stdout.write(
+                    f"  max age: {stats['conn_max_age']} s, "
+                    f"health checks: {'on' if stats['health_checks'] else 'off'}"
+                )
+            if stats["pool"] is not None:
+                self.stdout.write("  pool (this process):")
+                for name, value in sorted(stats["pool"].items()):
+                    self.stdout.write(f"    {name}: {value}")
+            if stats["server"] is not None:
+                total = sum(stats["server"].values())
+                self.stdout.write(f"  server connections: {total}")
+                for state, count in stats["server"].items():
+                    self.stdout.write(f"    {state}: {count}")
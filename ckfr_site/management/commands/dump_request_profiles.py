@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ckfr_site import profiling
+
+
+class Command(BaseCommand):
+    help = "Print the slowest profiled requests per URL name (see REQUEST_PROFILING)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url-name", action="append", help="Only show these URL names.")
+        parser.add_argument("--json", action="store_true", help="Print the raw entries as JSON.")
+        parser.add_argument("--clear", action="store_true", help="Empty the buffers after dumping.")
+
+    def handle(self, *args, **options):
+        if not profiling.buffer_is_shared():
+            raise CommandError(
+                "The profiles are kept in the default cache, which is local to each "
+                "process: this command cannot see them. Set CACHE_URL to a file:// or "
+                "redis:// cache, or use the profiling report page."
+            )
+        report = profiling.slowest_requests()
+        if options["url_name"]:
+            report = {name: report.get(name, []) for name in options["url_name"]}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for name, entries in report.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                for entry in entries:
+                    self.stdout.write(
+                        f"  {entry['total_ms']:>9.1f} ms  db {entry['db_ms']:>8.1f} ms  "
+                        f"tpl {entry['template_ms']:>8.1f} ms  {entry['queries']:>4} q  "
+                        f"{entry['method']} {entry['path']} ({entry['status']})"
+                    )
+                    for duplicate in entry["duplicates"]:
+                        self.stdout.write(
+                            f"      ×{duplicate['count']} {duplicate['origin'] or '?'}: {duplicate['sql'][:120]}"
+                        )
+            if not report:
+                self.stdout.write("No profiled request.")
+
+        if options["clear"]:
+            profiling.clear()
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ckfr_site.template_cache import project_template_names, warm_up
+
+
+class Command(BaseCommand):
+    help = "Compile every project template once and report those that fail to parse."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        errors = warm_up()
+        elapsed = (time.perf_counter() - started) * 1000
+        for name, message in errors.items():
+            self.stdout.write(self.style.WARNING(f"{name}: {message.splitlines()[0]}"))
+        compiled = len(project_template_names()) - len(errors)
+        self.stdout.write(self.style.SUCCESS(f"{compiled} template(s) compiled in {elapsed:.1f} ms."))
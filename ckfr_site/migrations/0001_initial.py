@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="UserSession",
+            fields=[
+                (
+                    "session_key",
+                    models.CharField(
+                        max_length=40,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="session key",
+                    ),
+                ),
+                ("session_data", models.TextField(verbose_name="session data")),
+                (
+                    "expire_date",
+                    models.DateTimeField(db_index=True, verbose_name="expire date"),
+                ),
+                (
+                    "user_id",
+                    models.IntegerField(
+                        db_index=True, null=True, verbose_name="Utilisateur"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Session utilisateur",
+                "verbose_name_plural": "Sessions utilisateur",
+                "abstract": False,
+            },
+        ),
+    ]
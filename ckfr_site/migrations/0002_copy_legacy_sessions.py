@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core import signing
+from django.db import migrations
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+BATCH_SIZE = 1000
+# Salt of django.contrib.sessions.backends.db.SessionStore payloads.
+SESSION_SALT = "django.contrib.sessions.SessionStore"
+
+
+def session_user_id(session_data):
+    try:
+        data = signing.loads(
+            session_data,
+            salt=SESSION_SALT,
+            serializer=import_string(settings.SESSION_SERIALIZER),
+        )
+        return int(data.get("_auth_user_id"))
+    except Exception:
+        return None
+
+
+def copy_legacy_sessions(apps, schema_editor):
+    """Move the active django_session rows to the user-indexed table, once."""
+
+    Session = apps.get_model("sessions", "Session")
+    UserSession = apps.get_model("ckfr_site", "UserSession")
+    legacy = Session.objects.filter(expire_date__gt=timezone.now())
+    while True:
+        batch = list(legacy.order_by("session_key")[:BATCH_SIZE])
+        if not batch:
+            break
+        keys = [session.session_key for session in batch]
+        existing = set(
+            UserSession.objects.filter(session_key__in=keys).values_list("session_key", flat=True)
+        )
+        UserSession.objects.bulk_create(
+            [
+                UserSession(
+                    session_key=session.session_key,
+                    session_data=session.session_data,
+                    expire_date=session.expire_date,
+                    user_id=session_user_id(session.session_data),
+                )
+                for session in batch
+                if session.session_key not in existing
+            ],
+            ignore_conflicts=True,
+        )
+        Session.objects.filter(session_key__in=keys).delete()
+    # Expired legacy rows are never read again.
+    Session.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ckfr_site", "0001_initial"),
+        ("sessions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_legacy_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+"""Database models owned by the project package."""
+
+from django.contrib.sessions.base_session import AbstractBaseSession
+from django.db import models
+
+
+class UserSession(AbstractBaseSession):
+    """Database session recording its owner in an indexed column.
+
+    Storing the authenticated user id next to the encoded payload lets the
+    single-session policy find a user's other sessions with one indexed
+    query instead of decoding every active session.
+    """
+
+    user_id = models.IntegerField("Utilisateur", null=True, db_index=True)
+
+    class Meta(AbstractBaseSession.Meta):
+        verbose_name = "Session utilisateur"
+        verbose_name_plural = "Sessions utilisateur"
+
+    @classmethod
+    def get_session_store_class(cls):
+        from .session_store import SessionStore
+
+        return SessionStore
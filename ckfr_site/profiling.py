@@ -0,0 +1,223 @@
+"""Opt-in per-request SQL and template profiling.
+
+``RequestProfilingMiddleware`` is listed in ``MIDDLEWARE`` but removes itself
+from the handler chain at startup unless ``REQUEST_PROFILING`` is enabled, so
+a disabled profiler costs nothing per request. When enabled, every request
+records its query count, duplicated queries with the project line that issued
+them, database time, template render time and total time. The slowest
+requests of each URL name are kept in a bounded buffer stored in the cache,
+so the report page and ``dump_request_profiles`` see every worker sharing
+that cache.
+
+With the default local-memory cache (``CACHE_URL`` unset) the buffer lives
+in each worker: the report page only shows the requests of the worker that
+serves it, and ``dump_request_profiles``, which runs in a process of its
+own, refuses to run. Point ``CACHE_URL`` at a ``file://`` or ``redis://``
+cache to profile several workers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+CACHE_PREFIX = "ckfr:profiling"
+UNNAMED = "(sans nom)"
+
+_current: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+_lock = threading.Lock()
+_template_patched = False
+
+
+class RequestProfile:
+    """Measurements collected while one request is being handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.templates: list[str] = []
+        self._sql_counts: dict[str, int] = {}
+        self._origins: dict[str, str] = {}
+        self._rendering = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            seen = self._sql_counts.get(sql, 0) + 1
+            self._sql_counts[sql] = seen
+            if seen == 2:
+                # Only duplicated statements pay for a stack walk.
+                self._origins[sql] = _project_origin()
+
+    def as_dict(self, request, response) -> dict:
+        match = getattr(request, "resolver_match", None)
+        duplicates = sorted(
+            (
+                {"sql": sql, "count": count, "origin": self._origins.get(sql, "")}
+                for sql, count in self._sql_counts.items()
+                if count > 1
+            ),
+            key=lambda item: -item["count"],
+        )
+        return {
+            "url_name": (match.url_name if match else None) or UNNAMED,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "at": timezone.now().isoformat(timespec="seconds"),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "queries": self.queries,
+            "template_ms": round(self.template_seconds * 1000, 2),
+            "templates": self.templates,
+            "duplicates": duplicates,
+        }
+
+
+def _project_origin() -> str:
+    """Return the innermost project frame outside Django and this module."""
+
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = frame.filename
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and not filename.endswith("profiling.py")
+        ):
+            return f"{filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}"
+    return ""
+
+
+def _patch_template_render() -> None:
+    """Time top-level template renders of the Django backend.
+
+    ``django.test.signals.template_rendered`` is only sent under the test
+    runner, so the backend ``Template.render`` is wrapped instead. Includes
+    go through ``django.template.base.Template`` and are counted within
+    their parent render.
+    """
+
+    global _template_patched
+    if _template_patched:
+        return
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    @wraps(original)
+    def render(self, *args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return original(self, *args, **kwargs)
+        profile.templates.append(self.origin.template_name or str(self.origin))
+        profile._rendering += 1
+        started = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            profile._rendering -= 1
+            if not profile._rendering:
+                profile.template_seconds += time.perf_counter() - started
+
+    Template.render = render
+    _template_patched = True
+
+
+def buffer_is_shared() -> bool:
+    """Return whether other processes can read the buffer."""
+
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _entries_key(name: str) -> str:
+    # URL names are labels, such as UNNAMED, that may hold characters cache
+    # backends reject in keys; the key uses a digest of the name instead.
+    return f"{CACHE_PREFIX}:{hashlib.sha256(name.encode()).hexdigest()[:32]}"
+
+
+def record(entry: dict) -> None:
+    """Keep ``entry`` if it is among the slowest requests of its URL name.
+
+    Concurrent workers may occasionally drop each other's entries; the buffer
+    is a diagnostic aid, not an audit log.
+    """
+
+    size = getattr(settings, "REQUEST_PROFILING_BUFFER", 20)
+    name = entry["url_name"]
+    key = _entries_key(name)
+    with _lock:
+        entries = cache.get(key) or []
+        if len(entries) >= size and entry["total_ms"] <= entries[-1]["total_ms"]:
+            return
+        entries = sorted([*entries, entry], key=lambda item: -item["total_ms"])[:size]
+        cache.set(key, entries, None)
+        names = cache.get(f"{CACHE_PREFIX}:names") or []
+        if name not in names:
+            cache.set(f"{CACHE_PREFIX}:names", sorted([*names, name]), None)
+
+
+def slowest_requests() -> dict[str, list[dict]]:
+    """Return the buffered requests per URL name, slowest first."""
+
+    names = cache.get(f"{CACHE_PREFIX}:names") or []
+    return {name: cache.get(_entries_key(name)) or [] for name in names}
+
+
+def clear() -> None:
+    """Drop every buffered request."""
+
+    names = cache.get(f"{CACHE_PREFIX}:names") or []
+    cache.delete_many([_entries_key(name) for name in names] + [f"{CACHE_PREFIX}:names"])
+
+
+class RequestProfilingMiddleware:
+    """Profile requests when ``settings.REQUEST_PROFILING`` is enabled."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _patch_template_render()
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(profile.as_dict(request, response))
+        return response
+
+
+__all__ = [
+    "RequestProfile",
+    "RequestProfilingMiddleware",
+    "buffer_is_shared",
+    "clear",
+    "record",
+    "slowest_requests",
+]
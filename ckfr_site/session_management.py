@@ -7,15 +7,36 @@ from django.contrib.sessions.models import Session
 from django.dispatch import receiver
 from django.utils import timezone
 
+from .models import UserSession
+
 
 @receiver(user_logged_in)
 def terminate_previous_sessions(sender, request, user, **kwargs):
     """Ensure a user only has one active session at a time."""
 
-    current_session_key = getattr(getattr(request, "session", None), "session_key", None)
+    session = getattr(request, "session", None)
+    current_session_key = getattr(session, "session_key", None)
     if current_session_key is None:
         return
 
+    get_model_class = getattr(session, "get_model_class", None)
+    if get_model_class is not None and get_model_class() is UserSession:
+        UserSession.objects.filter(user_id=user.pk).exclude(
+            session_key=current_session_key
+        ).delete()
+        return
+
+    _terminate_by_scan(user, current_session_key)
+
+
+def _terminate_by_scan(user, current_session_key):
+    """Fallback for session engines without a user index.
+
+    Decodes every active ``django.contrib.sessions`` row, so the cost grows with
+    the number of sessions; only used when ``SESSION_ENGINE`` is not
+    ``ckfr_site.session_store``.
+    """
+
     user_id = str(user.pk)
     active_sessions = Session.objects.filter(expire_date__gte=timezone.now()).exclude(
         session_key=current_session_key
@@ -24,4 +45,4 @@ def terminate_previous_sessions(sender, request, user, **kwargs):
     for session in active_sessions:
         data = session.get_decoded()
         if data.get("_auth_user_id") == user_id:
-            session.delete()
\ No newline at end of file
+            session.delete()
@@ -0,0 +1,35 @@
+"""Database session engine indexing sessions by authenticated user."""
+
+from __future__ import annotations
+
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+
+def session_user_id(data) -> int | None:
+    """Return the authenticated user id stored in decoded session data."""
+
+    try:
+        return int(data.get(SESSION_KEY))
+    except (TypeError, ValueError):
+        return None
+
+
+class SessionStore(DBStore):
+    """``SESSION_ENGINE`` backed by :class:`ckfr_site.models.UserSession`."""
+
+    @classmethod
+    def get_model_class(cls):
+        from .models import UserSession
+
+        return UserSession
+
+    def create_model_instance(self, data):
+        obj = super().create_model_instance(data)
+        obj.user_id = session_user_id(data)
+        return obj
+
+    async def acreate_model_instance(self, data):
+        obj = await super().acreate_model_instance(data)
+        obj.user_id = session_user_id(data)
+        return obj
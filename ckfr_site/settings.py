@@ -1,8 +1,11 @@
 import os
+import sys
 from pathlib import Path
 
 import dj_database_url
 
+from ckfr_site import cache_url, db_pool
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-only")
@@ -45,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "ckfr_site.profiling.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -57,12 +61,27 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "ckfr_site.urls"
 
+# Templates are compiled once per process by the cached loader, whatever DEBUG
+# is. TEMPLATE_CACHE=0 re-reads them on every render instead; TEMPLATE_WARMUP
+# compiles every project template when the WSGI/ASGI application starts
+# (ckfr_site.template_cache).
+TEMPLATE_CACHE = os.getenv("TEMPLATE_CACHE", "1") != "0"
+TEMPLATE_WARMUP = os.getenv("TEMPLATE_WARMUP", "0" if DEBUG else "1") == "1"
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": (
+                [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE
+                else TEMPLATE_LOADERS
+            ),
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -76,21 +95,49 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "ckfr_site.wsgi.application"
 
-# DB: SQLite locally, Postgres on Render via DATABASE_URL
+# DB: SQLite locally, Postgres on Render via DATABASE_URL. DB_POOL picks how
+# connections are reused (auto, native, persistent or off); see
+# ckfr_site.db_pool for the modes and their sizing.
 DATABASES = {
-    "default": dj_database_url.config(
-        default=f"sqlite:///{BASE_DIR/'db.sqlite3'}",
-        conn_max_age=600, ssl_require=False
+    "default": db_pool.configure(
+        dj_database_url.config(
+            default=f"sqlite:///{BASE_DIR/'db.sqlite3'}",
+            ssl_require=False
+        ),
+        mode=os.getenv("DB_POOL", "auto"),
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    )
+}
+
+# Cache: per-process memory by default; see ckfr_site.cache_url for the
+# file:// (one node, several workers) and redis:// (several nodes) forms.
+CACHES = {
+    "default": cache_url.parse(
+        os.getenv("CACHE_URL", ""), key_prefix=os.getenv("CACHE_KEY_PREFIX", "ckfr")
     )
 }
 
-# Static files (WhiteNoise)
+# Sessions are stored with their user id so single-session enforcement can
+# use an index (run ``manage.py backfill_user_sessions`` after switching).
+SESSION_ENGINE = "ckfr_site.session_store"
+
+# Static files (WhiteNoise): collectstatic minifies the project's JS and CSS
+# bundles, fingerprints and precompresses them; see ckfr_site.static_bundles.
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# The manifest storage fails loudly on a file missing from the manifest. Test
+# runs have no collectstatic and use the source names, as DEBUG does.
 STORAGES = {
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
-    }
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if sys.argv[1:2] == ["test"]
+            else "ckfr_site.static_bundles.MinifiedManifestStaticFilesStorage"
+        ),
+    },
 }
 
 # Auth redirects
@@ -120,4 +167,36 @@ TIME_ZONE = "Europe/Paris"
 USE_I18N = True
 USE_TZ = True
 
-LOGOUT_REDIRECT_URL = "/"
\ No newline at end of file
+LOGOUT_REDIRECT_URL = "/"
+
+# Seconds the group names used by ops.permissions stay cached between
+# requests (0 keeps them for the current request only).
+OPS_PERMISSION_CACHE_TIMEOUT = int(os.getenv("OPS_PERMISSION_CACHE_TIMEOUT", "0"))
+
+# Seconds the ship picker options stay cached. Changes drop them at once in
+# the cache they were made through; with a per-process cache, other workers
+# keep their copy up to this long (0 disables the cache).
+OPS_SHIP_CHOICES_CACHE_TIMEOUT = int(os.getenv("OPS_SHIP_CHOICES_CACHE_TIMEOUT", "300"))
+
+# Seconds the assignable user list stays cached, with the same limits.
+OPS_USER_CHOICES_CACHE_TIMEOUT = int(os.getenv("OPS_USER_CHOICES_CACHE_TIMEOUT", "300"))
+
+# Seconds the rendered operation block of the overview page stays cached
+# (0 disables the cache).
+OPS_OVERVIEW_CACHE_TIMEOUT = int(os.getenv("OPS_OVERVIEW_CACHE_TIMEOUT", "300"))
+
+# Seconds a member's "Mes places" list stays cached (0 disables the cache).
+OPS_ASSIGNMENTS_CACHE_TIMEOUT = int(os.getenv("OPS_ASSIGNMENTS_CACHE_TIMEOUT", "300"))
+
+# Per-request SQL/template profiling (ckfr_site.profiling). The middleware
+# removes itself at startup unless REQUEST_PROFILING is set to 1/true/yes.
+# dump_request_profiles needs a cache shared between processes (CACHE_URL).
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "").lower() in {"1", "true", "yes"}
+REQUEST_PROFILING_BUFFER = int(os.getenv("REQUEST_PROFILING_BUFFER", "20"))
+
+# Live allocation events (ops.live). Empty keeps the in-process broker, which
+# only reaches streams served by the same worker; a redis:// URL relays events
+# between workers (requires the redis package).
+OPS_LIVE_BROKER_URL = os.getenv("OPS_LIVE_BROKER_URL", "")
+OPS_LIVE_HEARTBEAT = int(os.getenv("OPS_LIVE_HEARTBEAT", "15"))
+OPS_LIVE_QUEUE_SIZE = int(os.getenv("OPS_LIVE_QUEUE_SIZE", "100"))
@@ -0,0 +1,56 @@
+"""Compile the project templates ahead of the first request.
+
+With the cached loader (``settings.TEMPLATE_CACHE``) every template is parsed
+once per process, on the first render that needs it. ``warm_up`` moves that
+cost to startup by compiling every template found in the ``DIRS`` of the
+Django engine, includes and script partials alike, so the first visitor of a
+heavy page such as ``ships_allocation`` does not pay for the parse.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+
+TEMPLATE_SUFFIXES = (".html", ".txt")
+
+
+def _engine(using: str = "django"):
+    return engines[using].engine
+
+
+def project_template_names(using: str = "django") -> list[str]:
+    """Return the names of the templates stored in the engine's ``DIRS``."""
+
+    names = set()
+    for directory in _engine(using).dirs:
+        root = Path(directory)
+        for path in root.rglob("*"):
+            if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                names.add(path.relative_to(root).as_posix())
+    return sorted(names)
+
+
+def warm_up(using: str = "django") -> dict[str, str]:
+    """Compile every project template; return ``{name: error}`` for failures."""
+
+    engine = _engine(using)
+    errors = {}
+    for name in project_template_names(using):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as exc:
+            errors[name] = str(exc)
+    return errors
+
+
+def reset(using: str = "django") -> None:
+    """Drop the compiled templates kept by the cached loader."""
+
+    for loader in _engine(using).template_loaders:
+        if hasattr(loader, "reset"):
+            loader.reset()
+
+
+__all__ = ["project_template_names", "reset", "warm_up"]
@@ -16,6 +16,7 @@ urlpatterns = [
         name="login",
     ),
     path("logout/", views.logout_and_redirect, name="logout"),
+    path("debug/profiling/", views.profiling_report, name="profiling_report"),
     path("admin/", admin.site.urls),
     path("", include("ops.urls")),
 ]
\ No newline at end of file
@@ -1,11 +1,30 @@
 from django.conf import settings
+from django.contrib.auth import decorators as auth_decorators
 from django.contrib.auth import logout
-from django.shortcuts import redirect
+from django.shortcuts import redirect, render
 from django.views.decorators.http import require_http_methods
 
+from ops.permissions import can_manage_ops
+
+from . import profiling
+
 
 @require_http_methods(["GET", "HEAD", "POST"])
 def logout_and_redirect(request):
     """Log the user out and send them back to the login page."""
     logout(request)
-    return redirect(settings.LOGOUT_REDIRECT_URL)
\ No newline at end of file
+    return redirect(settings.LOGOUT_REDIRECT_URL)
+
+
+@auth_decorators.login_required
+@auth_decorators.user_passes_test(can_manage_ops)
+def profiling_report(request):
+    """List the slowest profiled requests per URL name."""
+    if request.method == "POST":
+        profiling.clear()
+        return redirect("profiling_report")
+    context = {
+        "enabled": settings.REQUEST_PROFILING,
+        "report": profiling.slowest_requests(),
+    }
+    return render(request, "profiling_report.html", context)
@@ -4,3 +4,6 @@ class OpsConfig(AppConfig):
     name = "ops"
     def ready(self):
         from . import signals  # noqa
+        from .utils import resolve_username_lookup
+        # USERNAME_FIELD is resolved once instead of on every user list
+        resolve_username_lookup()
@@ -0,0 +1,295 @@
+"""Automatic crewing of an operation's highlighted ships.
+
+The open seats of the highlighted ships are matched against a pool of users
+with a maximum-flow solver. Seats of the same role on the same ship are
+interchangeable, and so are users with the same role preferences, so the
+network has one node per (ship, role) and one per preference set instead of
+one per seat and user. This keeps a 1k seats × 500 users fleet to a few
+hundred nodes.
+
+The solver runs in two phases on the same residual network. The first phase
+caps every ship at the seats still missing to reach its ``min_crew``. The
+second phase raises each cap to the room left below ``max_crew`` and keeps
+augmenting. Augmenting paths never lower the flow into the sink, so every seat
+won in the first phase stays filled and minimum crews come first.
+
+Users who list role preferences are only seated in those roles, matched
+case-insensitively. Users without preferences fill any role. The default
+pool is every active user, in picker order; users already seated on one of
+the highlighted ships are left out of it.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Iterable, Mapping, Sequence
+
+from .models import Operation, RoleSlot, Ship
+from .utils import get_ordered_user_queryset
+
+AUTOFILL_STATUS = "assigned"
+
+
+class _FlowNetwork:
+    """Dinic's maximum flow over integer capacities.
+
+    Edges are stored in pairs, so ``edge ^ 1`` is the reverse of ``edge``.
+    """
+
+    def __init__(self, size: int):
+        self.heads: list[int] = []
+        self.capacities: list[int] = []
+        self.adjacency: list[list[int]] = [[] for _ in range(size)]
+
+    def add_edge(self, tail: int, head: int, capacity: int) -> int:
+        edge = len(self.heads)
+        self.heads += [head, tail]
+        self.capacities += [capacity, 0]
+        self.adjacency[tail].append(edge)
+        self.adjacency[head].append(edge + 1)
+        return edge
+
+    def flow(self, edge: int) -> int:
+        return self.capacities[edge ^ 1]
+
+    def _levels(self, source: int, sink: int) -> list[int]:
+        levels = [-1] * len(self.adjacency)
+        levels[source] = 0
+        frontier = [source]
+        while frontier and levels[sink] < 0:
+            following = []
+            for node in frontier:
+                for edge in self.adjacency[node]:
+                    head = self.heads[edge]
+                    if self.capacities[edge] and levels[head] < 0:
+                        levels[head] = levels[node] + 1
+                        following.append(head)
+            frontier = following
+        return levels
+
+    def _push(self, source: int, sink: int, levels: list[int], pointers: list[int]) -> int:
+        """Push flow along one path of the level graph; 0 once it is blocked."""
+
+        path: list[int] = []
+        node = source
+        while node != sink:
+            adjacency = self.adjacency[node]
+            while pointers[node] < len(adjacency):
+                edge = adjacency[pointers[node]]
+                if self.capacities[edge] and levels[self.heads[edge]] == levels[node] + 1:
+                    break
+                pointers[node] += 1
+            else:
+                if not path:
+                    return 0
+                # Dead end: drop the node from this phase and step back.
+                levels[node] = -1
+                node = self.heads[path.pop() ^ 1]
+                pointers[node] += 1
+                continue
+            path.append(edge)
+            node = self.heads[edge]
+        pushed = min(self.capacities[edge] for edge in path)
+        for edge in path:
+            self.capacities[edge] -= pushed
+            self.capacities[edge ^ 1] += pushed
+        return pushed
+
+    def max_flow(self, source: int, sink: int) -> int:
+        total = 0
+        while True:
+            levels = self._levels(source, sink)
+            if levels[sink] < 0:
+                return total
+            pointers = [0] * len(self.adjacency)
+            while pushed := self._push(source, sink, levels, pointers):
+                total += pushed
+
+
+def solve(
+    ships: Sequence[tuple[int, int, int]],
+    slots: Sequence[tuple[int, int, str]],
+    users: Sequence[int],
+    preferences: Mapping[int, Iterable[str]] | None = None,
+) -> dict[int, int]:
+    """Match open seats to users and return ``{slot_id: user_id}``.
+
+    ``ships`` holds ``(ship_id, required, capacity)``: the seats to fill
+    first for ``min_crew`` and the most seats to fill in total. ``slots``
+    holds the open ``(slot_id, ship_id, role_name)`` in the order they should
+    be filled within each role.
+    """
+
+    preferences = preferences or {}
+    groups: dict[frozenset[str] | None, list[int]] = defaultdict(list)
+    for user_id in users:
+        roles = {role.strip().lower() for role in preferences.get(user_id, ()) if role.strip()}
+        groups[frozenset(roles) if roles else None].append(user_id)
+
+    seats: dict[tuple[int, str], list[int]] = defaultdict(list)
+    for slot_id, ship_id, role_name in slots:
+        seats[(ship_id, role_name)].append(slot_id)
+
+    group_keys = list(groups)
+    seat_keys = list(seats)
+    ship_ids = [ship_id for ship_id, _required, _capacity in ships]
+    source, sink = 0, 1
+    group_node = {key: 2 + position for position, key in enumerate(group_keys)}
+    seat_node = {key: 2 + len(group_keys) + position for position, key in enumerate(seat_keys)}
+    ship_node = {
+        ship_id: 2 + len(group_keys) + len(seat_keys) + position
+        for position, ship_id in enumerate(ship_ids)
+    }
+    network = _FlowNetwork(2 + len(group_keys) + len(seat_keys) + len(ship_ids))
+
+    for key in group_keys:
+        network.add_edge(source, group_node[key], len(groups[key]))
+    seats_by_role: dict[str, list[tuple[int, str]]] = defaultdict(list)
+    for key in seat_keys:
+        seats_by_role[key[1].strip().lower()].append(key)
+        network.add_edge(seat_node[key], ship_node[key[0]], len(seats[key]))
+    group_edges: list[tuple[int, frozenset[str] | None, tuple[int, str]]] = []
+    for key in group_keys:
+        if key is None:
+            reachable = seat_keys
+        else:
+            reachable = [seat for role in sorted(key) for seat in seats_by_role.get(role, ())]
+        for seat in reachable:
+            edge = network.add_edge(group_node[key], seat_node[seat], len(groups[key]))
+            group_edges.append((edge, key, seat))
+
+    sink_edges = {
+        ship_id: network.add_edge(ship_node[ship_id], sink, min(required, capacity))
+        for ship_id, required, capacity in ships
+    }
+    network.max_flow(source, sink)
+    for ship_id, required, capacity in ships:
+        network.capacities[sink_edges[ship_id]] += max(capacity - required, 0)
+    network.max_flow(source, sink)
+
+    # Hand out users in pool order and seats in slot order.
+    pools = {key: members[::-1] for key, members in groups.items()}
+    free_seats = {key: slot_ids[::-1] for key, slot_ids in seats.items()}
+    assignments: dict[int, int] = {}
+    for edge, key, seat in group_edges:
+        for _ in range(network.flow(edge)):
+            assignments[free_seats[seat].pop()] = pools[key].pop()
+    return assignments
+
+
+class AutofillPlan:
+    """Seats of an operation's highlighted ships to hand to a pool of users."""
+
+    def __init__(
+        self,
+        operation: Operation,
+        users: Iterable | None = None,
+        *,
+        preferences: Mapping[int, Iterable[str]] | None = None,
+    ):
+        self.operation = operation
+        self.ships = list(
+            Ship.objects.filter(highlighted_operation_links__operation=operation)
+            .only(
+                "pk",
+                "name",
+                "min_crew",
+                "max_crew",
+                "seats_total",
+                "seats_assigned",
+                "seats_confirmed",
+            )
+            .order_by("name")
+        )
+        ship_ids = [ship.pk for ship in self.ships]
+        self.open_slots = {
+            slot.pk: slot
+            for slot in RoleSlot.objects.filter(
+                ship_id__in=ship_ids, status="open", user__isnull=True
+            )
+            .only("pk", "ship_id", "role_name", "index", "version")
+            .order_by("ship_id", "role_name", "index")
+        }
+        seated = set(
+            RoleSlot.objects.filter(ship_id__in=ship_ids, user__isnull=False).values_list(
+                "user_id", flat=True
+            )
+        )
+        if users is None:
+            # Disabled accounts are never seated automatically.
+            users = get_ordered_user_queryset().filter(is_active=True).values_list("pk", flat=True)
+        self.pool = [
+            user_id
+            for user_id in (getattr(user, "pk", user) for user in users)
+            if user_id not in seated
+        ]
+
+        started = time.perf_counter()
+        self.assignments = solve(
+            [
+                (ship.pk, max(ship.min_crew - ship.seats_filled, 0), self._room(ship))
+                for ship in self.ships
+            ],
+            [(slot.pk, slot.ship_id, slot.role_name) for slot in self.open_slots.values()],
+            self.pool,
+            preferences,
+        )
+        self.solve_ms = (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _room(ship: Ship) -> int:
+        # A ship without a known maximum takes as many users as it has seats.
+        if not ship.max_crew:
+            return ship.seats_total
+        return max(ship.max_crew - ship.seats_filled, 0)
+
+    @property
+    def unassigned_users(self) -> list[int]:
+        seated = set(self.assignments.values())
+        return [user_id for user_id in self.pool if user_id not in seated]
+
+    def summary(self) -> list[dict]:
+        """Return the crew of each ship before and after the plan."""
+
+        added: dict[int, int] = defaultdict(int)
+        for slot_id in self.assignments:
+            added[self.open_slots[slot_id].ship_id] += 1
+        return [
+            {
+                "ship": ship,
+                "before": ship.seats_filled,
+                "added": added[ship.pk],
+                "after": ship.seats_filled + added[ship.pk],
+                "min_crew": ship.min_crew,
+                "max_crew": ship.max_crew,
+            }
+            for ship in self.ships
+        ]
+
+    def changes(self) -> list[dict]:
+        return [
+            {
+                "id": slot_id,
+                "user": user_id,
+                "status": AUTOFILL_STATUS,
+                "version": self.open_slots[slot_id].version,
+            }
+            for slot_id, user_id in self.assignments.items()
+        ]
+
+    def apply(self) -> list[RoleSlot]:
+        """Write the plan through ``update_role_slots``.
+
+        The versions read by the plan guard every seat, so a seat taken in the
+        meantime raises :class:`ops.slots.SlotConflict` and nothing is written.
+        """
+
+        from .slots import update_role_slots
+
+        if not self.assignments:
+            return []
+        return update_role_slots(self.changes())
+
+
+__all__ = ["AUTOFILL_STATUS", "AutofillPlan", "solve"]
@@ -0,0 +1,207 @@
+"""Synthetic fleets and timing helpers shared by the ``bench_*`` commands.
+
+Benchmarks run against the configured database inside a transaction that is
+always rolled back, so they can be pointed at a local SQLite file without
+leaving synthetic rows behind.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from itertools import cycle
+from typing import Sequence
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .models import Operation, OperationHighlightedShip, RoleSlot, Ship
+from .slots import recount_seats
+
+BENCH_PREFIX = "bench"
+
+#: Fleet sizes used by ``bench_views``: role slots, users and highlighted ships.
+SCALES = {
+    "small": {"slots": 100, "users": 50, "highlighted": 5},
+    "medium": {"slots": 1000, "users": 500, "highlighted": 50},
+    "large": {"slots": 10000, "users": 5000, "highlighted": 200},
+}
+
+
+class _Rollback(Exception):
+    """Raised to unwind the benchmark transaction."""
+
+
+@contextmanager
+def rolled_back():
+    """Run the enclosed block in a transaction that is always rolled back."""
+
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def seed_users(count: int, *, prefix: str = BENCH_PREFIX):
+    """Create ``count`` plain users and return them ordered by username."""
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        [user_model(username=f"{prefix}-user-{number:05d}") for number in range(count)],
+        batch_size=500,
+    )
+    return list(
+        user_model.objects.filter(username__startswith=f"{prefix}-user-").order_by(
+            "username"
+        )
+    )
+
+
+def seed_manager(*, prefix: str = BENCH_PREFIX):
+    """Create a superuser able to see every management control."""
+
+    user_model = get_user_model()
+    return user_model.objects.create(
+        username=f"{prefix}-manager",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+def seed_fleet(
+    ship_count: int,
+    slots_per_ship: int,
+    *,
+    roles: Sequence[str] = ("Équipage",),
+    min_crew: int = 1,
+    prefix: str = BENCH_PREFIX,
+):
+    """Create ships with ``slots_per_ship`` open role slots each.
+
+    Seats are spread over ``roles`` in turn.
+    """
+
+    categories = cycle(code for code, _label in Ship.CATEGORY_CHOICES)
+    Ship.objects.bulk_create(
+        [
+            Ship(
+                name=f"{prefix} ship {number:05d}",
+                manufacturer="Bench",
+                role="Medium Fighter",
+                category=next(categories),
+                min_crew=min_crew,
+                max_crew=max(slots_per_ship, 1),
+            )
+            for number in range(ship_count)
+        ],
+        batch_size=500,
+    )
+    ships = list(Ship.objects.filter(name__startswith=f"{prefix} ship ").order_by("name"))
+    RoleSlot.objects.bulk_create(
+        [
+            RoleSlot(ship=ship, role_name=roles[(index - 1) % len(roles)], index=index)
+            for ship in ships
+            for index in range(1, slots_per_ship + 1)
+        ],
+        batch_size=1000,
+    )
+    # bulk_create skips the signals that keep the seat counters.
+    recount_seats([ship.pk for ship in ships])
+    return ships
+
+
+def seed_operation(ships, *, crew_per_role: int = 3, prefix: str = BENCH_PREFIX):
+    """Create an active operation highlighting ``ships`` with named crews."""
+
+    from .services import reconcile_highlighted_ships
+
+    operation = Operation.objects.create(
+        title=f"{prefix} operation", description="Briefing " * 50, is_active=True
+    )
+    reconcile_highlighted_ships(
+        operation,
+        {
+            ship.pk: {
+                role: [f"{role} {number}" for number in range(crew_per_role)]
+                for role, _label in OperationHighlightedShip.ROLE_CHOICES
+            }
+            for ship in ships
+        },
+    )
+    return operation
+
+
+def measure(func, *, repeat: int = 1) -> dict:
+    """Call ``func`` ``repeat`` times and report the fastest run.
+
+    The returned mapping holds the best wall-clock time in milliseconds, the
+    number of queries of that run and the size of its result when it is a
+    string or bytes payload.
+    """
+
+    best = None
+    for _ in range(max(repeat, 1)):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+        if best is None or elapsed < best["ms"] / 1000:
+            size = len(result) if isinstance(result, (str, bytes)) else None
+            best = {
+                "ms": round(elapsed * 1000, 2),
+                "queries": len(queries),
+                "bytes": size,
+            }
+    return best
+
+
+def compare_results(results: dict, baseline: dict | None = None, *, threshold: float = 0.25):
+    """Return the regressions found in ``bench_views`` results.
+
+    ``results`` and ``baseline`` map scale names to ``{view: measurement}``.
+    A view regresses when its query count grows with the scale, when it runs
+    more queries than in the baseline, or when it is slower than the baseline
+    by more than ``threshold`` (a fraction).
+    """
+
+    problems = []
+    ordered = [scale for scale in SCALES if scale in results]
+    if len(ordered) > 1:
+        smallest, largest = results[ordered[0]], results[ordered[-1]]
+        for view, measured in largest.items():
+            if view in smallest and measured["queries"] > smallest[view]["queries"]:
+                problems.append(
+                    f"{view}: {smallest[view]['queries']} queries at {ordered[0]} "
+                    f"but {measured['queries']} at {ordered[-1]}"
+                )
+
+    for scale, views in results.items():
+        for view, measured in views.items():
+            previous = (baseline or {}).get(scale, {}).get(view)
+            if previous is None:
+                continue
+            if measured["queries"] > previous["queries"]:
+                problems.append(
+                    f"{view} [{scale}]: {measured['queries']} queries "
+                    f"(baseline {previous['queries']})"
+                )
+            if measured["ms"] > previous["ms"] * (1 + threshold):
+                problems.append(
+                    f"{view} [{scale}]: {measured['ms']} ms (baseline {previous['ms']} ms)"
+                )
+    return problems
+
+
+__all__ = [
+    "SCALES",
+    "compare_results",
+    "measure",
+    "rolled_back",
+    "seed_fleet",
+    "seed_manager",
+    "seed_operation",
+    "seed_users",
+]
@@ -0,0 +1,233 @@
+"""Namespaced, versioned cache entries of the ops app.
+
+Every value the app caches belongs to a :class:`Namespace`. Keys have the
+form ``ops:<namespace>:v<SCHEMA_VERSION>:<parts>``. Bumping
+``SCHEMA_VERSION`` after a change to the shape of cached values makes a
+deploy ignore what older code stored. A versioned namespace also stores a
+generation token next to its entries. :meth:`Namespace.invalidate` replaces
+the token and drops every entry of the namespace at once, at the price of
+fetching the token together with the entry (one ``get_many``).
+
+:meth:`Namespace.get_or_set` lets one process recompute a missing entry
+while the others wait briefly for it (lock-on-miss). This stops a stampede
+of identical queries after an invalidation. Hits and misses are counted per
+namespace and read with :func:`stats`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+SCHEMA_VERSION = 1
+
+#: Seconds a recompute lock is held at most, and waited for by other workers.
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.05
+
+#: Local hit/miss events gathered before they are added to the shared totals.
+STATS_FLUSH_EVERY = 100
+
+_MISSING = object()
+_FOREVER = object()
+
+_stats_lock = threading.Lock()
+_pending_stats: Counter = Counter()
+_namespaces: dict[str, "Namespace"] = {}
+
+
+class Namespace:
+    """A family of cache entries that share a key prefix and a timeout.
+
+    ``timeout`` is a number of seconds, ``None`` to keep entries until they
+    are deleted, or the name of a setting holding the number of seconds. A
+    timeout of 0 disables the namespace: lookups miss and nothing is stored.
+    """
+
+    def __init__(self, name: str, *, timeout: int | str | None = None, versioned: bool = False):
+        self.name = name
+        self._timeout = timeout
+        self.versioned = versioned
+        self.generation_key = f"ops:{name}:generation"
+        _namespaces[name] = self
+
+    @property
+    def timeout(self) -> int | None:
+        if isinstance(self._timeout, str):
+            return int(getattr(settings, self._timeout, 0) or 0)
+        return self._timeout
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout != 0
+
+    def key(self, *parts) -> str:
+        return ":".join([f"ops:{self.name}:v{SCHEMA_VERSION}", *map(str, parts)])
+
+    def _lookup(self, key: str, *, count: bool = True):
+        """Return ``(value or _MISSING, generation)`` for ``key``."""
+
+        generation = None
+        if self.versioned:
+            found = cache.get_many([key, self.generation_key])
+            generation = found.get(self.generation_key)
+            entry = found.get(key)
+            fresh = entry is not None and generation is not None and entry[0] == generation
+            value = entry[1] if fresh else _MISSING
+        else:
+            value = cache.get(key, _MISSING)
+        if count:
+            _count(self.name, "hits" if value is not _MISSING else "misses")
+        return value, generation
+
+    def _store(self, key: str, value, generation, timeout) -> None:
+        timeout = self.timeout if timeout is _FOREVER else timeout
+        if self.versioned:
+            if generation is None:
+                cache.add(self.generation_key, time.time_ns(), None)
+                generation = cache.get(self.generation_key)
+            value = (generation, value)
+        cache.set(key, value, timeout)
+
+    def get(self, *parts, default=None):
+        if not self.enabled:
+            return default
+        value, _generation = self._lookup(self.key(*parts))
+        return default if value is _MISSING else value
+
+    def set(self, value, *parts, timeout=_FOREVER) -> None:
+        if not self.enabled:
+            return
+        generation = cache.get(self.generation_key) if self.versioned else None
+        self._store(self.key(*parts), value, generation, timeout)
+
+    def get_or_set(self, parts: tuple, compute: Callable[[], object], *, timeout=_FOREVER):
+        """Return the cached value, computing it under a lock when missing.
+
+        Workers that find the lock taken poll for the value for up to
+        ``LOCK_WAIT`` seconds, then compute it themselves rather than wait
+        on a stuck or dead lock holder.
+        """
+
+        if not self.enabled:
+            return compute()
+        key = self.key(*parts)
+        value, generation = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        lock = f"{key}:lock"
+        if cache.add(lock, 1, LOCK_TIMEOUT):
+            try:
+                value = compute()
+                self._store(key, value, generation, timeout)
+            finally:
+                cache.delete(lock)
+            return value
+
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL)
+            value, _generation = self._lookup(key, count=False)
+            if value is not _MISSING:
+                return value
+        return compute()
+
+    def delete(self, *parts) -> None:
+        cache.delete(self.key(*parts))
+
+    def delete_many(self, parts_list: Iterable[tuple]) -> None:
+        keys = [self.key(*parts) for parts in parts_list]
+        if keys:
+            cache.delete_many(keys)
+
+    def invalidate(self) -> None:
+        """Drop every entry of a versioned namespace."""
+
+        if not self.versioned:
+            raise TypeError(f"Cache namespace {self.name!r} is not versioned.")
+        cache.set(self.generation_key, time.time_ns(), None)
+
+
+def _stats_key(namespace: str, outcome: str) -> str:
+    return f"ops:stats:{namespace}:{outcome}"
+
+
+def _count(namespace: str, outcome: str) -> None:
+    with _stats_lock:
+        _pending_stats[(namespace, outcome)] += 1
+        due = sum(_pending_stats.values()) >= STATS_FLUSH_EVERY
+    if due:
+        flush_stats()
+
+
+def flush_stats() -> None:
+    """Add the hits and misses counted by this process to the shared totals."""
+
+    with _stats_lock:
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+    for (namespace, outcome), count in pending.items():
+        key = _stats_key(namespace, outcome)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # Evicted between add() and incr().
+            cache.set(key, count, None)
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Return the hits and misses of every namespace, across processes."""
+
+    flush_stats()
+    keys = {
+        (name, outcome): _stats_key(name, outcome)
+        for name in _namespaces
+        for outcome in ("hits", "misses")
+    }
+    found = cache.get_many(list(keys.values()))
+    return {
+        name: {outcome: found.get(keys[(name, outcome)], 0) for outcome in ("hits", "misses")}
+        for name in sorted(_namespaces)
+    }
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _pending_stats.clear()
+    cache.delete_many(
+        [_stats_key(name, outcome) for name in _namespaces for outcome in ("hits", "misses")]
+    )
+
+
+#: Ship picker options, dropped whenever a ship changes.
+SHIPS = Namespace("ships", timeout="OPS_SHIP_CHOICES_CACHE_TIMEOUT")
+#: Assignable user lists.
+USERS = Namespace("users", timeout="OPS_USER_CHOICES_CACHE_TIMEOUT")
+#: Rendered operation block of the overview page.
+OPERATION = Namespace("operation", timeout="OPS_OVERVIEW_CACHE_TIMEOUT")
+#: Group names of each user, behind the permission checks.
+PERMISSIONS = Namespace("permissions", timeout="OPS_PERMISSION_CACHE_TIMEOUT")
+#: "Mes places" lists, per user.
+ASSIGNMENTS = Namespace("assignments", timeout="OPS_ASSIGNMENTS_CACHE_TIMEOUT", versioned=True)
+
+
+__all__ = [
+    "ASSIGNMENTS",
+    "Namespace",
+    "OPERATION",
+    "PERMISSIONS",
+    "SCHEMA_VERSION",
+    "SHIPS",
+    "USERS",
+    "flush_stats",
+    "reset_stats",
+    "stats",
+]
@@ -0,0 +1,226 @@
+"""Ship catalog parsing and bulk import.
+
+Catalog entries are plain mappings with ``name``, ``manufacturer``, ``role``,
+``crew`` (``"3 - 9"``) and ``cargo`` keys, as in
+``ops.data.ships_catalog.SHIPS_DATA``. They can also be read from CSV or JSON
+files with the same columns. Imports diff the catalog against the database in
+one read and write the changes with ``bulk_create``/``bulk_update``.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from django.db import transaction
+
+CATALOG_FIELDS = ("manufacturer", "role", "cargo_capacity", "min_crew", "max_crew", "category")
+DERIVED_FIELDS = ("filter_category", "filter_subcategory", "cargo_scu")
+
+
+def parse_crew(value: str) -> tuple[int, int]:
+    value = (value or "").strip()
+    if not value or value in {"-", "?"}:
+        return 0, 0
+
+    cleaned = re.sub(r"\s+", "", value)
+    if "-" in cleaned:
+        start, end = cleaned.split("-", 1)
+        try:
+            minimum = int(start)
+        except ValueError:
+            minimum = 0
+        try:
+            maximum = int(end)
+        except ValueError:
+            maximum = minimum
+    else:
+        try:
+            minimum = maximum = int(cleaned)
+        except ValueError:
+            minimum = maximum = 0
+
+    if maximum < minimum:
+        maximum = minimum
+
+    return minimum, maximum
+
+
+def parse_scu(value: str) -> int | None:
+    """Return the cargo capacity in SCU, or None when it is not a number."""
+
+    cleaned = re.sub(r"[\s,]|scu$", "", (value or "").strip().lower())
+    return int(cleaned) if cleaned.isdecimal() else None
+
+
+def determine_category(role: str) -> str:
+    text = (role or "").lower()
+
+    capital_keywords = [
+        "destroyer",
+        "frigate",
+        "corvette",
+        "carrier",
+        "dread",
+        "capital",
+        "large passenger",
+        "heavy gunship",
+        "heavy freight",
+        "heavy salvage",
+        "heavy construction",
+        "heavy mining",
+        "light carrier",
+    ]
+    if any(keyword in text for keyword in capital_keywords):
+        return "CAP"
+
+    if "heavy fighter" in text:
+        return "HF"
+    if "medium fighter" in text:
+        return "MF"
+    if "light fighter" in text or "snub" in text or "racing" in text:
+        return "LF"
+
+    if "gunship" in text:
+        return "HF"
+    if "bomber" in text:
+        return "MF"
+
+    support_keywords = [
+        "freight",
+        "cargo",
+        "transport",
+        "expedition",
+        "exploration",
+        "dropship",
+        "medical",
+        "passenger",
+        "science",
+        "refuel",
+        "repair",
+        "salvage",
+        "mining",
+        "pathfinder",
+        "data",
+        "boarding",
+        "interdiction",
+        "modular",
+        "rescue",
+    ]
+    if any(keyword in text for keyword in support_keywords):
+        return "MR"
+
+    return "MR"
+
+
+def normalize_entry(entry: Mapping[str, str]) -> dict[str, object]:
+    """Return the ``Ship`` field values described by a raw catalog entry."""
+
+    min_crew, max_crew = parse_crew(entry.get("crew", ""))
+    return {
+        "name": entry["name"].strip(),
+        "manufacturer": (entry.get("manufacturer") or "").strip(),
+        "role": (entry.get("role") or "").strip(),
+        "cargo_capacity": (entry.get("cargo") or "-").strip() or "-",
+        "min_crew": min_crew or 0,
+        "max_crew": max(min_crew or 0, max_crew or 0),
+        "category": determine_category(entry.get("role", "")),
+    }
+
+
+def load_entries(source: str | None = None) -> list[dict[str, str]]:
+    """Read raw catalog entries from the bundled module, a CSV or a JSON file."""
+
+    if not source:
+        from .data.ships_catalog import SHIPS_DATA
+
+        return [dict(entry) for entry in SHIPS_DATA]
+
+    path = Path(source)
+    if path.suffix.lower() == ".json":
+        with path.open(encoding="utf-8") as handle:
+            return [dict(entry) for entry in json.load(handle)]
+    if path.suffix.lower() == ".csv":
+        with path.open(encoding="utf-8", newline="") as handle:
+            return [dict(row) for row in csv.DictReader(handle)]
+    raise ValueError(f"Unsupported catalog format: {source}")
+
+
+def catalog_hash(ships: Iterable[Mapping[str, object]]) -> str:
+    """Return a stable content hash of normalised catalog entries."""
+
+    canonical = sorted(ships, key=lambda ship: ship["name"])
+    payload = json.dumps(canonical, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CatalogPlan:
+    """Changes needed to bring the ``Ship`` table in line with a catalog."""
+
+    def __init__(self, ships: list[dict[str, object]]):
+        from .models import Ship
+
+        self.ships = ships
+        self.content_hash = catalog_hash(ships)
+        existing = Ship.objects.in_bulk(field_name="name")
+
+        self.to_create: list[Ship] = []
+        self.to_update: list[Ship] = []
+        self.changes: dict[str, list[str]] = {}
+        seen: set[str] = set()
+        for values in ships:
+            name = values["name"]
+            if name in seen:
+                continue
+            seen.add(name)
+            ship = existing.get(name)
+            if ship is None:
+                ship = Ship(**values)
+                ship.apply_derived_fields()
+                self.to_create.append(ship)
+                continue
+            changed = [field for field in CATALOG_FIELDS if getattr(ship, field) != values[field]]
+            if changed:
+                for field in changed:
+                    setattr(ship, field, values[field])
+                ship.apply_derived_fields()
+                self.to_update.append(ship)
+                self.changes[name] = changed
+        self.unchanged = len(seen) - len(self.to_create) - len(self.to_update)
+        self.not_in_catalog = sorted(set(existing) - seen)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.to_create or self.to_update)
+
+    def apply(self, *, batch_size: int = 200) -> None:
+        from .forms import forget_ship_choices
+        from .models import Ship
+        from .services import forget_operation_overview
+
+        with transaction.atomic():
+            Ship.objects.bulk_create(self.to_create, batch_size=batch_size)
+            Ship.objects.bulk_update(
+                self.to_update,
+                [*CATALOG_FIELDS, *DERIVED_FIELDS],
+                batch_size=batch_size,
+            )
+        # Bulk writes skip the Ship signals that drop the cached choices and
+        # the overview block, which shows the highlighted ships.
+        forget_ship_choices()
+        forget_operation_overview()
+
+
+__all__ = [
+    "CatalogPlan",
+    "catalog_hash",
+    "determine_category",
+    "load_entries",
+    "normalize_entry",
+    "parse_crew",
+    "parse_scu",
+]
@@ -0,0 +1,307 @@
+"""Ship classification used by the fleet filters.
+
+``FILTER_TREE`` maps each filter category to its subcategories and the
+keywords matched against ``Ship.role``. The result is stored on ``Ship``
+(``filter_category``/``filter_subcategory``) whenever a ship is saved and can
+be recomputed for the whole catalog with ``manage.py classify_ships`` after the
+tree changes, so listing pages filter with an indexed ``WHERE`` instead of
+scanning every role on each request.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+
+FILTER_TREE = OrderedDict(
+    (
+        (
+            "military",
+            {
+                "label": "Militaire",
+                "subcategories": OrderedDict(
+                    (
+                        (
+                            "chasseur",
+                            {
+                                "label": "Chasseur",
+                                "keywords": (
+                                    "fighter",
+                                    "stealth",
+                                    "combat",
+                                    "interceptor",
+                                    "racing",
+                                    "patrol",
+                                    "escort",
+                                    "pursuit",
+                                ),
+                            },
+                        ),
+                        (
+                            "capitaux",
+                            {
+                                "label": "Capitaux",
+                                "keywords": (
+                                    "destroyer",
+                                    "frigate",
+                                    "corvette",
+                                    "carrier",
+                                    "dread",
+                                    "capital",
+                                    "battle",
+                                    "battleship",
+                                ),
+                            },
+                        ),
+                        (
+                            "gunship",
+                            {
+                                "label": "Gun Ship",
+                                "keywords": ("gunship",),
+                            },
+                        ),
+                        (
+                            "bomber",
+                            {
+                                "label": "Bomber",
+                                "keywords": ("bomber",),
+                            },
+                        ),
+                        (
+                            "torpilleur",
+                            {
+                                "label": "Torpilleur",
+                                "keywords": ("torpedo", "torp"),
+                            },
+                        ),
+                        (
+                            "interdicteur",
+                            {
+                                "label": "Interdicteur",
+                                "keywords": (
+                                    "interdict",
+                                    "interdiction",
+                                    "minelayer",
+                                    "quantum enforcement",
+                                    "quantum damp",
+                                ),
+                            },
+                        ),
+                        (
+                            "dropship",
+                            {
+                                "label": "Drop Ship",
+                                "keywords": (
+                                    "dropship",
+                                    "drop ship",
+                                    "boarding",
+                                    "troop",
+                                    "personnel",
+                                    "assault",
+                                ),
+                            },
+                        ),
+                    )
+                ),
+            },
+        ),
+        (
+            "industrial",
+            {
+                "label": "Industriel",
+                "subcategories": OrderedDict(
+                    (
+                        (
+                            "salvage",
+                            {
+                                "label": "Salvage",
+                                "keywords": ("salvage", "scrap"),
+                            },
+                        ),
+                        (
+                            "minage",
+                            {
+                                "label": "Minage",
+                                "keywords": (
+                                    "mining",
+                                    "prospecting",
+                                    "refinery",
+                                ),
+                            },
+                        ),
+                        (
+                            "hauling",
+                            {
+                                "label": "Hauling",
+                                "keywords": (
+                                    "freight",
+                                    "cargo",
+                                    "hauling",
+                                    "transport",
+                                    "courier",
+                                    "logistics",
+                                    "delivery",
+                                    "carrier",
+                                    "merchant",
+                                    "mercantile",
+                                    "trader",
+                                    "commerce",
+                                ),
+                            },
+                        ),
+                    )
+                ),
+            },
+        ),
+        (
+            "support",
+            {
+                "label": "Support",
+                "subcategories": OrderedDict(
+                    (
+                        (
+                            "medical",
+                            {
+                                "label": "Medical",
+                                "keywords": (
+                                    "medical",
+                                    "rescue",
+                                    "hospital",
+                                    "med",
+                                    "triage",
+                                ),
+                            },
+                        ),
+                        (
+                            "refuel",
+                            {
+                                "label": "Refuel",
+                                "keywords": ("refuel", "fuel"),
+                            },
+                        ),
+                        (
+                            "repair",
+                            {
+                                "label": "Repair",
+                                "keywords": (
+                                    "repair",
+                                    "service",
+                                    "tow",
+                                    "tractor",
+                                ),
+                            },
+                        ),
+                        (
+                            "exploration",
+                            {
+                                "label": "Exploration",
+                                "keywords": (
+                                    "explor",
+                                    "expedition",
+                                    "pathfinder",
+                                    "science",
+                                    "survey",
+                                    "touring",
+                                    "recon",
+                                    "scout",
+                                    "reporting",
+                                    "data",
+                                    "observation",
+                                ),
+                            },
+                        ),
+                    )
+                ),
+            },
+        ),
+    )
+)
+
+CATEGORY_FALLBACK = {
+    "LF": ("military", "chasseur"),
+    "MF": ("military", "chasseur"),
+    "HF": ("military", "chasseur"),
+    "CAP": ("military", "capitaux"),
+    "MR": ("support", "exploration"),
+}
+
+
+SUBCATEGORY_LOOKUP = {
+    sub_slug: {
+        "category": cat_slug,
+        "label": sub_data["label"],
+        "keywords": sub_data["keywords"],
+    }
+    for cat_slug, cat_data in FILTER_TREE.items()
+    for sub_slug, sub_data in cat_data["subcategories"].items()
+}
+
+
+def _compile_keyword_matcher(tree) -> tuple[re.Pattern, list[tuple[str, str]]]:
+    """Compile every keyword of the tree into one regular expression.
+
+    Each subcategory becomes a named group, in tree order, inside a lookahead
+    so that a single ``finditer`` pass reports, for every position of the text,
+    the highest-priority subcategory with a keyword starting there.
+    """
+
+    slugs: list[tuple[str, str]] = []
+    groups: list[str] = []
+    for cat_slug, cat_data in tree.items():
+        for sub_slug, sub_data in cat_data["subcategories"].items():
+            keywords = "|".join(re.escape(keyword) for keyword in sub_data["keywords"])
+            groups.append(f"(?P<s{len(slugs)}>{keywords})")
+            slugs.append((cat_slug, sub_slug))
+    return re.compile("(?=(?:" + "|".join(groups) + "))"), slugs
+
+
+_KEYWORD_PATTERN, _KEYWORD_SLUGS = _compile_keyword_matcher(FILTER_TREE)
+
+
+def match_filter_category(role: str | None) -> tuple[str | None, str | None]:
+    """Return the filter category/subcategory slugs matching the given role.
+
+    The first subcategory of ``FILTER_TREE`` having a keyword contained in the
+    role wins, wherever the keyword appears in the text.
+    """
+
+    best = None
+    for match in _KEYWORD_PATTERN.finditer((role or "").lower()):
+        priority = int(match.lastgroup[1:])
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    if best is None:
+        return None, None
+    return _KEYWORD_SLUGS[best]
+
+
+def classify(role: str | None, category: str | None) -> tuple[str | None, str | None]:
+    """Return the filter slugs for a ship role, falling back to its category."""
+
+    cat_slug, sub_slug = match_filter_category(role)
+    if not cat_slug:
+        cat_slug, sub_slug = CATEGORY_FALLBACK.get(category, (None, None))
+    return cat_slug, sub_slug
+
+
+def category_label(slug: str | None) -> str | None:
+    return FILTER_TREE.get(slug, {}).get("label") if slug else None
+
+
+def subcategory_label(slug: str | None) -> str | None:
+    if slug and slug in SUBCATEGORY_LOOKUP:
+        return SUBCATEGORY_LOOKUP[slug]["label"]
+    return None
+
+
+__all__ = [
+    "CATEGORY_FALLBACK",
+    "FILTER_TREE",
+    "SUBCATEGORY_LOOKUP",
+    "category_label",
+    "classify",
+    "match_filter_category",
+    "subcategory_label",
+]
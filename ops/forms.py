@@ -2,7 +2,10 @@ import json
 
 from django import forms
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.functional import cached_property
 
+from .cache import SHIPS
 from .models import (
     Operation,
     OperationHighlightedShip,
@@ -10,7 +13,7 @@ from .models import (
     RoleSlot,
     Ship,
 )
-from .utils import get_ordered_user_queryset
+from .utils import get_ordered_user_queryset, ordered_user_choices
 
 
 ROLE_PLACEHOLDERS = {
@@ -41,6 +44,92 @@ class ShipRoleTemplateForm(forms.ModelForm):
         }
 
 
+class SharedChoices:
+    """Options evaluated once and shared by every picker rendering them.
+
+    Rendering a full ``<select>`` per form makes pages grow with
+    ``forms × options``. Pickers built on this object only carry the blank and
+    the currently selected option; the complete list is serialised once in the
+    page (``json_script``) and expanded client-side by
+    ``ops/includes/shared_choices_script.html``.
+    """
+
+    def __init__(self, options):
+        self.options: list[tuple[int, str]] = [(pk, label) for pk, label in options]
+        self.labels: dict[str, str] = {str(pk): label for pk, label in self.options}
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+
+class SharedUserChoices(SharedChoices):
+    """Assignable users shared by the role slot pickers of a page.
+
+    Without a queryset, every user is listed from the cached choices.
+    """
+
+    def __init__(self, queryset=None):
+        if queryset is None:
+            super().__init__(ordered_user_choices())
+        else:
+            super().__init__((user.pk, str(user)) for user in queryset)
+
+
+def get_ship_choices() -> SharedChoices:
+    """Return the ship picker options, cached until a ship changes.
+
+    ``ops.signals`` drops the cached list whenever a ship is saved or deleted.
+    Other workers' local caches only drop it after
+    ``OPS_SHIP_CHOICES_CACHE_TIMEOUT`` seconds.
+    """
+
+    return SharedChoices(
+        SHIPS.get_or_set(
+            ("choices",), lambda: list(Ship.objects.order_by("name").values_list("pk", "name"))
+        )
+    )
+
+
+def forget_ship_choices() -> None:
+    # After the commit: dropped earlier, a concurrent request could cache the
+    # pre-commit list again.
+    transaction.on_commit(lambda: SHIPS.delete("choices"))
+
+
+class SharedChoicesSelect(forms.Select):
+    """Lightweight select fed from a page-wide ``SharedChoices`` payload.
+
+    ``source`` is the id of the ``json_script`` element holding the options.
+    """
+
+    def __init__(self, attrs=None, shared_choices=None, empty_label="", source=""):
+        super().__init__(attrs)
+        self.shared_choices = shared_choices
+        self.empty_label = empty_label
+        self.attrs["data-choices"] = source
+
+    def optgroups(self, name, value, attrs=None):
+        choices = [("", self.empty_label)]
+        labels = self.shared_choices.labels if self.shared_choices is not None else {}
+        for selected in value:
+            if selected in labels:
+                choices.append((selected, labels[selected]))
+                break
+
+        groups = []
+        for index, (option_value, option_label) in enumerate(choices):
+            option = self.create_option(
+                name,
+                option_value,
+                option_label,
+                str(option_value) in value,
+                index,
+                attrs=attrs,
+            )
+            groups.append((None, [option], index))
+        return groups
+
+
 class RoleSlotForm(forms.ModelForm):
     user = forms.ModelChoiceField(
         label="Utilisateur",
@@ -52,6 +141,7 @@ class RoleSlotForm(forms.ModelForm):
             }
         ),
     )
+    version = forms.IntegerField(required=False, min_value=0, widget=forms.HiddenInput)
 
     class Meta:
         model = RoleSlot
@@ -64,11 +154,24 @@ class RoleSlotForm(forms.ModelForm):
             ),
         }
 
-    def __init__(self, *args, user_queryset=None, **kwargs):
+    def __init__(self, *args, user_queryset=None, user_choices=None, **kwargs):
         super().__init__(*args, **kwargs)
-        qs = user_queryset or get_ordered_user_queryset()
-        self.fields["user"].queryset = qs
-        self.fields["user"].empty_label = "— Libre —"
+        user_field = self.fields["user"]
+        user_field.queryset = (
+            get_ordered_user_queryset() if user_queryset is None else user_queryset
+        )
+        user_field.empty_label = "— Libre —"
+        self.fields["version"].initial = self.instance.version
+        if user_choices is None and user_queryset is None:
+            # Options come from the cached list; the queryset only validates.
+            user_field.choices = [("", user_field.empty_label), *ordered_user_choices()]
+        elif user_choices is not None:
+            user_field.widget = SharedChoicesSelect(
+                attrs=user_field.widget.attrs,
+                shared_choices=user_choices,
+                empty_label=user_field.empty_label,
+                source="user-choices",
+            )
 
     @staticmethod
     def default_user_queryset():
@@ -95,10 +198,32 @@ class OperationForm(forms.ModelForm):
         }
 
 
+class SharedShipChoiceField(forms.ModelChoiceField):
+    """Ship field resolving submitted ids from instances loaded by the formset."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances = None
+
+    def to_python(self, value):
+        if self.instances is None:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        try:
+            return self.instances[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+
 class HighlightedShipForm(forms.Form):
     """Form used inside the dynamic highlighted ships formset."""
 
-    ship = forms.ModelChoiceField(
+    ship = SharedShipChoiceField(
         label="Vaisseau",
         queryset=Ship.objects.order_by("name"),
         required=False,
@@ -109,10 +234,19 @@ class HighlightedShipForm(forms.Form):
         ),
     )
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, ship_choices=None, ship_instances=None, **kwargs):
         initial = kwargs.get("initial") or {}
         super().__init__(*args, **kwargs)
 
+        ship_field = self.fields["ship"]
+        ship_field.instances = ship_instances
+        ship_field.widget = SharedChoicesSelect(
+            attrs=ship_field.widget.attrs,
+            shared_choices=ship_choices or get_ship_choices(),
+            empty_label=ship_field.empty_label,
+            source="ship-choices",
+        )
+
         self.role_metadata: list[dict[str, object]] = []
         for role, label in OperationHighlightedShip.ROLE_CHOICES:
             field_name = self._role_field_name(role)
@@ -200,8 +334,39 @@ class HighlightedShipForm(forms.Form):
         return cleaned_data
 
 
+class BaseHighlightedShipFormSet(forms.BaseFormSet):
+    """Formset sharing one ship choice list and one ship lookup across forms."""
+
+    def __init__(self, *args, ship_choices=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ship_choices = ship_choices or get_ship_choices()
+
+    @cached_property
+    def submitted_ships(self):
+        """Ships referenced by the bound data, loaded with a single query."""
+
+        if not self.is_bound:
+            return None
+        ship_ids = set()
+        for index in range(self.total_form_count()):
+            value = self.data.get(f"{self.add_prefix(index)}-ship")
+            try:
+                ship_ids.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        return Ship.objects.in_bulk(ship_ids)
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        kwargs["ship_choices"] = self.ship_choices
+        if index is not None:
+            kwargs["ship_instances"] = self.submitted_ships
+        return kwargs
+
+
 HighlightedShipFormSet = forms.formset_factory(
     HighlightedShipForm,
+    formset=BaseHighlightedShipFormSet,
     extra=1,
     can_delete=True,
 )
\ No newline at end of file
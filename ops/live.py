@@ -0,0 +1,302 @@
+"""Live allocation deltas pushed to browsers over server-sent events.
+
+Model signals (``ops.signals``) queue the ids of changed role slots and
+highlighted ships; once the surrounding transaction commits, the current
+state of those rows is published to a broker that fans the events out to
+every open ``live_events`` stream. Bulk writes that bypass model signals send
+:data:`slots_changed` / :data:`crew_changed` themselves.
+
+The default broker lives in the process, which is enough for a single ASGI
+worker. Setting ``OPS_LIVE_BROKER_URL`` to a ``redis://`` URL relays events
+through Redis so every worker sees them (requires the ``redis`` package).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from typing import Iterable
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.dispatch import Signal
+
+from .constants import STATUS_BADGES
+
+#: Sent with ``slot_ids`` after role slots were changed without ``save()``,
+#: and ``user_ids`` for the users who held or now hold those seats.
+slots_changed = Signal()
+#: Sent with ``highlighted_ship_ids`` after crews were changed in bulk.
+crew_changed = Signal()
+
+RESYNC_EVENT = {"type": "resync"}
+
+
+class Subscription:
+    """Events queued for one stream, consumed on the stream's event loop."""
+
+    def __init__(self, broker: "InProcessBroker", loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.broker = broker
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event: dict) -> None:
+        if self.queue.full():
+            # A stalled client gets one resync marker instead of a backlog.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC_EVENT
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+def _fan_out(subscriptions: tuple[Subscription, ...], events: list[dict]) -> None:
+    for event in events:
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+
+class InProcessBroker:
+    """Fans events out to the subscriptions of the current process.
+
+    ``publish`` may run in any thread (sync views run in a thread pool under
+    ASGI); delivery is scheduled once per event loop rather than once per
+    subscriber.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[asyncio.AbstractEventLoop, set[Subscription]] = {}
+
+    def subscribe(self) -> Subscription:
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(self, loop, getattr(settings, "OPS_LIVE_QUEUE_SIZE", 100))
+        with self._lock:
+            self._subscriptions.setdefault(loop, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.loop)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.loop]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def wants_events(self) -> bool:
+        return self.subscriber_count > 0
+
+    def publish(self, events: list[dict]) -> None:
+        with self._lock:
+            targets = [(loop, tuple(subs)) for loop, subs in self._subscriptions.items()]
+        for loop, subscriptions in targets:
+            try:
+                loop.call_soon_threadsafe(_fan_out, subscriptions, events)
+            except RuntimeError:
+                # The loop is closed: its streams are gone.
+                with self._lock:
+                    self._subscriptions.pop(loop, None)
+
+
+class RedisBroker(InProcessBroker):
+    """Relays events through a Redis channel to every process."""
+
+    channel = "ckfr:live"
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "OPS_LIVE_BROKER_URL requires the 'redis' package."
+            ) from exc
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._listeners: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+    def wants_events(self) -> bool:
+        # Subscribers may be connected to another process.
+        return True
+
+    def publish(self, events: list[dict]) -> None:
+        self._client.publish(self.channel, json.dumps(events))
+
+    def subscribe(self) -> Subscription:
+        subscription = super().subscribe()
+        if subscription.loop not in self._listeners:
+            self._listeners[subscription.loop] = subscription.loop.create_task(self._listen())
+        return subscription
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(self.channel)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    InProcessBroker.publish(self, json.loads(message["data"]))
+
+
+_broker: InProcessBroker | None = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InProcessBroker:
+    """Return the process-wide broker selected by ``OPS_LIVE_BROKER_URL``."""
+
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, "OPS_LIVE_BROKER_URL", "")
+            _broker = RedisBroker(url) if url else InProcessBroker()
+        return _broker
+
+
+def slot_events(slot_ids: Iterable[int]) -> list[dict]:
+    """Return the current state of the given slots as ``slot`` events."""
+
+    from .models import RoleSlot
+
+    slot_ids = set(slot_ids)
+    events = []
+    for slot in RoleSlot.objects.select_related("user").filter(pk__in=slot_ids):
+        slot_ids.discard(slot.pk)
+        events.append(
+            {
+                "type": "slot",
+                "id": slot.pk,
+                "ship": slot.ship_id,
+                "role": slot.role_name,
+                "index": slot.index,
+                "user": slot.user_id,
+                "user_label": str(slot.user) if slot.user_id else None,
+                "status": slot.status,
+                "status_label": slot.get_status_display(),
+                "badge_class": STATUS_BADGES.get(slot.status, STATUS_BADGES["open"]),
+                "version": slot.version,
+            }
+        )
+    events += [{"type": "slot_deleted", "id": slot_id} for slot_id in sorted(slot_ids)]
+    return events
+
+
+def crew_events(highlighted_ship_ids: Iterable[int]) -> list[dict]:
+    """Return the crews of the given highlighted ships as ``crew`` events."""
+
+    from .models import OperationHighlightedShip
+
+    link_ids = set(highlighted_ship_ids)
+    events = []
+    links = OperationHighlightedShip.objects.filter(pk__in=link_ids).prefetch_related(
+        "crew_assignments"
+    )
+    for link in links:
+        link_ids.discard(link.pk)
+        events.append(
+            {
+                "type": "crew",
+                "id": link.pk,
+                "operation": link.operation_id,
+                "ship": link.ship_id,
+                "roles": link.crew_groups,
+            }
+        )
+    events += [{"type": "crew_deleted", "id": link_id} for link_id in sorted(link_ids)]
+    return events
+
+
+_pending = threading.local()
+
+
+def _queue(kind: str, ids: Iterable[int]) -> None:
+    if not get_broker().wants_events():
+        return
+    pending = getattr(_pending, kind, None)
+    if pending is None:
+        pending = set()
+        setattr(_pending, kind, pending)
+    pending.update(ids)
+    # Every call registers a flush; flushes after the first find nothing left.
+    transaction.on_commit(flush)
+
+
+def queue_slots(slot_ids: Iterable[int]) -> None:
+    """Publish the given slots once the current transaction commits."""
+
+    _queue("slots", slot_ids)
+
+
+def queue_crews(highlighted_ship_ids: Iterable[int]) -> None:
+    """Publish the given highlighted ship crews once the transaction commits."""
+
+    _queue("crews", highlighted_ship_ids)
+
+
+def flush() -> None:
+    """Publish the queued changes of this thread."""
+
+    slot_ids, crew_ids = getattr(_pending, "slots", None), getattr(_pending, "crews", None)
+    _pending.slots, _pending.crews = None, None
+    events = []
+    if slot_ids:
+        events += slot_events(slot_ids)
+    if crew_ids:
+        events += crew_events(crew_ids)
+    if events:
+        get_broker().publish(events)
+
+
+def format_event(event: dict) -> str:
+    """Serialise an event in the ``text/event-stream`` format."""
+
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def event_stream(broker: InProcessBroker | None = None, *, heartbeat: float | None = None):
+    """Yield server-sent events until the client disconnects."""
+
+    if heartbeat is None:
+        heartbeat = getattr(settings, "OPS_LIVE_HEARTBEAT", 15)
+    subscription = (broker or get_broker()).subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing idle streams.
+                yield ": ping\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        subscription.close()
+
+
+__all__ = [
+    "InProcessBroker",
+    "RedisBroker",
+    "crew_changed",
+    "crew_events",
+    "event_stream",
+    "flush",
+    "format_event",
+    "get_broker",
+    "queue_crews",
+    "queue_slots",
+    "slot_events",
+    "slots_changed",
+]
@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from ops.autofill import AutofillPlan
+from ops.models import Operation
+from ops.slots import SlotConflict
+from ops.utils import get_ordered_user_queryset, resolve_username_lookup
+
+class Command(BaseCommand):
+    help = "Preview (default) or apply an automatic crewing of an operation's highlighted ships."
+    def add_arguments(self, parser):
+        parser.add_argument("operation", nargs="?", type=int, help="Operation id (defaults to the active operation).")
+        parser.add_argument("--apply", action="store_true", help="Write the assignments instead of previewing them.")
+        parser.add_argument("--preferences", help='JSON file mapping usernames to role names, e.g. {"alice": ["Pilote"]}.')
+        parser.add_argument("--only-listed", action="store_true", help="Only seat the users listed in --preferences.")
+    def handle(self, *args, operation=None, apply=False, preferences=None, only_listed=False, **kwargs):
+        operations = Operation.objects.all()
+        target = operations.filter(pk=operation).first() if operation else operations.filter(is_active=True).first()
+        if target is None:
+            raise CommandError("Operation not found." if operation else "No active operation.")
+
+        users = get_ordered_user_queryset()
+        wishes = {}
+        if preferences:
+            try:
+                with open(preferences, encoding="utf-8") as handle:
+                    listed = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read preferences: {exc}") from exc
+            _user_model, name_field = resolve_username_lookup()
+            ids = dict(users.filter(**{f"{name_field}__in": list(listed)}).values_list(name_field, "pk"))
+            wishes = {ids[name]: roles for name, roles in listed.items() if name in ids}
+            if only_listed:
+                users = users.filter(pk__in=list(wishes))
+
+        plan = AutofillPlan(target, users.values_list("pk", flat=True), preferences=wishes)
+        for row in plan.summary():
+            flag = "" if row["after"] >= row["min_crew"] else "  (below min crew)"
+            self.stdout.write(f"{row['ship'].name}: {row['before']} -> {row['after']} / {row['min_crew']}-{row['max_crew']}{flag}")
+        summary = (
+            f"{len(plan.assignments)} seat(s) for {len(plan.pool)} available user(s), "
+            f"{len(plan.open_slots) - len(plan.assignments)} left open, solved in {plan.solve_ms:.1f} ms."
+        )
+        if not apply:
+            self.stdout.write(f"Preview: {summary}")
+            return
+        try:
+            plan.apply()
+        except SlotConflict as exc:
+            raise CommandError(f"Seats changed meanwhile, nothing written: {exc.slot_ids}") from exc
+        self.stdout.write(self.style.SUCCESS(f"Applied: {summary}"))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from ops.benchmarks import measure, rolled_back, seed_fleet, seed_manager, seed_users
+from ops.forms import RoleSlotForm
+from ops.services import (
+    build_user_choices,
+    group_ships_by_category,
+    prepare_ship_for_display,
+    ships_with_slots,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the ships allocation page with per-slot selects (legacy) "
+        "and with the shared user picker, for several roster sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", default=[50, 500, 2000])
+        parser.add_argument("--ships", type=int, default=20)
+        parser.add_argument("--slots", type=int, default=6)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['ships']} ships × {options['slots']} slots, best of {options['repeat']}"
+        )
+        self.stdout.write(f"{'users':>7} {'mode':>8} {'ms':>10} {'KiB':>10} {'queries':>8}")
+        for user_count in options["users"]:
+            with rolled_back():
+                seed_fleet(options["ships"], options["slots"])
+                seed_users(user_count)
+                request = RequestFactory().get("/ships/allocation/")
+                request.user = seed_manager()
+
+                for mode in ("legacy", "shared"):
+                    result = measure(
+                        lambda: self._render(request, shared=mode == "shared"),
+                        repeat=options["repeat"],
+                    )
+                    self.stdout.write(
+                        f"{user_count:>7} {mode:>8} {result['ms']:>10.1f} "
+                        f"{result['bytes'] / 1024:>10.1f} {result['queries']:>8}"
+                    )
+
+    @staticmethod
+    def _render(request, *, shared: bool) -> str:
+        user_choices = build_user_choices() if shared else None
+        user_queryset = None if shared else RoleSlotForm.default_user_queryset()
+        ships = [
+            prepare_ship_for_display(
+                ship,
+                can_edit=True,
+                user_queryset=user_queryset,
+                user_choices=user_choices,
+            )
+            for ship in ships_with_slots()
+        ]
+        context = {
+            "grouped_ships": group_ships_by_category(ships),
+            "can_edit": True,
+            "user_choices": user_choices,
+        }
+        return render_to_string("ops/ships_allocation.html", context, request=request)
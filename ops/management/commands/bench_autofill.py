@@ -0,0 +1,66 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from ops.autofill import AutofillPlan
+from ops.benchmarks import measure, rolled_back, seed_fleet, seed_operation, seed_users
+
+ROLES = ("Pilote", "Artilleur", "Ingénieur", "Fantassin")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the crew auto-fill engine on synthetic fleets: plan "
+        "(reads and solver) and bulk apply, for several fleet sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seats", type=int, nargs="+", default=[100, 1000, 5000])
+        parser.add_argument("--seats-per-ship", type=int, default=10)
+        parser.add_argument("--users-ratio", type=float, default=0.5, help="Users per seat.")
+        parser.add_argument(
+            "--preferences", type=float, default=0.3, help="Share of users listing one preferred role."
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['seats_per_ship']} seats per ship, {options['users_ratio']:g} user(s) per seat, "
+            f"{options['preferences']:.0%} with a preferred role, best of {options['repeat']}"
+        )
+        self.stdout.write(
+            f"{'seats':>7} {'users':>7} {'filled':>7} {'solve ms':>10} {'plan ms':>10} "
+            f"{'queries':>8} {'apply ms':>10} {'queries':>8}"
+        )
+        rng = random.Random(0)
+        for seat_count in options["seats"]:
+            user_count = max(int(seat_count * options["users_ratio"]), 1)
+            with rolled_back():
+                ships = seed_fleet(
+                    max(seat_count // options["seats_per_ship"], 1),
+                    options["seats_per_ship"],
+                    roles=ROLES,
+                    min_crew=options["seats_per_ship"] // 2,
+                )
+                operation = seed_operation(ships, crew_per_role=0)
+                users = seed_users(user_count)
+                preferences = {
+                    user.pk: [rng.choice(ROLES)]
+                    for user in users
+                    if rng.random() < options["preferences"]
+                }
+                user_ids = [user.pk for user in users]
+
+                plans = []
+
+                def plan():
+                    plans.append(AutofillPlan(operation, user_ids, preferences=preferences))
+
+                planned = measure(plan, repeat=options["repeat"])
+                best = min(plans, key=lambda item: item.solve_ms)
+                applied = measure(plans[-1].apply)
+                self.stdout.write(
+                    f"{seat_count:>7} {user_count:>7} {len(best.assignments):>7} "
+                    f"{best.solve_ms:>10.1f} {planned['ms']:>10.1f} {planned['queries']:>8} "
+                    f"{applied['ms']:>10.1f} {applied['queries']:>8}"
+                )
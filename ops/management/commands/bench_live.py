@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from ops.live import InProcessBroker, event_stream
+
+
+class Command(BaseCommand):
+    help = (
+        "Soak-test the live event fan-out: connect many simulated SSE streams, "
+        "publish events from a worker thread and report delivery latency and "
+        "memory per connection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=1000)
+        parser.add_argument("--events", type=int, default=50)
+        parser.add_argument("--interval", type=float, default=0.02, help="Seconds between events.")
+
+    def handle(self, *args, **options):
+        result = asyncio.run(self._soak(options["subscribers"], options["events"], options["interval"]))
+        latencies = sorted(result["latencies"])
+        fan_out = sorted(result["fan_out"])
+
+        def percentile(values, fraction):
+            return values[min(int(len(values) * fraction), len(values) - 1)] * 1000
+
+        self.stdout.write(
+            f"{options['subscribers']} subscribers, {options['events']} events, "
+            f"{len(latencies)} deliveries ({result['missing']} missing)"
+        )
+        self.stdout.write(
+            f"delivery latency ms: p50 {percentile(latencies, 0.5):.2f}  "
+            f"p95 {percentile(latencies, 0.95):.2f}  max {latencies[-1] * 1000:.2f}"
+        )
+        self.stdout.write(
+            f"full fan-out ms:     p50 {percentile(fan_out, 0.5):.2f}  "
+            f"p95 {percentile(fan_out, 0.95):.2f}  max {fan_out[-1] * 1000:.2f}"
+        )
+        self.stdout.write(f"memory per connection: {result['bytes_per_connection'] / 1024:.1f} KiB")
+
+    async def _soak(self, subscriber_count, event_count, interval):
+        broker = InProcessBroker()
+        sent_at: dict[int, float] = {}
+        received: list[list[float]] = [[] for _ in range(event_count)]
+        connected = asyncio.Event()
+        ready = 0
+
+        async def subscriber():
+            nonlocal ready
+            stream = event_stream(broker, heartbeat=3600)
+            await anext(stream)  # the retry preamble; subscribed from here on
+            ready += 1
+            if ready == subscriber_count:
+                connected.set()
+            seen = 0
+            try:
+                async for chunk in stream:
+                    now = time.perf_counter()
+                    event = json.loads(chunk.split("data: ", 1)[1])
+                    received[event["seq"]].append(now)
+                    seen += 1
+                    if seen == event_count:
+                        break
+            finally:
+                await stream.aclose()
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tasks = [asyncio.create_task(subscriber()) for _ in range(subscriber_count)]
+        await connected.wait()
+        bytes_per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / subscriber_count
+        tracemalloc.stop()
+
+        def publisher():
+            for seq in range(event_count):
+                sent_at[seq] = time.perf_counter()
+                broker.publish([{"type": "bench", "seq": seq}])
+                time.sleep(interval)
+
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout=60 + event_count * interval)
+        except asyncio.TimeoutError:
+            for task in tasks:
+                task.cancel()
+        thread.join()
+
+        latencies = [
+            receipt - sent_at[seq] for seq, receipts in enumerate(received) for receipt in receipts
+        ]
+        fan_out = [max(receipts) - sent_at[seq] for seq, receipts in enumerate(received) if receipts]
+        return {
+            "latencies": latencies or [0.0],
+            "fan_out": fan_out or [0.0],
+            "missing": subscriber_count * event_count - len(latencies),
+            "bytes_per_connection": bytes_per_connection,
+        }
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from ops.benchmarks import rolled_back, seed_fleet, seed_manager, seed_operation
+from ops.services import forget_operation_overview
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test operation_overview with and without the operation block "
+        "cache and report requests per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300)
+        parser.add_argument("--ships", type=int, default=20)
+        parser.add_argument("--crew", type=int, default=3, help="Names per role and ship.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with rolled_back():
+                seed_operation(seed_fleet(options["ships"], 1), crew_per_role=options["crew"])
+                client = Client()
+                client.force_login(seed_manager())
+                url = reverse("operation_overview")
+                self.stdout.write(f"{'mode':>8} {'req/s':>10} {'ms/req':>10}")
+                for mode, timeout in (("uncached", 0), ("cached", 300)):
+                    forget_operation_overview()
+                    with override_settings(OPS_OVERVIEW_CACHE_TIMEOUT=timeout):
+                        client.get(url)
+                        started = time.perf_counter()
+                        for _ in range(options["requests"]):
+                            client.get(url)
+                        elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{mode:>8} {options['requests'] / elapsed:>10.1f} "
+                        f"{elapsed * 1000 / options['requests']:>10.2f}"
+                    )
+        finally:
+            teardown_test_environment()
+
@@ -0,0 +1,81 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from ckfr_site.static_bundles import bundle_sizes
+from ops.benchmarks import rolled_back, seed_fleet, seed_manager, seed_operation, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the bytes each page saves now that its scripts and styles are "
+        "cacheable static bundles instead of inline blocks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ships", type=int, default=10)
+        parser.add_argument("--slots", type=int, default=6)
+        parser.add_argument("--users", type=int, default=50)
+
+    def handle(self, *args, **options):
+        bench_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            OPS_OVERVIEW_CACHE_TIMEOUT=0,
+            # Source names, so the bundles can be found whether or not
+            # collectstatic ran.
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+                },
+            },
+        )
+        with rolled_back(), bench_settings:
+            ships = seed_fleet(options["ships"], options["slots"])
+            seed_users(options["users"])
+            seed_operation(ships[:5])
+            client = Client()
+            client.force_login(seed_manager())
+            urls = {
+                "ships_allocation": reverse("ships_allocation"),
+                "ship_detail": reverse("ship_detail", args=[ships[0].pk]),
+                "operation_overview": reverse("operation_overview"),
+                "operations_manage": reverse("operations_manage"),
+                "my_assignments": reverse("my_assignments"),
+            }
+            pages = {view: client.get(url).content.decode() for view, url in urls.items()}
+
+        pattern = re.compile(r'(?:src|href)="%s([^"?#]+)"' % re.escape(settings.STATIC_URL))
+        sizes = {}
+        self.stdout.write(
+            f"{'view':>20} {'html KiB':>9} {'bundles':>8} {'saved/view KiB':>15} "
+            f"{'1st view KiB':>13}"
+        )
+        for view, html in pages.items():
+            names = [name for name in pattern.findall(html) if name.endswith((".js", ".css"))]
+            for name in names:
+                if name not in sizes:
+                    sizes[name] = bundle_sizes(name)
+            found = [name for name in names if sizes[name]]
+            # Each include used to inline its block into every response, repeats
+            # included; the bundles now cost one brotli download per deploy.
+            inline = sum(sizes[name]["source"] for name in found)
+            first_view = sum(sizes[name]["brotli"] for name in set(found))
+            self.stdout.write(
+                f"{view:>20} {len(html.encode()) / 1024:>9.1f} {len(set(found)):>8} "
+                f"{inline / 1024:>15.1f} {first_view / 1024:>13.1f}"
+            )
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'bundle':>30} {'source':>8} {'minified':>9} {'gzip':>7} {'brotli':>7}"
+        )
+        for name, measured in sorted(sizes.items()):
+            if measured:
+                self.stdout.write(
+                    f"{name:>30} {measured['source']:>8} {measured['minified']:>9} "
+                    f"{measured['gzip']:>7} {measured['brotli']:>7}"
+                )
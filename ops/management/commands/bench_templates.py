@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from ckfr_site.template_cache import project_template_names, reset, warm_up
+from ops.benchmarks import measure, rolled_back, seed_fleet, seed_manager, seed_operation, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare cold (templates parsed on the request) and warm (compiled "
+        "templates reused) render times of the heavy ops pages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ships", type=int, default=20)
+        parser.add_argument("--slots", type=int, default=6)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not settings.TEMPLATE_CACHE:
+            self.stdout.write(self.style.WARNING("TEMPLATE_CACHE is off: every render is cold."))
+        reset()
+        started = time.perf_counter()
+        warm_up()
+        self.stdout.write(
+            f"warm-up: {len(project_template_names())} templates in "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+        bench_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            OPS_OVERVIEW_CACHE_TIMEOUT=0,
+        )
+        with rolled_back(), bench_settings:
+            ships = seed_fleet(options["ships"], options["slots"])
+            seed_users(options["users"])
+            seed_operation(ships[:5])
+            client = Client()
+            client.force_login(seed_manager())
+            urls = {
+                "ships_allocation": reverse("ships_allocation") + "?full=1",
+                "ship_detail": reverse("ship_detail", args=[ships[0].pk]),
+                "operations_manage": reverse("operations_manage"),
+                "operation_overview": reverse("operation_overview"),
+            }
+
+            self.stdout.write(f"{'view':>20} {'cold ms':>10} {'warm ms':>10} {'saved ms':>10}")
+            for view, url in urls.items():
+
+                def cold():
+                    reset()
+                    return client.get(url).content
+
+                cold_run = measure(cold, repeat=options["repeat"])
+                warm_run = measure(lambda: client.get(url).content, repeat=options["repeat"])
+                self.stdout.write(
+                    f"{view:>20} {cold_run['ms']:>10.1f} {warm_run['ms']:>10.1f} "
+                    f"{cold_run['ms'] - warm_run['ms']:>10.1f}"
+                )
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from ops.benchmarks import (
+    SCALES,
+    compare_results,
+    measure,
+    rolled_back,
+    seed_fleet,
+    seed_manager,
+    seed_operation,
+    seed_users,
+)
+
+SLOTS_PER_SHIP = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure query count, render time and response size of every ops view "
+        "at several fleet scales, optionally against a JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--baseline", help="JSON results of a previous run to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown against the baseline, as a fraction (default 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        bench_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            OPS_OVERVIEW_CACHE_TIMEOUT=0,
+        )
+        for scale in options["scales"]:
+            with rolled_back(), bench_settings:
+                results[scale] = self._run_scale(SCALES[scale], options["repeat"])
+
+        self.stdout.write(f"{'scale':>7} {'view':>20} {'ms':>10} {'KiB':>10} {'queries':>8}")
+        for scale, views in results.items():
+            for view, measured in views.items():
+                self.stdout.write(
+                    f"{scale:>7} {view:>20} {measured['ms']:>10.1f} "
+                    f"{measured['bytes'] / 1024:>10.1f} {measured['queries']:>8}"
+                )
+
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps({"scales": SCALES, "results": results}, indent=2), encoding="utf-8"
+            )
+
+        baseline = None
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))["results"]
+        problems = compare_results(results, baseline, threshold=options["threshold"])
+        if problems:
+            raise CommandError("Benchmark regressions:\n" + "\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("No regression detected."))
+
+    @staticmethod
+    def _run_scale(scale, repeat):
+        ships = seed_fleet(max(scale["slots"] // SLOTS_PER_SHIP, 1), SLOTS_PER_SHIP)
+        seed_users(scale["users"])
+        seed_operation(ships[: scale["highlighted"]])
+        client = Client()
+        client.force_login(seed_manager())
+
+        urls = {
+            "ships_allocation": reverse("ships_allocation"),
+            "ship_detail": reverse("ship_detail", args=[ships[0].pk]),
+            "operation_overview": reverse("operation_overview"),
+            "operations_manage": reverse("operations_manage"),
+            "ships_list": reverse("ships_list"),
+        }
+        measured = {}
+        for view, url in urls.items():
+            client.get(url)
+            measured[view] = measure(lambda: client.get(url).content, repeat=repeat)
+        return measured
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from ops.cache import reset_stats, stats
+
+class Command(BaseCommand):
+    help = "Show the cache hits and misses of each ops cache namespace."
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+    def handle(self, *args, **options):
+        for name, counts in stats().items():
+            total = counts["hits"] + counts["misses"]
+            ratio = f"{100 * counts['hits'] / total:.1f}%" if total else "-"
+            self.stdout.write(f"{name:<12} hits={counts['hits']:<8} misses={counts['misses']:<8} hit rate={ratio}")
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from ops.models import Ship
+
+class Command(BaseCommand):
+    help = "Recompute the stored filter category of every ship (run after FILTER_TREE changes)."
+    def handle(self, *args, **kwargs):
+        changed = [
+            ship
+            for ship in Ship.objects.only("pk", "role", "category", "filter_category", "filter_subcategory")
+            if ship.apply_classification()
+        ]
+        Ship.objects.bulk_update(changed, ["filter_category", "filter_subcategory"], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f"{len(changed)} ship(s) reclassified."))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from ops.catalog import CatalogPlan, catalog_hash, load_entries, normalize_entry
+from ops.models import ShipCatalogImport
+
+class Command(BaseCommand):
+    help = "Import the ship catalog (bundled module, CSV or JSON file) with a bulk upsert."
+    def add_arguments(self, parser):
+        parser.add_argument("source", nargs="?", help="Path to a .csv or .json catalog (defaults to the bundled catalog).")
+        parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them.")
+        parser.add_argument("--force", action="store_true", help="Diff the catalog even if its hash was already imported, e.g. after editing ships by hand.")
+        parser.add_argument("--batch-size", type=int, default=200)
+    def handle(self, *args, source=None, dry_run=False, force=False, batch_size=200, **kwargs):
+        try:
+            ships = [normalize_entry(entry) for entry in load_entries(source)]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read catalog: {exc}") from exc
+
+        # Checked before the plan, which reads and diffs the whole Ship table
+        content_hash = catalog_hash(ships)
+        last = ShipCatalogImport.objects.only("content_hash").first()
+        if not force and last and last.content_hash == content_hash:
+            self.stdout.write(f"Catalog {content_hash[:12]} already imported; nothing to do.")
+            return
+
+        plan = CatalogPlan(ships)
+
+        for ship in plan.to_create:
+            self.stdout.write(f"+ {ship.name}")
+        for name, fields in plan.changes.items():
+            self.stdout.write(f"~ {name} ({', '.join(fields)})")
+        summary = (
+            f"{len(plan.to_create)} created, {len(plan.to_update)} updated, "
+            f"{plan.unchanged} unchanged, {len(plan.not_in_catalog)} not in catalog."
+        )
+        if dry_run:
+            self.stdout.write(f"Dry run: {summary}")
+            return
+
+        plan.apply(batch_size=batch_size)
+        ShipCatalogImport.objects.create(
+            content_hash=plan.content_hash,
+            source=source or "ops.data.ships_catalog",
+            created_count=len(plan.to_create),
+            updated_count=len(plan.to_update),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Catalog imported: {summary}"))
@@ -0,0 +1,8 @@
+from django.core.management.base import BaseCommand
+from ops.slots import recount_seats
+
+class Command(BaseCommand):
+    help = "Recompute the per-ship seat counters from the role slots and repair any drift."
+    def handle(self, *args, **kwargs):
+        fixed = recount_seats()
+        self.stdout.write(self.style.SUCCESS(f"{fixed} ship(s) had drifted seat counters."))
@@ -1,5 +1,9 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from ops.catalog import DERIVED_FIELDS
+from ops.forms import forget_ship_choices
 from ops.models import Ship, ShipRoleTemplate
+from ops.slots import materialize_slots
 
 STARTERS = [
     ("Anvil Arrow", "LF"), ("Aegis Gladius", "LF"), ("Anvil Hawk", "LF"),
@@ -24,12 +28,48 @@ CATEGORY_ROLES = {
 class Command(BaseCommand):
     help = "Seed minimal ship list with categories and generic role templates."
     def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            ships = self._seed_ships()
+            templates = self._seed_templates(ships)
+            created = materialize_slots(templates)
+            # Bulk writes skip the Ship signals that drop the cached choices.
+            forget_ship_choices()
+        self.stdout.write(self.style.SUCCESS(f"Seed complete ({created} slots created)."))
+
+    def _seed_ships(self):
+        existing = Ship.objects.in_bulk([name for name, _ in STARTERS], field_name="name")
+        new_ships = [
+            Ship(name=name, category=cat, min_crew=1, max_crew=2)
+            for name, cat in STARTERS
+            if name not in existing
+        ]
+        # bulk_create skips Ship.save(), which fills the filter and SCU columns
+        for ship in new_ships:
+            ship.apply_derived_fields()
+        Ship.objects.bulk_create(new_ships, ignore_conflicts=True)
+        ships = Ship.objects.in_bulk([name for name, _ in STARTERS], field_name="name")
+        changed = []
         for name, cat in STARTERS:
-            ship, _ = Ship.objects.get_or_create(name=name, defaults={"category": cat, "min_crew": 1, "max_crew": 2})
+            ship = ships[name]
             if ship.category != cat:
                 ship.category = cat
-                ship.save(update_fields=["category"])
-            if ship.role_templates.count() == 0:
-                for role, slots in CATEGORY_ROLES.get(cat, [("Pilote",1)]):
-                    ShipRoleTemplate.objects.get_or_create(ship=ship, role_name=role, defaults={"slots": slots})
-        self.stdout.write(self.style.SUCCESS("Seed complete."))
+                ship.apply_derived_fields()
+                changed.append(ship)
+        Ship.objects.bulk_update(changed, ["category", *DERIVED_FIELDS])
+        return ships
+
+    def _seed_templates(self, ships):
+        with_templates = set(
+            ShipRoleTemplate.objects.filter(ship__in=ships.values()).values_list("ship_id", flat=True)
+        )
+        ShipRoleTemplate.objects.bulk_create(
+            [
+                ShipRoleTemplate(ship=ship, role_name=role, slots=slots)
+                for ship in ships.values()
+                if ship.pk not in with_templates
+                for role, slots in CATEGORY_ROLES.get(ship.category, [("Pilote", 1)])
+            ],
+            ignore_conflicts=True,
+        )
+        # bulk_create skips post_save, so the slots are materialised in one go
+        return ShipRoleTemplate.objects.filter(ship__in=ships.values())
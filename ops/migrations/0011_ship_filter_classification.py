@@ -0,0 +1,166 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:55
+
+from django.db import migrations, models
+
+# Filter keywords at the time of this migration, in priority order.
+_KEYWORDS = [
+    (
+        "military",
+        "chasseur",
+        (
+            "fighter",
+            "stealth",
+            "combat",
+            "interceptor",
+            "racing",
+            "patrol",
+            "escort",
+            "pursuit",
+        ),
+    ),
+    (
+        "military",
+        "capitaux",
+        (
+            "destroyer",
+            "frigate",
+            "corvette",
+            "carrier",
+            "dread",
+            "capital",
+            "battle",
+            "battleship",
+        ),
+    ),
+    ("military", "gunship", ("gunship",)),
+    ("military", "bomber", ("bomber",)),
+    ("military", "torpilleur", ("torpedo", "torp")),
+    (
+        "military",
+        "interdicteur",
+        (
+            "interdict",
+            "interdiction",
+            "minelayer",
+            "quantum enforcement",
+            "quantum damp",
+        ),
+    ),
+    (
+        "military",
+        "dropship",
+        (
+            "dropship",
+            "drop ship",
+            "boarding",
+            "troop",
+            "personnel",
+            "assault",
+        ),
+    ),
+    ("industrial", "salvage", ("salvage", "scrap")),
+    ("industrial", "minage", ("mining", "prospecting", "refinery")),
+    (
+        "industrial",
+        "hauling",
+        (
+            "freight",
+            "cargo",
+            "hauling",
+            "transport",
+            "courier",
+            "logistics",
+            "delivery",
+            "carrier",
+            "merchant",
+            "mercantile",
+            "trader",
+            "commerce",
+        ),
+    ),
+    ("support", "medical", ("medical", "rescue", "hospital", "med", "triage")),
+    ("support", "refuel", ("refuel", "fuel")),
+    ("support", "repair", ("repair", "service", "tow", "tractor")),
+    (
+        "support",
+        "exploration",
+        (
+            "explor",
+            "expedition",
+            "pathfinder",
+            "science",
+            "survey",
+            "touring",
+            "recon",
+            "scout",
+            "reporting",
+            "data",
+            "observation",
+        ),
+    ),
+]
+
+_CATEGORY_FALLBACK = {
+    "LF": ("military", "chasseur"),
+    "MF": ("military", "chasseur"),
+    "HF": ("military", "chasseur"),
+    "CAP": ("military", "capitaux"),
+    "MR": ("support", "exploration"),
+}
+
+
+def _classify(role, category):
+    text = (role or "").lower()
+    for cat_slug, sub_slug, keywords in _KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return cat_slug, sub_slug
+    return _CATEGORY_FALLBACK.get(category, ("", ""))
+
+
+def classify_existing_ships(apps, schema_editor):
+    Ship = apps.get_model("ops", "Ship")
+
+    ships = list(Ship.objects.only("pk", "role", "category"))
+    for ship in ships:
+        ship.filter_category, ship.filter_subcategory = _classify(ship.role, ship.category)
+    Ship.objects.bulk_update(
+        ships, ["filter_category", "filter_subcategory"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0010_remove_operationhighlightedship_gunner_name_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ship",
+            name="filter_category",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=32,
+                verbose_name="Catégorie de filtre",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ship",
+            name="filter_subcategory",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=32,
+                verbose_name="Sous-catégorie de filtre",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ship",
+            index=models.Index(
+                fields=["filter_category", "filter_subcategory"],
+                name="ops_ship_filter_idx",
+            ),
+        ),
+        migrations.RunPython(classify_existing_ships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0011_ship_filter_classification"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShipCatalogImport",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        db_index=True, max_length=64, verbose_name="Empreinte"
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(blank=True, max_length=255, verbose_name="Source"),
+                ),
+                (
+                    "created_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Créés"),
+                ),
+                (
+                    "updated_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Mis à jour"),
+                ),
+                (
+                    "imported_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Importé le"),
+                ),
+            ],
+            options={
+                "verbose_name": "Import du catalogue",
+                "verbose_name_plural": "Imports du catalogue",
+                "ordering": ("-imported_at", "-id"),
+            },
+        ),
+    ]
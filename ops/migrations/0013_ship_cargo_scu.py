@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:03
+
+import re
+
+from django.db import migrations, models
+
+
+def _parse_scu(value):
+    cleaned = re.sub(r"[\s,]|scu$", "", (value or "").strip().lower())
+    return int(cleaned) if cleaned.isdecimal() else None
+
+
+def parse_existing_cargo(apps, schema_editor):
+    Ship = apps.get_model("ops", "Ship")
+
+    ships = list(Ship.objects.only("pk", "cargo_capacity"))
+    for ship in ships:
+        ship.cargo_scu = _parse_scu(ship.cargo_capacity)
+    Ship.objects.bulk_update(ships, ["cargo_scu"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0012_ship_catalog_import"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ship",
+            name="cargo_scu",
+            field=models.PositiveIntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="Soute numérique (SCU)",
+            ),
+        ),
+        migrations.RunPython(parse_existing_cargo, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0013_ship_cargo_scu"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="roleslot",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Version"
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:14
+
+from django.db import migrations, models
+
+
+def count_existing_seats(apps, schema_editor):
+    RoleSlot = apps.get_model("ops", "RoleSlot")
+    Ship = apps.get_model("ops", "Ship")
+
+    from django.db.models import Count
+
+    fields = {
+        "open": "seats_open",
+        "assigned": "seats_assigned",
+        "confirmed": "seats_confirmed",
+    }
+    counts = {}
+    rows = (
+        RoleSlot.objects.values_list("ship_id", "status")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    for ship_id, status, count in rows:
+        ship_counts = counts.setdefault(ship_id, dict.fromkeys(["seats_total", *fields.values()], 0))
+        ship_counts["seats_total"] += count
+        ship_counts[fields.get(status, "seats_open")] += count
+
+    ships = list(Ship.objects.filter(pk__in=counts))
+    for ship in ships:
+        for field, value in counts[ship.pk].items():
+            setattr(ship, field, value)
+    Ship.objects.bulk_update(
+        ships, ["seats_total", *fields.values()], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0014_roleslot_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ship",
+            name="seats_assigned",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Places assignées"
+            ),
+        ),
+        migrations.AddField(
+            model_name="ship",
+            name="seats_confirmed",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Places confirmées"
+            ),
+        ),
+        migrations.AddField(
+            model_name="ship",
+            name="seats_open",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Places libres"
+            ),
+        ),
+        migrations.AddField(
+            model_name="ship",
+            name="seats_total",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Places"
+            ),
+        ),
+        migrations.RunPython(count_existing_seats, migrations.RunPython.noop),
+    ]
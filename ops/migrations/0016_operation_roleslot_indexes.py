@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def keep_latest_active_operation(apps, schema_editor):
+    Operation = apps.get_model("ops", "Operation")
+    latest = Operation.objects.filter(is_active=True).order_by("-updated_at", "-pk").first()
+    if latest is not None:
+        Operation.objects.filter(is_active=True).exclude(pk=latest.pk).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0015_ship_seat_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="operation",
+            index=models.Index(
+                fields=["-updated_at"], name="ops_operation_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="roleslot",
+            index=models.Index(
+                fields=["user", "status"], name="ops_roleslot_user_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="roleslot",
+            index=models.Index(
+                fields=["status", "ship"], name="ops_roleslot_status_ship_idx"
+            ),
+        ),
+        migrations.RunPython(keep_latest_active_operation, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="operation",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("is_active",),
+                name="ops_operation_single_active",
+            ),
+        ),
+    ]
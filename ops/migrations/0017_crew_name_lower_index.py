@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0016_operation_roleslot_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="operationhighlightedcrewassignment",
+            index=models.Index(
+                django.db.models.functions.text.Lower("crew_name"),
+                name="ops_crew_name_lower_idx",
+            ),
+        ),
+    ]
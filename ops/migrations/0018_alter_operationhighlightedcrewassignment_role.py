@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ops", "0017_crew_name_lower_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="operationhighlightedcrewassignment",
+            name="role",
+            field=models.CharField(
+                choices=[
+                    ("gunner", "Gunner"),
+                    ("infantry", "À pied"),
+                    ("pilot", "Pilote"),
+                    ("torpedo", "Torpille"),
+                ],
+                max_length=16,
+                verbose_name="Rôle",
+            ),
+        ),
+    ]
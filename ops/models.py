@@ -1,5 +1,9 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
+
+from .catalog import parse_scu
+from .classification import category_label, classify, subcategory_label
 
 
 class Operation(models.Model):
@@ -20,11 +24,30 @@ class Operation(models.Model):
     class Meta:
         verbose_name = "Opération"
         verbose_name_plural = "Opérations"
+        indexes = [
+            models.Index(fields=["-updated_at"], name="ops_operation_updated_idx"),
+        ]
+        constraints = [
+            # At most one active operation; the partial index also makes the
+            # lookups on ``is_active=True`` a single index probe.
+            models.UniqueConstraint(
+                fields=["is_active"],
+                condition=models.Q(is_active=True),
+                name="ops_operation_single_active",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
-        if self.is_active:
-            Operation.objects.exclude(pk=self.pk).update(is_active=False)
-        super().save(*args, **kwargs)
+        if not self.is_active:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            # Touches the previously active row only, found through the
+            # partial unique index.
+            Operation.objects.filter(is_active=True).exclude(pk=self.pk).update(
+                is_active=False
+            )
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -35,6 +58,9 @@ class Ship(models.Model):
     manufacturer = models.CharField("Constructeur", max_length=80, blank=True)
     role = models.CharField("Type", max_length=120, blank=True)
     cargo_capacity = models.CharField("Soute (SCU)", max_length=32, blank=True)
+    cargo_scu = models.PositiveIntegerField(
+        "Soute numérique (SCU)", null=True, blank=True, editable=False, db_index=True
+    )
     CATEGORY_CHOICES = [
         ("LF", "Chasseur léger"),
         ("MF", "Chasseur moyen"),
@@ -50,10 +76,68 @@ class Ship(models.Model):
     )
     min_crew = models.PositiveSmallIntegerField("Équipage minimum", default=1)
     max_crew = models.PositiveSmallIntegerField("Équipage maximum")
+    filter_category = models.CharField(
+        "Catégorie de filtre", max_length=32, blank=True, editable=False
+    )
+    filter_subcategory = models.CharField(
+        "Sous-catégorie de filtre", max_length=32, blank=True, editable=False
+    )
+    # Seat counters kept in step with RoleSlot by ops.signals/ops.slots;
+    # ``manage.py recount_seats`` repairs any drift.
+    seats_total = models.PositiveIntegerField("Places", default=0, editable=False)
+    seats_open = models.PositiveIntegerField("Places libres", default=0, editable=False)
+    seats_assigned = models.PositiveIntegerField("Places assignées", default=0, editable=False)
+    seats_confirmed = models.PositiveIntegerField("Places confirmées", default=0, editable=False)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.apply_derived_fields() and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                "filter_category",
+                "filter_subcategory",
+                "cargo_scu",
+            }
+        super().save(*args, **kwargs)
+
+    def apply_derived_fields(self) -> bool:
+        """Refresh the indexed columns derived from the editable fields.
+
+        Return True when any of them changed.
+        """
+
+        classification_changed = self.apply_classification()
+        cargo_scu = parse_scu(self.cargo_capacity)
+        cargo_changed = cargo_scu != self.cargo_scu
+        self.cargo_scu = cargo_scu
+        return classification_changed or cargo_changed
+
+    def apply_classification(self) -> bool:
+        """Store the filter slugs derived from ``role``/``category``.
+
+        Return True when the stored classification changed.
+        """
+
+        cat_slug, sub_slug = classify(self.role, self.category)
+        cat_slug, sub_slug = cat_slug or "", sub_slug or ""
+        changed = (cat_slug, sub_slug) != (self.filter_category, self.filter_subcategory)
+        self.filter_category, self.filter_subcategory = cat_slug, sub_slug
+        return changed
+
+    @property
+    def filter_category_label(self) -> str | None:
+        return category_label(self.filter_category)
+
+    @property
+    def filter_subcategory_label(self) -> str | None:
+        return subcategory_label(self.filter_subcategory)
+
+    @property
+    def seats_filled(self) -> int:
+        return self.seats_assigned + self.seats_confirmed
+
     @property
     def crew_range_display(self) -> str:
         """Return a human-readable crew range for display templates."""
@@ -65,6 +149,12 @@ class Ship(models.Model):
     class Meta:
         verbose_name = "Vaisseau"
         verbose_name_plural = "Vaisseaux"
+        indexes = [
+            models.Index(
+                fields=["filter_category", "filter_subcategory"],
+                name="ops_ship_filter_idx",
+            ),
+        ]
 
 
 class ShipRoleTemplate(models.Model):
@@ -117,11 +207,29 @@ class RoleSlot(models.Model):
         default="open",
         choices=STATUS_CHOICES,
     )
+    # Bumped by ``ops.slots.update_role_slots`` on every assignment change so
+    # concurrent planners cannot silently overwrite each other.
+    version = models.PositiveIntegerField("Version", default=0, editable=False)
 
     class Meta:
+        # The unique index also serves lookups by ``(ship, role_name)`` and
+        # per-ship ordering by ``(role_name, index)``.
         unique_together = ("ship", "role_name", "index")
         verbose_name = "Place de rôle"
         verbose_name_plural = "Places de rôle"
+        indexes = [
+            models.Index(fields=["user", "status"], name="ops_roleslot_user_status_idx"),
+            models.Index(fields=["status", "ship"], name="ops_roleslot_status_ship_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the seat counters currently account for.
+        instance._counted_as = (instance.__dict__.get("ship_id"), instance.__dict__.get("status"))
+        # ...and whose cached "my assignments" list shows this seat.
+        instance._held_by = instance.__dict__.get("user_id")
+        return instance
 
     def __str__(self):
         who = self.user.get_username() if self.user else "libre"
@@ -210,7 +318,29 @@ class OperationHighlightedCrewAssignment(models.Model):
         ordering = ("highlighted_ship", "role", "order", "id")
         verbose_name = "Assignation de rôle"
         verbose_name_plural = "Assignations de rôle"
+        indexes = [
+            # Members find their own entries by case-insensitive name.
+            models.Index(Lower("crew_name"), name="ops_crew_name_lower_idx"),
+        ]
 
     def __str__(self) -> str:
         role_label = OperationHighlightedShip.get_role_label(self.role)
-        return f"{self.highlighted_ship} · {role_label} → {self.crew_name}"
\ No newline at end of file
+        return f"{self.highlighted_ship} · {role_label} → {self.crew_name}"
+
+
+class ShipCatalogImport(models.Model):
+    """Records each applied ship catalog import and its content hash."""
+
+    content_hash = models.CharField("Empreinte", max_length=64, db_index=True)
+    source = models.CharField("Source", max_length=255, blank=True)
+    created_count = models.PositiveIntegerField("Créés", default=0)
+    updated_count = models.PositiveIntegerField("Mis à jour", default=0)
+    imported_at = models.DateTimeField("Importé le", auto_now_add=True)
+
+    class Meta:
+        ordering = ("-imported_at", "-id")
+        verbose_name = "Import du catalogue"
+        verbose_name_plural = "Imports du catalogue"
+
+    def __str__(self) -> str:
+        return f"{self.imported_at:%Y-%m-%d %H:%M} · {self.content_hash[:12]}"
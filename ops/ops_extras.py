@@ -1,12 +1,12 @@
 from django import template
 
-from ..utils import get_ordered_user_queryset
+from .utils import ordered_user_choices
 
 register = template.Library()
 
 
 @register.simple_tag
 def ordered_users():
-    """Expose the ordered user queryset to templates."""
+    """Expose the ordered ``(pk, label)`` user choices to templates."""
 
-    return get_ordered_user_queryset()
\ No newline at end of file
+    return ordered_user_choices()
@@ -1,17 +1,62 @@
-"""Permission helpers for operations related views."""
+"""Permission helpers for operations related views.
+
+Every check is answered from the set of group names of the user, loaded once
+and memoised on the user instance. Since ``request.user`` is rebuilt for each
+request, this gives one group query per request however many checks the
+context processor, decorators and views run. Setting
+``OPS_PERMISSION_CACHE_TIMEOUT`` to a positive number of seconds additionally
+keeps the set in the cache between requests; ``ops.signals`` drops it whenever
+the memberships of a user change.
+"""
 
 from __future__ import annotations
 
 from typing import Iterable
 
+from .cache import PERMISSIONS
+
 MANAGER_GROUPS: tuple[str, ...] = ("Admin", "SuperAdmin")
 MEMBER_GROUPS: tuple[str, ...] = MANAGER_GROUPS + ("Membre",)
 
+_GROUP_NAMES_ATTR = "_ops_group_names"
+
 
 def _is_authenticated_user(user) -> bool:
     return getattr(user, "is_authenticated", False)
 
 
+def get_user_group_names(user) -> frozenset[str]:
+    """Return the names of the user's groups, querying at most once per user."""
+
+    if not _is_authenticated_user(user):
+        return frozenset()
+
+    names = getattr(user, _GROUP_NAMES_ATTR, None)
+    if names is not None:
+        return names
+
+    names = PERMISSIONS.get_or_set(
+        ("groups", user.pk), lambda: frozenset(user.groups.values_list("name", flat=True))
+    )
+
+    setattr(user, _GROUP_NAMES_ATTR, names)
+    return names
+
+
+def forget_user_group_names(user=None, *, user_ids: Iterable = ()) -> None:
+    """Drop memoised and cached group names after a membership change."""
+
+    if user is not None:
+        user.__dict__.pop(_GROUP_NAMES_ATTR, None)
+    if not PERMISSIONS.enabled:
+        return
+
+    user_ids = set(user_ids)
+    if user is not None:
+        user_ids.add(user.pk)
+    PERMISSIONS.delete_many(("groups", user_id) for user_id in user_ids)
+
+
 def user_in_groups(user, groups: Iterable[str]) -> bool:
     """Return True if the user belongs to one of the provided groups."""
 
@@ -19,7 +64,7 @@ def user_in_groups(user, groups: Iterable[str]) -> bool:
         return False
     if getattr(user, "is_superuser", False):
         return True
-    return user.groups.filter(name__in=list(groups)).exists()
+    return not get_user_group_names(user).isdisjoint(groups)
 
 
 def can_manage_ops(user) -> bool:
@@ -47,6 +92,8 @@ def is_operations_member_only(user) -> bool:
 __all__ = [
     "can_manage_ops",
     "can_access_member_home",
+    "forget_user_group_names",
+    "get_user_group_names",
     "is_operations_member_only",
     "user_in_groups",
-]
\ No newline at end of file
+]
@@ -1,13 +1,27 @@
 """High level helpers for preparing ship allocation data."""
 
 from collections import OrderedDict
-from typing import Iterable, List, Sequence, Tuple
+from typing import Iterable, List, Mapping, Sequence, Tuple
 
-from django.db.models import Prefetch, QuerySet
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, QuerySet, Sum
+from django.db.models.functions import Lower
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 
+from .cache import ASSIGNMENTS, OPERATION
 from .constants import STATUS_BADGES
-from .forms import RoleSlotForm
-from .models import RoleSlot, Ship
+from .forms import RoleSlotForm, SharedUserChoices
+from .live import crew_changed
+from .models import (
+    Operation,
+    OperationHighlightedCrewAssignment,
+    OperationHighlightedShip,
+    RoleSlot,
+    Ship,
+    ShipRoleTemplate,
+)
 
 ShipCategoryGrouping = List[Tuple[str, List[Ship]]]
 
@@ -18,18 +32,38 @@ def ships_with_slots() -> QuerySet[Ship]:
     return Ship.objects.prefetch_related(
         Prefetch(
             "role_slots",
-            queryset=RoleSlot.objects.select_related("user").order_by("role_name", "index"),
+            # Leading with ``ship`` lets the unique (ship, role_name, index)
+            # index return the rows already sorted.
+            queryset=RoleSlot.objects.select_related("user").order_by(
+                "ship", "role_name", "index"
+            ),
         )
     )
 
 
+def allocation_ships(*, category: str | None = None, hide_empty: bool = False) -> QuerySet[Ship]:
+    """Return the ships listed on the allocation page, without their slots."""
+
+    ships = Ship.objects.order_by("name")
+    if category:
+        ships = ships.filter(category=category)
+    if hide_empty:
+        ships = ships.filter(Exists(ShipRoleTemplate.objects.filter(ship=OuterRef("pk"))))
+    return ships
+
+
 def prepare_slots_for_display(
     slots: Iterable[RoleSlot],
     *,
     can_edit: bool,
     user_queryset=None,
+    user_choices: SharedUserChoices | None = None,
 ) -> "OrderedDict[str, List[RoleSlot]]":
-    """Annotate slots for display and group them by role."""
+    """Annotate slots for display and group them by role.
+
+    When ``user_choices`` is given, slot forms render lightweight pickers that
+    reuse the shared option list instead of one full ``<select>`` per slot.
+    """
 
     grouped: "OrderedDict[str, List[RoleSlot]]" = OrderedDict()
     for slot in slots:
@@ -37,6 +71,7 @@ def prepare_slots_for_display(
             slot.form = RoleSlotForm(
                 instance=slot,
                 user_queryset=user_queryset,
+                user_choices=user_choices,
             )
         slot.badge_class = STATUS_BADGES.get(slot.status, STATUS_BADGES["open"])
         grouped.setdefault(slot.role_name, []).append(slot)
@@ -48,6 +83,7 @@ def prepare_ship_for_display(
     *,
     can_edit: bool,
     user_queryset=None,
+    user_choices: SharedUserChoices | None = None,
 ) -> Ship:
     """Attach grouped slot information to the ship instance."""
 
@@ -55,12 +91,47 @@ def prepare_ship_for_display(
         ship.role_slots.all(),
         can_edit=can_edit,
         user_queryset=user_queryset,
+        user_choices=user_choices,
     )
     ship.grouped_slots = list(grouped_slots.items())
     ship.slots_by_role = grouped_slots
     return ship
 
 
+def build_user_choices(user_queryset=None) -> SharedUserChoices:
+    """Return the assignable users shared by every slot picker of a page."""
+
+    return SharedUserChoices(user_queryset)
+
+
+def serialize_slots(slots: Iterable[RoleSlot], *, request, next_url: str = "") -> list[dict]:
+    """Return the JSON payload of updated slots with their re-rendered cards.
+
+    The pickers only carry the selected users; the page's ``user-choices``
+    list fills in the rest client-side, so no full roster query is needed.
+    """
+
+    slots = list(slots)
+    user_choices = SharedUserChoices(slot.user for slot in slots if slot.user_id)
+    prepare_slots_for_display(slots, can_edit=True, user_choices=user_choices)
+    return [
+        {
+            "id": slot.pk,
+            "version": slot.version,
+            "user": slot.user_id,
+            "user_label": user_choices.labels.get(str(slot.user_id)),
+            "status": slot.status,
+            "status_label": slot.get_status_display(),
+            "html": render_to_string(
+                "ops/includes/role_slot_card.html",
+                {"slot": slot, "can_edit": True, "next_url": next_url},
+                request=request,
+            ),
+        }
+        for slot in slots
+    ]
+
+
 def group_ships_by_category(ships: Sequence[Ship]) -> ShipCategoryGrouping:
     """Return ships grouped by category preserving category order."""
 
@@ -77,9 +148,246 @@ def group_ships_by_category(ships: Sequence[Ship]) -> ShipCategoryGrouping:
     ]
 
 
+def forget_operation_overview() -> None:
+    """Drop the cached operation block of the overview page."""
+
+    OPERATION.delete("overview")
+
+
+def highlighted_cargo_capacity(operation: Operation) -> dict[str, int]:
+    """Return the total SCU of an operation's highlighted ships in one query.
+
+    ``total`` sums the known capacities and ``unknown`` counts the ships whose
+    capacity is not a number, so the total can be shown as a lower bound.
+    """
+
+    totals = OperationHighlightedShip.objects.filter(operation=operation).aggregate(
+        total=Sum("ship__cargo_scu"),
+        unknown=Count("pk", filter=Q(ship__cargo_scu__isnull=True)),
+    )
+    return {"total": totals["total"] or 0, "unknown": totals["unknown"]}
+
+
+def render_operation_block(stamp: Operation | None) -> str:
+    """Render the overview operation block, reusing the cached HTML if fresh.
+
+    The cache holds a single ``(pk, updated_at, html)`` entry for the operation
+    currently shown. It is dropped by ``ops.signals`` on every change to an
+    operation, its highlighted ships or their crew, and the stamp check also
+    discards it as soon as another operation becomes current.
+    """
+
+    if stamp is not None:
+        cached = OPERATION.get("overview")
+        if cached is not None and cached[:2] == (stamp.pk, stamp.updated_at):
+            return mark_safe(cached[2])
+
+    operation = None
+    if stamp is not None:
+        operation = (
+            Operation.objects.prefetch_related(
+                "highlighted_ship_links__ship",
+                "highlighted_ship_links__crew_assignments",
+            )
+            .filter(pk=stamp.pk)
+            .first()
+        )
+    context = {"operation": operation}
+    if operation is not None and operation.highlighted_ship_links.all():
+        context["cargo_capacity"] = highlighted_cargo_capacity(operation)
+    html = render_to_string("ops/includes/operation_block.html", context)
+    if operation is not None:
+        OPERATION.set((operation.pk, operation.updated_at, html), "overview")
+    return mark_safe(html)
+
+
+def forget_member_assignments(user_ids: Iterable | None = None) -> None:
+    """Drop the cached assignments of ``user_ids``, or of every user if None.
+
+    Crew entries are matched by name, so a crew change cannot tell whose list
+    it affects and invalidates the whole namespace instead.
+    """
+
+    if user_ids is None:
+        ASSIGNMENTS.invalidate()
+        return
+    ASSIGNMENTS.delete_many((user_id,) for user_id in set(user_ids) if user_id is not None)
+
+
+def member_assignments(user) -> dict[str, list[dict]]:
+    """Return the seats of ``user`` and their crew entries in the active operation.
+
+    Two indexed queries: role slots by ``user`` and crew assignments by the
+    lower-cased username, restricted to the active operation. The result is
+    cached per user for ``OPS_ASSIGNMENTS_CACHE_TIMEOUT`` seconds.
+    """
+
+    return ASSIGNMENTS.get_or_set((user.pk,), lambda: _member_assignments(user))
+
+
+def _member_assignments(user) -> dict[str, list[dict]]:
+    slot_rows = (
+        RoleSlot.objects.filter(user=user)
+        .order_by("ship__name", "role_name", "index")
+        .values_list("pk", "ship_id", "ship__name", "role_name", "index", "status")
+    )
+    crew_rows = (
+        OperationHighlightedCrewAssignment.objects.alias(name=Lower("crew_name"))
+        .filter(name=user.get_username().lower(), highlighted_ship__operation__is_active=True)
+        .order_by("highlighted_ship__ship__name", "role", "order")
+        .values_list(
+            "highlighted_ship__operation_id",
+            "highlighted_ship__operation__title",
+            "highlighted_ship__ship_id",
+            "highlighted_ship__ship__name",
+            "role",
+        )
+    )
+    statuses = dict(RoleSlot.STATUS_CHOICES)
+    slots = [
+        {
+            "id": pk,
+            "ship": ship_id,
+            "ship_name": ship_name,
+            "role": role_name,
+            "index": index,
+            "status": status,
+            "status_label": statuses.get(status, status),
+            "badge_class": STATUS_BADGES.get(status, STATUS_BADGES["open"]),
+        }
+        for pk, ship_id, ship_name, role_name, index, status in slot_rows
+    ]
+    crew = [
+        {
+            "operation": operation_id,
+            "operation_title": title,
+            "ship": ship_id,
+            "ship_name": ship_name,
+            "role": role,
+            "role_label": OperationHighlightedShip.get_role_label(role),
+        }
+        for operation_id, title, ship_id, ship_name, role in crew_rows
+    ]
+    return {"slots": slots, "crew": crew}
+
+
+def reconcile_highlighted_ships(
+    operation: Operation,
+    entries: Mapping[int, Mapping[str, Sequence[str]]],
+) -> None:
+    """Bring the highlighted ships of an operation in line with ``entries``.
+
+    ``entries`` maps ship ids to the crew names listed for each role. The
+    existing links and crew assignments are diffed against it and only the
+    required inserts, updates and deletes are issued, batched per table, so
+    the number of queries does not depend on the number of ships.
+    """
+
+    with transaction.atomic():
+        links = {link.ship_id: link for link in operation.highlighted_ship_links.all()}
+
+        stale_links = [link.pk for ship_id, link in links.items() if ship_id not in entries]
+        if stale_links:
+            OperationHighlightedShip.objects.filter(pk__in=stale_links).delete()
+
+        kept_links = [link.pk for ship_id, link in links.items() if ship_id in entries]
+        new_links = OperationHighlightedShip.objects.bulk_create(
+            [
+                OperationHighlightedShip(operation=operation, ship_id=ship_id)
+                for ship_id in entries
+                if ship_id not in links
+            ]
+        )
+        links.update((link.ship_id, link) for link in new_links)
+
+        existing: dict[tuple[int, str], list[OperationHighlightedCrewAssignment]] = {}
+        if kept_links:
+            for assignment in OperationHighlightedCrewAssignment.objects.filter(
+                highlighted_ship_id__in=kept_links
+            ):
+                existing.setdefault(
+                    (assignment.highlighted_ship_id, assignment.role), []
+                ).append(assignment)
+
+        to_create, to_update, to_delete = [], [], []
+        # Crew names added or removed, to find whose "Mes places" changed
+        touched: set[str] = set()
+        for ship_id, roles in entries.items():
+            link = links[ship_id]
+            for role, _label in OperationHighlightedShip.ROLE_CHOICES:
+                names = list(roles.get(role, []))
+                current = existing.pop((link.pk, role), [])
+                for order, (assignment, name) in enumerate(zip(current, names), start=1):
+                    if assignment.crew_name != name or assignment.order != order:
+                        touched.update((assignment.crew_name, name))
+                        assignment.crew_name = name
+                        assignment.order = order
+                        to_update.append(assignment)
+                to_create.extend(
+                    OperationHighlightedCrewAssignment(
+                        highlighted_ship=link,
+                        role=role,
+                        crew_name=name,
+                        order=order,
+                    )
+                    for order, name in enumerate(names[len(current):], start=len(current) + 1)
+                )
+                touched.update(names[len(current):])
+                to_delete.extend(assignment.pk for assignment in current[len(names):])
+                touched.update(assignment.crew_name for assignment in current[len(names):])
+        # Roles no longer offered by ROLE_CHOICES
+        for leftovers in existing.values():
+            to_delete.extend(assignment.pk for assignment in leftovers)
+            touched.update(assignment.crew_name for assignment in leftovers)
+
+        if to_delete:
+            OperationHighlightedCrewAssignment.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            OperationHighlightedCrewAssignment.objects.bulk_update(
+                to_update, ["crew_name", "order"]
+            )
+        if to_create:
+            OperationHighlightedCrewAssignment.objects.bulk_create(to_create)
+        if stale_links or new_links or to_delete or to_update or to_create:
+            crew_changed.send(
+                sender=OperationHighlightedShip,
+                highlighted_ship_ids=[link.pk for link in links.values()],
+            )
+
+        user_ids = _crew_member_ids(touched)
+
+    # Bulk writes skip the model signals that usually invalidate the overview
+    # and the assignments of the members listed in the changed crews.
+    forget_operation_overview()
+    transaction.on_commit(lambda: forget_member_assignments(user_ids))
+
+
+def _crew_member_ids(names: Iterable[str]) -> list[int]:
+    """Return the ids of the users matching crew ``names``, case-insensitively."""
+
+    names = {name.lower() for name in names}
+    if not names:
+        return []
+    User = get_user_model()
+    return list(
+        User.objects.alias(name=Lower(User.USERNAME_FIELD))
+        .filter(name__in=names)
+        .values_list("pk", flat=True)
+    )
+
+
 __all__ = [
+    "allocation_ships",
+    "build_user_choices",
+    "forget_member_assignments",
+    "forget_operation_overview",
     "group_ships_by_category",
+    "highlighted_cargo_capacity",
+    "member_assignments",
     "prepare_ship_for_display",
     "prepare_slots_for_display",
+    "reconcile_highlighted_ships",
+    "render_operation_block",
+    "serialize_slots",
     "ships_with_slots",
 ]
\ No newline at end of file
@@ -1,18 +1,116 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from .models import ShipRoleTemplate, RoleSlot
-
-def _ensure_slots_for_template(rt: ShipRoleTemplate):
-    existing = set(RoleSlot.objects.filter(ship=rt.ship, role_name=rt.role_name).values_list("index", flat=True))
-    for idx in range(1, rt.slots + 1):
-        if idx not in existing:
-            RoleSlot.objects.create(ship=rt.ship, role_name=rt.role_name, index=idx)
+from .forms import forget_ship_choices
+from .live import crew_changed, queue_crews, queue_slots, slots_changed
+from .models import (
+    Operation,
+    OperationHighlightedCrewAssignment,
+    OperationHighlightedShip,
+    RoleSlot,
+    Ship,
+    ShipRoleTemplate,
+)
+from .permissions import forget_user_group_names
+from .services import forget_member_assignments, forget_operation_overview
+from .slots import count_slot_delete, count_slot_save, materialize_slots, prune_surplus_slots
+from .utils import forget_user_choices
 
 @receiver(post_save, sender=ShipRoleTemplate)
 def template_saved(sender, instance, created, **kwargs):
-    _ensure_slots_for_template(instance)
+    materialize_slots([instance])
+    if not created:
+        prune_surplus_slots([instance])
 
 @receiver(post_delete, sender=ShipRoleTemplate)
 def template_deleted(sender, instance, **kwargs):
-    # No automatic deletion of RoleSlot to avoid losing assignments
-    pass
+    # Only open, unassigned seats are removed to avoid losing assignments
+    prune_surplus_slots(deleted=[instance])
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "pre_clear", "post_clear"}:
+        return
+    forget_user_choices()
+    if not reverse:
+        # user.groups.add/remove/clear(...)
+        forget_user_group_names(instance)
+    elif action == "pre_clear":
+        # group.user_set.clear(): the members are only known before the clear
+        forget_user_group_names(user_ids=instance.user_set.values_list("pk", flat=True))
+    elif pk_set:
+        forget_user_group_names(user_ids=pk_set)
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    # A renamed or deleted group changes the cached names of all its members
+    forget_user_choices()
+    if instance.pk is not None:
+        forget_user_group_names(user_ids=instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Ship)
+@receiver(post_delete, sender=Ship)
+def ship_changed(sender, **kwargs):
+    forget_ship_choices()
+    # The overview block shows the highlighted ships' names and capacities
+    forget_operation_overview()
+
+@receiver(post_save, sender=Operation)
+@receiver(post_delete, sender=Operation)
+@receiver(post_save, sender=OperationHighlightedShip)
+@receiver(post_delete, sender=OperationHighlightedShip)
+@receiver(post_save, sender=OperationHighlightedCrewAssignment)
+@receiver(post_delete, sender=OperationHighlightedCrewAssignment)
+def operation_content_changed(sender, **kwargs):
+    forget_operation_overview()
+    # Crew entries are matched by name: every member's list may be affected
+    forget_member_assignments()
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # A renamed user matches other crew entries
+    forget_member_assignments([instance.pk])
+    if update_fields is None or set(update_fields) != {"last_login"}:
+        # Every login saves last_login, which no picker label shows
+        forget_user_choices()
+
+@receiver(post_delete, sender=get_user_model())
+def user_deleted(sender, **kwargs):
+    forget_user_choices()
+
+@receiver(post_save, sender=RoleSlot)
+def slot_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        count_slot_save(instance, created)
+
+@receiver(post_delete, sender=RoleSlot)
+def slot_deleted(sender, instance, **kwargs):
+    count_slot_delete(instance)
+
+@receiver(post_save, sender=RoleSlot)
+@receiver(post_delete, sender=RoleSlot)
+def slot_changed(sender, instance, **kwargs):
+    queue_slots([instance.pk])
+    if not hasattr(instance, "_held_by") and not kwargs.get("created", True):
+        # Saved without having been loaded: the previous holder is unknown
+        forget_member_assignments()
+    else:
+        forget_member_assignments([getattr(instance, "_held_by", None), instance.user_id])
+    instance._held_by = instance.user_id
+
+@receiver(slots_changed)
+def slots_bulk_changed(sender, slot_ids, user_ids=(), **kwargs):
+    queue_slots(slot_ids)
+    forget_member_assignments(user_ids)
+
+@receiver(post_save, sender=OperationHighlightedCrewAssignment)
+@receiver(post_delete, sender=OperationHighlightedCrewAssignment)
+def crew_assignment_changed(sender, instance, **kwargs):
+    queue_crews([instance.highlighted_ship_id])
+
+@receiver(crew_changed)
+def crews_bulk_changed(sender, highlighted_ship_ids, **kwargs):
+    queue_crews(highlighted_ship_ids)
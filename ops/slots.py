@@ -0,0 +1,402 @@
+"""Bulk maintenance and assignment of role slots.
+
+Every ``ShipRoleTemplate`` owns the seats ``1..slots`` of its role on its ship.
+These helpers reconcile many templates at once with a constant number of
+queries per batch, instead of one INSERT per seat, and apply seat assignments
+with optimistic concurrency on ``RoleSlot.version``. Every write keeps the
+``Ship.seats_*`` counters in step with ``F()`` increments.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from functools import reduce
+from operator import or_
+from typing import Iterable, Mapping, Sequence
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .live import slots_changed
+from .models import RoleSlot, Ship, ShipRoleTemplate
+from .utils import get_ordered_user_queryset
+
+TEMPLATE_BATCH_SIZE = 500
+SLOT_UPDATE_BATCH_SIZE = 200
+
+SEAT_FIELDS = {
+    "open": "seats_open",
+    "assigned": "seats_assigned",
+    "confirmed": "seats_confirmed",
+}
+
+SeatDeltas = dict[int, Counter]
+
+#: Set while prune_surplus_slots deletes seats it counts itself in bulk.
+_bulk_counted: ContextVar[bool] = ContextVar("bulk_counted", default=False)
+
+
+def _batched(items: list, size: int = TEMPLATE_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def apply_seat_deltas(deltas: SeatDeltas) -> None:
+    """Add ``{ship_id: Counter(field=delta)}`` to the ship seat counters.
+
+    Ships sharing the same delta are updated together, so a batch of similar
+    changes costs one UPDATE. Decrements stop at 0: a counter left too low by
+    a write that skipped the signals must not make the next save fail.
+    """
+
+    by_delta: dict[tuple, list[int]] = defaultdict(list)
+    for ship_id, delta in deltas.items():
+        key = tuple(sorted((field, value) for field, value in delta.items() if value))
+        if key:
+            by_delta[key].append(ship_id)
+    for key, ship_ids in by_delta.items():
+        Ship.objects.filter(pk__in=ship_ids).update(
+            **{
+                field: F(field) + value if value > 0 else Greatest(F(field) + value, 0)
+                for field, value in key
+            }
+        )
+
+
+def _seat_delta(status: str, sign: int) -> Counter:
+    return Counter({"seats_total": sign, SEAT_FIELDS.get(status, "seats_open"): sign})
+
+
+def count_slot_save(slot: RoleSlot, created: bool) -> None:
+    """Update the counters after ``slot`` was saved."""
+
+    previous = getattr(slot, "_counted_as", None)
+    deltas: SeatDeltas = defaultdict(Counter)
+    if created:
+        deltas[slot.ship_id].update(_seat_delta(slot.status, 1))
+    elif previous is None or previous[0] is None or previous[1] is None:
+        # Saved without having been loaded: the old state is unknown.
+        recount_seats([slot.ship_id])
+        slot._counted_as = (slot.ship_id, slot.status)
+        return
+    elif previous != (slot.ship_id, slot.status):
+        deltas[previous[0]].update(_seat_delta(previous[1], -1))
+        deltas[slot.ship_id].update(_seat_delta(slot.status, 1))
+    apply_seat_deltas(deltas)
+    slot._counted_as = (slot.ship_id, slot.status)
+
+
+def count_slot_delete(slot: RoleSlot) -> None:
+    """Update the counters after ``slot`` was deleted."""
+
+    if _bulk_counted.get():
+        return
+    ship_id, status = getattr(slot, "_counted_as", None) or (slot.ship_id, slot.status)
+    apply_seat_deltas({ship_id: _seat_delta(status, -1)})
+
+
+def recount_seats(ship_ids: Iterable[int] | None = None) -> int:
+    """Recompute the seat counters from ``RoleSlot`` and return the ships fixed.
+
+    One aggregate query reads every count; only ships whose stored counters
+    drifted are written back.
+    """
+
+    ships = Ship.objects.only("pk", *{"seats_total", *SEAT_FIELDS.values()})
+    slots = RoleSlot.objects.all()
+    if ship_ids is not None:
+        ship_ids = list(ship_ids)
+        ships = ships.filter(pk__in=ship_ids)
+        slots = slots.filter(ship_id__in=ship_ids)
+
+    actual: SeatDeltas = defaultdict(Counter)
+    for ship_id, status, count in (
+        slots.values_list("ship_id", "status").annotate(count=Count("pk")).order_by()
+    ):
+        actual[ship_id].update(
+            {"seats_total": count, SEAT_FIELDS.get(status, "seats_open"): count}
+        )
+
+    fields = ["seats_total", *SEAT_FIELDS.values()]
+    drifted = []
+    for ship in ships:
+        counts = actual.get(ship.pk, Counter())
+        if any(getattr(ship, field) != counts[field] for field in fields):
+            for field in fields:
+                setattr(ship, field, counts[field])
+            drifted.append(ship)
+    Ship.objects.bulk_update(drifted, fields, batch_size=TEMPLATE_BATCH_SIZE)
+    return len(drifted)
+
+
+def missing_slots(templates: Iterable[ShipRoleTemplate]) -> list[RoleSlot]:
+    """Return unsaved ``RoleSlot`` objects for the seats the templates lack."""
+
+    templates = list(templates)
+    if not templates:
+        return []
+
+    existing = set(
+        RoleSlot.objects.filter(
+            ship_id__in={template.ship_id for template in templates},
+            role_name__in={template.role_name for template in templates},
+        ).values_list("ship_id", "role_name", "index")
+    )
+    return [
+        RoleSlot(ship_id=template.ship_id, role_name=template.role_name, index=index)
+        for template in templates
+        for index in range(1, template.slots + 1)
+        if (template.ship_id, template.role_name, index) not in existing
+    ]
+
+
+def materialize_slots(templates: Iterable[ShipRoleTemplate]) -> int:
+    """Create the missing seats of every template and return how many were added."""
+
+    created = 0
+    for batch in _batched(list(templates)):
+        slots = missing_slots(batch)
+        if not slots:
+            continue
+        with transaction.atomic():
+            RoleSlot.objects.bulk_create(slots, ignore_conflicts=True)
+            # bulk_create skips the post_save handlers; new seats are open.
+            apply_seat_deltas(
+                {
+                    ship_id: Counter(seats_total=count, seats_open=count)
+                    for ship_id, count in Counter(slot.ship_id for slot in slots).items()
+                }
+            )
+        created += len(slots)
+    return created
+
+
+def prune_surplus_slots(
+    templates: Iterable[ShipRoleTemplate] = (),
+    *,
+    deleted: Iterable[ShipRoleTemplate] = (),
+) -> int:
+    """Remove unassigned seats no longer covered by their template.
+
+    Seats above ``slots`` of the given ``templates`` and every seat of the
+    ``deleted`` templates are removed, but only while they are still open and
+    without a user so that no assignment is ever lost. Each batch costs the
+    same queries whatever the number of seats removed: one SELECT, Django's
+    delete (a SELECT and a DELETE) and one counter UPDATE per distinct seat
+    delta. The per-row counter updates are skipped and
+    :data:`ops.live.slots_changed` is sent for the whole batch.
+    """
+
+    conditions = [
+        Q(ship_id=template.ship_id, role_name=template.role_name, index__gt=template.slots)
+        for template in templates
+    ]
+    conditions += [
+        Q(ship_id=template.ship_id, role_name=template.role_name) for template in deleted
+    ]
+
+    removed = 0
+    for batch in _batched(conditions):
+        surplus = RoleSlot.objects.filter(reduce(or_, batch), user__isnull=True, status="open")
+        with transaction.atomic():
+            rows = list(surplus.values_list("pk", "ship_id"))
+            if not rows:
+                continue
+            slot_ids = [pk for pk, _ship_id in rows]
+            token = _bulk_counted.set(True)
+            try:
+                deleted_count, _per_model = RoleSlot.objects.filter(
+                    pk__in=slot_ids, user__isnull=True, status="open"
+                ).delete()
+            finally:
+                _bulk_counted.reset(token)
+            per_ship = Counter(ship_id for _pk, ship_id in rows)
+            if deleted_count == len(rows):
+                apply_seat_deltas(
+                    {
+                        ship_id: Counter(seats_total=-count, seats_open=-count)
+                        for ship_id, count in per_ship.items()
+                    }
+                )
+            else:
+                # A seat was taken between the SELECT and the DELETE.
+                recount_seats(per_ship)
+        # Open seats without a user: no member's list changes.
+        slots_changed.send(sender=RoleSlot, slot_ids=slot_ids, user_ids=[])
+        removed += deleted_count
+    return removed
+
+
+class SlotUpdateError(ValueError):
+    """Raised when slot changes are malformed; ``errors`` maps keys to messages."""
+
+    def __init__(self, errors: Mapping[str, str]):
+        super().__init__("; ".join(f"{key}: {message}" for key, message in errors.items()))
+        self.errors = dict(errors)
+
+
+class SlotConflict(Exception):
+    """Raised when a slot changed since the version the client last saw."""
+
+    def __init__(self, slot_ids: Iterable[int]):
+        self.slot_ids = sorted(slot_ids)
+        super().__init__(f"Stale version for slot(s) {self.slot_ids}")
+
+
+def _clean_changes(changes: Sequence[Mapping], user_queryset) -> list[dict]:
+    statuses = {value for value, _label in RoleSlot.STATUS_CHOICES}
+    errors: dict[str, str] = {}
+    cleaned = []
+    seen = set()
+    for position, change in enumerate(changes):
+        key = str(change.get("id", position)) if isinstance(change, Mapping) else str(position)
+        try:
+            slot_id = int(change["id"])
+            version = int(change["version"])
+            user_id = None if change.get("user") in (None, "") else int(change["user"])
+        except (KeyError, TypeError, ValueError):
+            errors[key] = "Place, version ou utilisateur invalide."
+            continue
+        status = change.get("status")
+        if status not in statuses:
+            errors[key] = "Statut invalide."
+            continue
+        if slot_id in seen:
+            errors[key] = "Place modifiée deux fois."
+            continue
+        seen.add(slot_id)
+        cleaned.append({"id": slot_id, "version": version, "user_id": user_id, "status": status})
+
+    user_ids = {change["user_id"] for change in cleaned if change["user_id"] is not None}
+    if user_ids:
+        known = set(user_queryset.filter(pk__in=user_ids).values_list("pk", flat=True))
+        for change in cleaned:
+            if change["user_id"] is not None and change["user_id"] not in known:
+                errors[str(change["id"])] = "Utilisateur inconnu."
+    if not cleaned and not errors:
+        errors["slots"] = "Aucune modification."
+    if errors:
+        raise SlotUpdateError(errors)
+    return cleaned
+
+
+def _count_assignments(cleaned: list[dict], before: dict) -> None:
+    deltas: SeatDeltas = defaultdict(Counter)
+    unknown = set()
+    for change in cleaned:
+        ship_id, status, version, _user_id = before[change["id"]]
+        if version != change["version"]:
+            # Another transaction committed in between; recount that ship.
+            unknown.add(ship_id)
+        elif status != change["status"]:
+            deltas[ship_id].update(_seat_delta(status, -1))
+            deltas[ship_id].update(_seat_delta(change["status"], 1))
+    apply_seat_deltas(deltas)
+    if unknown:
+        recount_seats(unknown)
+
+
+def _grouped(batch: list[dict], attribute: str) -> dict:
+    groups: dict = defaultdict(list)
+    for change in batch:
+        groups[change[attribute]].append(change["id"])
+    return groups
+
+
+def _guarded_update(batch: list[dict]) -> int:
+    """Apply ``batch`` in one UPDATE, skipping rows no longer at their version.
+
+    The statement is the ``CASE`` form ``bulk_update`` emits, with the version
+    check added to its ``WHERE`` clause so the compare-and-swap stays atomic.
+    Conditions are grouped by value so only the user column needs one branch
+    per slot.
+    """
+
+    def case(field_name: str, attribute: str) -> Case:
+        field = RoleSlot._meta.get_field(field_name)
+        return Case(
+            *(
+                When(pk__in=slot_ids, then=Value(value, output_field=field))
+                for value, slot_ids in _grouped(batch, attribute).items()
+            ),
+            output_field=field,
+        )
+
+    guard = reduce(
+        or_,
+        (
+            Q(version=version, pk__in=slot_ids)
+            for version, slot_ids in _grouped(batch, "version").items()
+        ),
+    )
+    return RoleSlot.objects.filter(guard).update(
+        user=case("user", "user_id"),
+        status=case("status", "status"),
+        version=F("version") + 1,
+    )
+
+
+def update_role_slots(changes: Sequence[Mapping], *, user_queryset=None) -> list[RoleSlot]:
+    """Apply seat assignments all-or-nothing and return the updated slots.
+
+    Each change is a mapping with the slot ``id``, the ``version`` the client
+    last saw, the ``user`` id (or None) and the ``status``. A change only
+    applies while the stored version still matches; otherwise nothing is
+    written and :class:`SlotConflict` lists the stale slots. The number of
+    queries does not depend on the number of changes (one UPDATE per
+    ``SLOT_UPDATE_BATCH_SIZE`` slots).
+    """
+
+    if user_queryset is None:
+        user_queryset = get_ordered_user_queryset()
+    cleaned = _clean_changes(changes, user_queryset)
+    slot_ids = [change["id"] for change in cleaned]
+    with transaction.atomic():
+        before = {
+            pk: row
+            for pk, *row in RoleSlot.objects.filter(pk__in=slot_ids).values_list(
+                "pk", "ship_id", "status", "version", "user_id"
+            )
+        }
+        updated = 0
+        if len(before) == len(cleaned):
+            updated = sum(
+                _guarded_update(cleaned[start : start + SLOT_UPDATE_BATCH_SIZE])
+                for start in range(0, len(cleaned), SLOT_UPDATE_BATCH_SIZE)
+            )
+        if updated != len(cleaned):
+            transaction.set_rollback(True)
+        else:
+            _count_assignments(cleaned, before)
+            holders = {row[3] for row in before.values()}
+            holders.update(change["user_id"] for change in cleaned)
+            holders.discard(None)
+            slots_changed.send(sender=RoleSlot, slot_ids=slot_ids, user_ids=holders)
+    if updated != len(cleaned):
+        missing = set(slot_ids) - before.keys()
+        if missing:
+            raise SlotUpdateError({str(slot_id): "Place inconnue." for slot_id in missing})
+        current = dict(RoleSlot.objects.filter(pk__in=slot_ids).values_list("pk", "version"))
+        stale = {change["id"] for change in cleaned if current.get(change["id"]) != change["version"]}
+        raise SlotConflict(stale)
+    return list(
+        RoleSlot.objects.select_related("user")
+        .filter(pk__in=slot_ids)
+        .order_by("ship_id", "role_name", "index")
+    )
+
+
+__all__ = [
+    "SlotConflict",
+    "SlotUpdateError",
+    "apply_seat_deltas",
+    "count_slot_delete",
+    "count_slot_save",
+    "materialize_slots",
+    "missing_slots",
+    "prune_surplus_slots",
+    "recount_seats",
+    "update_role_slots",
+]
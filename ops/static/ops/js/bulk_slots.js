@@ -0,0 +1,95 @@
+(function () {
+  const bar = document.querySelector('[data-bulk-slots]');
+  if (!bar || !window.fetch || !window.CKFR?.slotUpdates) {
+    return;
+  }
+  const slotUpdates = window.CKFR.slotUpdates;
+  const errorTarget = bar.querySelector('[data-bulk-error]');
+
+  function dirtyForms() {
+    return Array.from(document.querySelectorAll('[data-slot-form][data-slot-dirty]'));
+  }
+
+  function refresh() {
+    const count = dirtyForms().length;
+    bar.querySelector('[data-bulk-count]').textContent = count;
+    bar.classList.toggle('hidden', count === 0);
+    if (count === 0) {
+      errorTarget.classList.add('hidden');
+    }
+  }
+
+  function showError(message) {
+    errorTarget.textContent = message;
+    errorTarget.classList.remove('hidden');
+  }
+
+  document.addEventListener('change', (event) => {
+    const form = event.target.closest?.('[data-slot-form]');
+    if (form) {
+      form.dataset.slotDirty = '1';
+      refresh();
+    }
+  });
+  // Cards re-rendered after a single update or a live event lose their flag.
+  new MutationObserver(refresh).observe(document.body, { childList: true, subtree: true });
+
+  bar.querySelector('[data-bulk-reset]').addEventListener('click', () => {
+    dirtyForms().forEach((form) => {
+      form.reset();
+      delete form.dataset.slotDirty;
+    });
+    refresh();
+  });
+
+  bar.querySelector('[data-bulk-save]').addEventListener('click', async () => {
+    const forms = dirtyForms();
+    if (!forms.length) {
+      return;
+    }
+    const slots = {};
+    const formsById = {};
+    forms.forEach((form) => {
+      const id = form.closest('[data-slot-card]')?.dataset.slotCard;
+      if (!id) {
+        return;
+      }
+      const data = new FormData(form);
+      slots[id] = {
+        user: data.get('user') || null,
+        status: data.get('status'),
+        version: data.get('version'),
+      };
+      formsById[id] = form;
+    });
+    let response;
+    try {
+      response = await fetch(bar.dataset.bulkSlots, {
+        method: 'POST',
+        headers: {
+          'Accept': 'application/json',
+          'Content-Type': 'application/json',
+          'X-CSRFToken': new FormData(forms[0]).get('csrfmiddlewaretoken'),
+        },
+        body: JSON.stringify({ slots, next: window.location.pathname + window.location.search }),
+        credentials: 'same-origin',
+      });
+    } catch (error) {
+      showError('Connexion impossible, aucune place n’a été enregistrée.');
+      return;
+    }
+    const body = await response.json().catch(() => ({}));
+    if (response.ok) {
+      (body.slots || []).forEach((slot) => slotUpdates.replaceCard(slot));
+    } else if (response.status === 409) {
+      (body.conflicts || []).forEach((slot) => slotUpdates.replaceCard(slot, body.detail));
+      showError('Aucune place n’a été enregistrée : certaines ont changé entre-temps.');
+    } else {
+      Object.entries(body.errors || {}).forEach(([id, message]) => {
+        slotUpdates.showError(formsById[id], message);
+      });
+      showError('Aucune place n’a été enregistrée. Corrigez les erreurs signalées.');
+    }
+    refresh();
+  });
+})();
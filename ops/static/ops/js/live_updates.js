@@ -0,0 +1,105 @@
+(function () {
+  if (window.CKFR?.liveUpdates?.initialized || !window.EventSource) {
+    return;
+  }
+  const url = document.currentScript.dataset.liveUrl;
+
+  const module = {
+    initialized: true,
+    updateSlot(slot) {
+      const card = document.querySelector(`[data-slot-card="${slot.id}"]`);
+      if (!card) {
+        return;
+      }
+      const badge = card.querySelector('[data-slot-badge]');
+      if (badge) {
+        badge.className = `text-xs uppercase tracking-[0.2em] px-2 py-1 rounded-full ${slot.badge_class}`;
+        badge.textContent = slot.status_label;
+      }
+      const name = card.querySelector('[data-slot-user]');
+      if (name) {
+        name.textContent = slot.user_label || 'Libre';
+        name.classList.toggle('text-white/40', !slot.user);
+      }
+      const form = card.querySelector('[data-slot-form]');
+      if (!form || form.contains(document.activeElement)) {
+        // Leave a seat being edited alone: its stale version makes the save
+        // fail with a conflict instead of overwriting this change.
+        return;
+      }
+      const user = form.elements.user;
+      const value = slot.user ? String(slot.user) : '';
+      if (value && ![...user.options].some((option) => option.value === value)) {
+        user.add(new Option(slot.user_label, value));
+      }
+      user.value = value;
+      form.elements.status.value = slot.status;
+      form.elements.version.value = slot.version;
+    },
+    removeSlot(event) {
+      document.querySelector(`[data-slot-card="${event.id}"]`)?.remove();
+    },
+    updateCrew(event) {
+      const block = document.querySelector(`[data-operation="${event.operation}"]`);
+      if (!block) {
+        return;
+      }
+      const item = block.querySelector(`[data-highlighted-ship="${event.id}"]`);
+      if (!item) {
+        module.reloadSoon();
+        return;
+      }
+      Object.entries(event.roles).forEach(([role, names]) => {
+        const row = item.querySelector(`[data-crew-role="${role}"]`);
+        const current = row?.querySelector('dd');
+        if (!current) {
+          return;
+        }
+        const dd = document.createElement('dd');
+        if (names.length) {
+          const list = document.createElement('ul');
+          list.className = 'flex flex-wrap gap-2';
+          names.forEach((name) => {
+            const entry = document.createElement('li');
+            entry.className = 'rounded-lg border border-white/15 bg-white/10 px-2 py-1 text-xs text-white/90';
+            entry.textContent = name;
+            list.appendChild(entry);
+          });
+          dd.appendChild(list);
+        } else {
+          dd.className = 'text-white/50';
+          dd.textContent = '—';
+        }
+        current.replaceWith(dd);
+      });
+    },
+    removeCrew(event) {
+      const item = document.querySelector(`[data-highlighted-ship="${event.id}"]`);
+      if (item) {
+        item.remove();
+      }
+    },
+    reloadSoon() {
+      // Spread reloads so connected members do not all hit the server at once.
+      if (!module.reloading) {
+        module.reloading = true;
+        setTimeout(() => window.location.reload(), Math.random() * 3000);
+      }
+    },
+  };
+
+  const source = new EventSource(url);
+  const handlers = {
+    slot: module.updateSlot,
+    slot_deleted: module.removeSlot,
+    crew: module.updateCrew,
+    crew_deleted: module.removeCrew,
+    resync: module.reloadSoon,
+  };
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (message) => handler(JSON.parse(message.data)));
+  });
+
+  window.CKFR = window.CKFR || {};
+  window.CKFR.liveUpdates = module;
+})();
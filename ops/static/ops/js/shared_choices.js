@@ -0,0 +1,54 @@
+(function () {
+  if (window.CKFR?.sharedChoices?.initialized) {
+    return;
+  }
+
+  const module = {
+    initialized: true,
+    sources: {},
+    loadChoices(sourceId) {
+      if (!(sourceId in module.sources)) {
+        const source = document.getElementById(sourceId);
+        let choices = [];
+        try {
+          choices = source ? JSON.parse(source.textContent) : [];
+        } catch (error) {
+          choices = [];
+        }
+        module.sources[sourceId] = Array.isArray(choices) ? choices : [];
+      }
+      return module.sources[sourceId];
+    },
+    fill(select) {
+      if (!select || select.dataset.choicesReady === 'true') {
+        return;
+      }
+      select.dataset.choicesReady = 'true';
+      const current = select.value;
+      const blank = select.options[0] || null;
+      const fragment = document.createDocumentFragment();
+      if (blank) {
+        fragment.appendChild(blank);
+      }
+      module.loadChoices(select.dataset.choices).forEach(([value, label]) => {
+        const key = String(value);
+        fragment.appendChild(new Option(label, key, false, key === current));
+      });
+      select.replaceChildren(fragment);
+      select.value = current;
+    },
+    handle(event) {
+      const target = event.target;
+      if (target instanceof HTMLSelectElement && target.dataset.choices) {
+        module.fill(target);
+      }
+    },
+  };
+
+  window.CKFR = window.CKFR || {};
+  window.CKFR.sharedChoices = module;
+
+  ['focusin', 'pointerdown', 'keydown'].forEach((type) => {
+    document.addEventListener(type, module.handle, true);
+  });
+})();
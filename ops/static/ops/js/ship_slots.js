@@ -0,0 +1,39 @@
+(function () {
+  if (window.CKFR?.shipSlots?.initialized) {
+    return;
+  }
+
+  const module = {
+    initialized: true,
+    async load(details) {
+      if (details.dataset.loaded === 'true') {
+        return;
+      }
+      details.dataset.loaded = 'true';
+      const body = details.querySelector('[data-ship-slots-body]');
+      const url = new URL(details.dataset.shipSlots, window.location.href);
+      url.searchParams.set('next', window.location.pathname + window.location.search);
+      try {
+        const response = await fetch(url, { credentials: 'same-origin' });
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        body.innerHTML = await response.text();
+      } catch (error) {
+        // Keep the link to the ship page and allow another attempt.
+        details.dataset.loaded = 'false';
+      }
+    },
+    handle(event) {
+      const details = event.target;
+      if (details instanceof HTMLDetailsElement && details.open && details.dataset.shipSlots) {
+        module.load(details);
+      }
+    },
+  };
+
+  window.CKFR = window.CKFR || {};
+  window.CKFR.shipSlots = module;
+  // "toggle" does not bubble.
+  document.addEventListener('toggle', module.handle, true);
+})();
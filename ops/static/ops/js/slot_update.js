@@ -0,0 +1,70 @@
+(function () {
+  if (window.CKFR?.slotUpdates?.initialized) {
+    return;
+  }
+
+  const module = {
+    initialized: true,
+    replaceCard(slot, message) {
+      const card = document.querySelector(`[data-slot-card="${slot.id}"]`);
+      if (!card) {
+        return;
+      }
+      card.innerHTML = slot.html;
+      if (message) {
+        module.showError(card.querySelector('[data-slot-form]'), message);
+      }
+    },
+    showError(form, message) {
+      const target = form?.querySelector('[data-slot-error]');
+      if (target) {
+        target.textContent = message;
+        target.classList.remove('hidden');
+      }
+    },
+    async submit(form) {
+      const data = new FormData(form);
+      const payload = {
+        user: data.get('user') || null,
+        status: data.get('status'),
+        version: data.get('version'),
+        next: data.get('next'),
+      };
+      let response;
+      try {
+        response = await fetch(form.action, {
+          method: 'POST',
+          headers: {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'X-CSRFToken': data.get('csrfmiddlewaretoken'),
+          },
+          body: JSON.stringify(payload),
+          credentials: 'same-origin',
+        });
+      } catch (error) {
+        form.submit();
+        return;
+      }
+      const body = await response.json().catch(() => ({}));
+      if (response.ok) {
+        (body.slots || []).forEach((slot) => module.replaceCard(slot));
+      } else if (response.status === 409) {
+        (body.conflicts || []).forEach((slot) => module.replaceCard(slot, body.detail));
+      } else {
+        module.showError(form, Object.values(body.errors || {}).join(' ') || 'Impossible de mettre à jour la place.');
+      }
+    },
+    handle(event) {
+      const form = event.target;
+      if (form instanceof HTMLFormElement && form.hasAttribute('data-slot-form') && window.fetch) {
+        event.preventDefault();
+        module.submit(form);
+      }
+    },
+  };
+
+  window.CKFR = window.CKFR || {};
+  window.CKFR.slotUpdates = module;
+  document.addEventListener('submit', module.handle);
+})();
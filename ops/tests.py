@@ -1,14 +1,83 @@
+import asyncio
 import json
+import random
+import tempfile
+import threading
+import time
+import warnings
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
 from pathlib import Path
+from unittest.mock import patch
 
+from django.apps import apps as django_apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
-from django.test import SimpleTestCase, TestCase
+from django.contrib.sessions.backends.db import SessionStore as LegacySessionStore
+from django.contrib.sessions.models import Session as LegacySession
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient, RedisSerializer
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.template import engines
+from django.templatetags.static import static
+from django.template.loaders.cached import Loader as CachedLoader
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.models.functions import Lower
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from .forms import HighlightedShipForm
-from .models import OperationHighlightedShip, RoleSlot, Ship
-from .utils import get_ordered_user_queryset, resolve_username_lookup
+from ckfr_site import cache_url, db_pool, profiling, static_bundles, template_cache
+from ckfr_site.models import UserSession
+
+from .autofill import AutofillPlan, solve
+from .benchmarks import compare_results
+from .cache import (
+    ASSIGNMENTS,
+    OPERATION,
+    SCHEMA_VERSION,
+    SHIPS,
+    USERS,
+    Namespace,
+    reset_stats,
+    stats,
+)
+from .catalog import parse_crew, parse_scu
+from .classification import match_filter_category
+from .live import InProcessBroker, event_stream, slot_events
+from .forms import (
+    HighlightedShipForm,
+    HighlightedShipFormSet,
+    RoleSlotForm,
+    SharedUserChoices,
+    get_ship_choices,
+)
+from .models import (
+    Operation,
+    OperationHighlightedCrewAssignment,
+    OperationHighlightedShip,
+    RoleSlot,
+    Ship,
+    ShipCatalogImport,
+    ShipRoleTemplate,
+)
+from .permissions import (
+    can_access_member_home,
+    can_manage_ops,
+    is_operations_member_only,
+    user_in_groups,
+)
+from .services import highlighted_cargo_capacity, reconcile_highlighted_ships
+from .slots import SlotConflict, materialize_slots, recount_seats, update_role_slots
+from .utils import get_ordered_user_queryset, ordered_user_choices, resolve_username_lookup
 
 
 class UserOrderingUtilsTests(TestCase):
@@ -120,6 +189,125 @@ class RoleSlotUpdateViewTests(TestCase):
             reverse("ship_detail", args=[self.ship.pk]),
         )
 
+    def test_stale_form_post_does_not_overwrite(self):
+        RoleSlot.objects.filter(pk=self.slot.pk).update(status="confirmed", version=1)
+        self.client.post(
+            reverse("role_slot_update", args=[self.slot.pk]),
+            {"user": "", "status": "open", "version": "0"},
+        )
+        self.slot.refresh_from_db()
+        self.assertEqual((self.slot.status, self.slot.version), ("confirmed", 1))
+
+    def post_json(self, url, payload):
+        return self.client.post(url, json.dumps(payload), content_type="application/json")
+
+    def test_json_update_returns_the_changed_slot(self):
+        response = self.post_json(
+            reverse("role_slot_update", args=[self.slot.pk]),
+            {"user": self.planner.pk, "status": "assigned", "version": 0},
+        )
+        self.assertEqual(response.status_code, 200)
+        [payload] = response.json()["slots"]
+        self.assertEqual((payload["id"], payload["version"], payload["user"]), (self.slot.pk, 1, self.planner.pk))
+        self.assertEqual(payload["user_label"], "planner")
+        self.assertIn(f'value="{self.planner.pk}" selected', payload["html"])
+        self.assertIn('name="version" value="1"', payload["html"])
+
+        response = self.post_json(
+            reverse("role_slot_update", args=[self.slot.pk]),
+            {"user": None, "status": "open", "version": 0},
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"][0]["user"], self.planner.pk)
+
+    def test_json_batch_is_all_or_nothing(self):
+        other = RoleSlot.objects.create(ship=self.ship, role_name="Pilote", index=2, version=3)
+        url = reverse("role_slots_update")
+        response = self.post_json(
+            url,
+            {
+                "slots": [
+                    {"id": self.slot.pk, "user": None, "status": "assigned", "version": 0},
+                    {"id": other.pk, "user": None, "status": "assigned", "version": 2},
+                ]
+            },
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([slot["id"] for slot in response.json()["conflicts"]], [other.pk])
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.status, "open")
+
+        response = self.post_json(
+            url, {"slots": [{"id": other.pk, "user": 999999, "status": "assigned", "version": 3}]}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.post_json(
+            url,
+            {
+                "slots": [
+                    {"id": self.slot.pk, "user": None, "status": "assigned", "version": 0},
+                    {"id": other.pk, "user": self.planner.pk, "status": "confirmed", "version": 3},
+                ]
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot["version"] for slot in response.json()["slots"]], [1, 4])
+
+    def bulk_payload(self, slots, status):
+        return {
+            "slots": {
+                str(slot.pk): {"user": self.planner.pk, "status": status, "version": slot.version}
+                for slot in slots
+            }
+        }
+
+    def test_bulk_mapping_query_count_does_not_grow_with_slots(self):
+        slots = [
+            RoleSlot.objects.create(ship=self.ship, role_name="Artilleur", index=index)
+            for index in range(1, 21)
+        ]
+        url = reverse("role_slots_update")
+        with CaptureQueriesContext(connection) as few:
+            response = self.post_json(url, self.bulk_payload(slots[:3], "assigned"))
+        self.assertEqual(response.status_code, 200)
+        with CaptureQueriesContext(connection) as many:
+            response = self.post_json(url, self.bulk_payload(slots[3:], "assigned"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(
+            RoleSlot.objects.filter(ship=self.ship, status="assigned", user=self.planner).count(), 20
+        )
+        self.ship.refresh_from_db()
+        self.assertEqual(self.ship.seats_assigned, 20)
+
+    def test_bulk_mapping_reports_errors_per_slot(self):
+        other = RoleSlot.objects.create(ship=self.ship, role_name="Pilote", index=2)
+        response = self.post_json(
+            reverse("role_slots_update"),
+            {
+                "slots": {
+                    str(self.slot.pk): {"user": None, "status": "volé", "version": 0},
+                    str(other.pk): {"user": None, "status": "assigned", "version": 0},
+                }
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()["errors"]), [str(self.slot.pk)])
+        other.refresh_from_db()
+        self.assertEqual(other.status, "open")
+
+    def test_changing_a_slot_twice_is_rejected(self):
+        change = {"id": self.slot.pk, "user": None, "status": "assigned", "version": 0}
+        response = self.post_json(reverse("role_slots_update"), {"slots": [change, change]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_allocation_pages_include_the_bulk_bar(self):
+        self.assertContains(
+            self.client.get(reverse("ship_detail", args=[self.ship.pk])), "data-bulk-slots"
+        )
+        self.assertContains(self.client.get(reverse("ships_allocation")), "data-bulk-slots")
+
 
 class SourceConflictMarkerTests(SimpleTestCase):
     def test_python_sources_do_not_contain_conflict_markers(self):
@@ -181,4 +369,1488 @@ class HighlightedShipFormTests(TestCase):
         }
         form = HighlightedShipForm(data=data)
         self.assertFalse(form.is_valid())
-        self.assertIn("Sélectionnez un vaisseau", form.errors["__all__"][0])
\ No newline at end of file
+        self.assertIn("Sélectionnez un vaisseau", form.errors["__all__"][0])
+
+
+class SharedUserPickerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.manager = cls.User.objects.create_user(
+            username="picker-manager", password="pass", is_superuser=True
+        )
+        cls.crew = [
+            cls.User.objects.create_user(username=f"picker-crew-{number}", password="pass")
+            for number in range(5)
+        ]
+        cls.ship = Ship.objects.create(
+            name="Picker Test Ship",
+            category="MR",
+            min_crew=1,
+            max_crew=3,
+        )
+        cls.assigned_slot = RoleSlot.objects.create(
+            ship=cls.ship,
+            role_name="Pilote",
+            index=1,
+            user=cls.crew[2],
+            status="assigned",
+        )
+        cls.open_slot = RoleSlot.objects.create(ship=cls.ship, role_name="Pilote", index=2)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_slot_pickers_only_render_blank_and_current_user(self):
+        response = self.client.get(reverse("ship_detail", args=[self.ship.pk]))
+        self.assertContains(response, 'id="user-choices"', count=1)
+        self.assertContains(response, 'data-choices="user-choices"', count=2)
+        self.assertContains(
+            response,
+            f'<option value="{self.crew[2].pk}" selected>picker-crew-2</option>',
+            html=True,
+        )
+        # One <option> per user would be 2 × 6; the pickers only carry their current value.
+        self.assertContains(response, "— Libre —", count=2)
+        self.assertNotContains(response, f'<option value="{self.crew[0].pk}"')
+
+    def test_shared_choices_list_every_user_once(self):
+        response = self.client.get(reverse("ships_allocation"))
+        content = response.content.decode()
+        start = content.index('<script id="user-choices" type="application/json">')
+        payload = content[start:].split(">", 1)[1].split("</script>", 1)[0]
+        pks = [pk for pk, _label in json.loads(payload)]
+        self.assertEqual(sorted(pks), sorted(self.User.objects.values_list("pk", flat=True)))
+
+    def test_page_queries_do_not_grow_with_slots(self):
+        url = reverse("ship_detail", args=[self.ship.pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(url)
+        RoleSlot.objects.bulk_create(
+            [RoleSlot(ship=self.ship, role_name="Artilleur", index=index) for index in range(1, 11)]
+        )
+        with CaptureQueriesContext(connection) as grown:
+            self.client.get(url)
+        self.assertEqual(len(grown), len(baseline))
+
+
+class UserChoicesCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.bravo = cls.User.objects.create_user(username="choices-bravo", password="pass")
+        cls.alpha = cls.User.objects.create_user(username="choices-alpha", password="pass")
+        cls.ship = Ship.objects.create(name="Choices Ship", max_crew=1)
+        cls.slot = RoleSlot.objects.create(ship=cls.ship, role_name="Pilote", index=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_choices_are_built_once(self):
+        with self.assertNumQueries(1):
+            choices = ordered_user_choices()
+        self.assertEqual(
+            choices[:2], [(self.alpha.pk, "choices-alpha"), (self.bravo.pk, "choices-bravo")]
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(ordered_user_choices(), choices)
+            self.assertEqual(SharedUserChoices().options, choices)
+
+    def test_slot_form_renders_and_validates_from_cached_choices(self):
+        ordered_user_choices()
+        with self.assertNumQueries(0):
+            html = str(RoleSlotForm(instance=self.slot)["user"])
+        self.assertIn(f'<option value="{self.alpha.pk}">choices-alpha</option>', html)
+        form = RoleSlotForm(
+            data={"user": self.alpha.pk, "status": "assigned", "version": self.slot.version},
+            instance=self.slot,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["user"], self.alpha)
+
+    def test_user_and_group_changes_drop_the_choices(self):
+        ordered_user_choices()
+        with self.captureOnCommitCallbacks(execute=True):
+            charlie = self.User.objects.create_user(username="choices-charlie", password="pass")
+            self.assertNotIn((charlie.pk, "choices-charlie"), ordered_user_choices())
+        self.assertIn((charlie.pk, "choices-charlie"), ordered_user_choices())
+        charlie.username = "choices-delta"
+        with self.captureOnCommitCallbacks(execute=True):
+            charlie.save()
+        self.assertIn((charlie.pk, "choices-delta"), ordered_user_choices())
+        with self.captureOnCommitCallbacks(execute=True):
+            charlie.groups.add(Group.objects.create(name="Choices Group"))
+        self.assertIsNone(USERS.get("choices"))
+        charlie_pk = charlie.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            charlie.delete()
+        self.assertNotIn(charlie_pk, [pk for pk, _label in ordered_user_choices()])
+
+    @override_settings(OPS_USER_CHOICES_CACHE_TIMEOUT=60)
+    def test_cached_choices_expire(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            ordered_user_choices()
+        self.assertEqual(cache_set.call_args.args[2], 60)
+
+    def test_login_keeps_the_choices(self):
+        ordered_user_choices()
+        self.client.force_login(self.alpha)
+        self.assertIsNotNone(USERS.get("choices"))
+
+
+class LazyAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.manager = cls.User.objects.create_user(
+            username="lazy-manager", password="pass", is_superuser=True
+        )
+        cls.crewed = Ship.objects.create(name="Lazy Crewed", category="CAP", max_crew=3)
+        ShipRoleTemplate.objects.create(ship=cls.crewed, role_name="Pilote", slots=3)
+        seat = RoleSlot.objects.get(ship=cls.crewed, index=1)
+        seat.user, seat.status = cls.manager, "assigned"
+        seat.save()
+        cls.empty = Ship.objects.create(name="Lazy Empty", category="CAP", max_crew=1)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_page_lists_seat_counts_without_slots(self):
+        url = reverse("ships_allocation")
+        response = self.client.get(url, {"cat": "CAP"})
+        self.assertContains(response, "2 libres · 1 assignée · 0 confirmée")
+        self.assertContains(response, reverse("ship_slots", args=[self.crewed.pk]))
+        self.assertNotContains(response, ' data-slot-card="')
+
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(url, {"cat": "CAP"})
+        ShipRoleTemplate.objects.create(ship=self.empty, role_name="Artilleur", slots=5)
+        with CaptureQueriesContext(connection) as grown:
+            response = self.client.get(url, {"cat": "CAP"})
+        self.assertEqual(len(grown), len(baseline))
+        self.assertContains(response, "5 libres")
+
+    def test_hide_empty_skips_ships_without_templates(self):
+        response = self.client.get(reverse("ships_allocation"), {"cat": "CAP", "hide_empty": "1"})
+        names = [ship.name for _label, ships in response.context["grouped_ships"] for ship in ships]
+        self.assertEqual(names, ["Lazy Crewed"])
+
+    def test_fragment_renders_the_slots_of_one_ship(self):
+        response = self.client.get(
+            reverse("ship_slots", args=[self.crewed.pk]), {"next": "/ships/allocation/?cat=CAP"}
+        )
+        self.assertContains(response, ' data-slot-card="', count=3)
+        self.assertContains(response, 'name="next" value="/ships/allocation/?cat=CAP"')
+        self.assertContains(response, f'<option value="{self.manager.pk}" selected>lazy-manager</option>', html=True)
+
+    def test_full_mode_renders_every_slot(self):
+        response = self.client.get(reverse("ships_allocation"), {"cat": "CAP", "full": "1"})
+        self.assertContains(response, ' data-slot-card="', count=3)
+
+
+class PermissionResolutionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.member_group, _ = Group.objects.get_or_create(name="Membre")
+        cls.manager_group, _ = Group.objects.get_or_create(name="Admin")
+        cls.member = cls.User.objects.create_user(username="perm-member", password="pass")
+        cls.member.groups.add(cls.member_group)
+        cls.operation = Operation.objects.create(title="Perm Op", is_active=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.member)
+
+    def test_group_names_are_loaded_once_per_user(self):
+        user = self.User.objects.get(pk=self.member.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(can_access_member_home(user))
+            self.assertFalse(can_manage_ops(user))
+            self.assertTrue(is_operations_member_only(user))
+            self.assertTrue(user_in_groups(user, ["Membre"]))
+
+    def test_operation_overview_query_count(self):
+        # session, user, groups, operation stamp, operation and its highlighted ships
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("operation_overview"))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(OPS_PERMISSION_CACHE_TIMEOUT=60)
+    def test_cross_request_cache_skips_group_query(self):
+        self.client.get(reverse("operation_overview"))
+        # session, user and operation stamp; groups and operation block are cached
+        with self.assertNumQueries(3):
+            self.client.get(reverse("operation_overview"))
+
+    @override_settings(OPS_PERMISSION_CACHE_TIMEOUT=60)
+    def test_cross_request_cache_invalidated_on_group_change(self):
+        self.assertFalse(can_manage_ops(self.User.objects.get(pk=self.member.pk)))
+        self.manager_group.user_set.add(self.member)
+        self.assertTrue(can_manage_ops(self.User.objects.get(pk=self.member.pk)))
+        self.member.groups.remove(self.manager_group)
+        self.assertFalse(can_manage_ops(self.User.objects.get(pk=self.member.pk)))
+
+
+class SingleSessionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create_user(username="single-session", password="pass")
+        cls.other = cls.User.objects.create_user(username="other-session", password="pass")
+
+    def test_login_terminates_previous_session_of_the_same_user(self):
+        first, second, bystander = Client(), Client(), Client()
+        first.login(username="single-session", password="pass")
+        bystander.login(username="other-session", password="pass")
+        old_key = first.session.session_key
+
+        second.login(username="single-session", password="pass")
+
+        self.assertFalse(UserSession.objects.filter(session_key=old_key).exists())
+        self.assertEqual(
+            list(UserSession.objects.filter(user_id=self.user.pk).values_list("session_key", flat=True)),
+            [second.session.session_key],
+        )
+        self.assertTrue(UserSession.objects.filter(user_id=self.other.pk).exists())
+
+    def test_backfill_copies_legacy_sessions_with_their_user(self):
+        store = LegacySessionStore()
+        store["_auth_user_id"] = str(self.user.pk)
+        store.create()
+
+        call_command("backfill_user_sessions", stdout=StringIO())
+
+        session = UserSession.objects.get(session_key=store.session_key)
+        self.assertEqual(session.user_id, self.user.pk)
+        self.assertEqual(session.get_decoded()["_auth_user_id"], str(self.user.pk))
+
+    def test_backfill_does_not_bring_back_ended_sessions(self):
+        ended, kept = LegacySessionStore(), LegacySessionStore()
+        for store in (ended, kept):
+            store["_auth_user_id"] = str(self.user.pk)
+            store.create()
+        UserSession.objects.create(
+            session_key=kept.session_key,
+            session_data=LegacySessionStore().encode({}),
+            expire_date=timezone.now() + timedelta(days=1),
+        )
+
+        out = StringIO()
+        call_command("backfill_user_sessions", stdout=out)
+        self.assertIn("1 session(s) copied", out.getvalue())
+        self.assertFalse(LegacySession.objects.exists())
+
+        # Logout of the copied session, then the next deploy's run.
+        UserSession.objects.filter(session_key=ended.session_key).delete()
+        call_command("backfill_user_sessions", stdout=out)
+        self.assertFalse(UserSession.objects.filter(session_key=ended.session_key).exists())
+
+    def test_migration_moves_legacy_sessions_once(self):
+        migration = import_module("ckfr_site.migrations.0002_copy_legacy_sessions")
+        store = LegacySessionStore()
+        store["_auth_user_id"] = str(self.user.pk)
+        store.create()
+
+        migration.copy_legacy_sessions(django_apps, None)
+
+        self.assertEqual(UserSession.objects.get(session_key=store.session_key).user_id, self.user.pk)
+        self.assertFalse(LegacySession.objects.exists())
+
+
+class RequestProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = get_user_model().objects.create_user(
+            username="profiling-manager", password="pass", is_superuser=True
+        )
+
+    def setUp(self):
+        profiling.clear()
+        self.addCleanup(profiling.clear)
+
+    def test_disabled_middleware_leaves_the_chain(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            profiling.RequestProfilingMiddleware(lambda request: None)
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_BUFFER=2)
+    def test_slowest_requests_are_buffered_per_url_name(self):
+        client = Client()
+        client.force_login(self.manager)
+        for _ in range(3):
+            client.get(reverse("ships_allocation"))
+
+        entries = profiling.slowest_requests()["ships_allocation"]
+        self.assertEqual(len(entries), 2)
+        self.assertGreaterEqual(entries[0]["total_ms"], entries[1]["total_ms"])
+        self.assertGreater(entries[0]["queries"], 0)
+        self.assertGreater(entries[0]["template_ms"], 0)
+        self.assertIn("ops/ships_allocation.html", entries[0]["templates"])
+
+        response = client.get(reverse("profiling_report"))
+        self.assertContains(response, "ships_allocation")
+
+    def test_dump_command_needs_a_cache_shared_between_processes(self):
+        with self.assertRaisesMessage(CommandError, "CACHE_URL"):
+            call_command("dump_request_profiles", stdout=StringIO())
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(CACHES={"default": cache_url.parse(f"file://{directory.name}")}):
+            request = RequestFactory().get(reverse("ships_allocation"))
+            # Without a resolver match the entry is filed under UNNAMED,
+            # whose label must not end up in a cache key.
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", CacheKeyWarning)
+                profiling.record(profiling.RequestProfile().as_dict(request, HttpResponse()))
+            out = StringIO()
+            call_command("dump_request_profiles", stdout=out)
+        self.assertIn(profiling.UNNAMED, out.getvalue())
+        self.assertIn("GET /ships/allocation/", out.getvalue())
+
+    def test_duplicate_queries_report_their_origin(self):
+        profile = profiling.RequestProfile()
+        with connection.execute_wrapper(profile.execute_wrapper):
+            for _ in range(2):
+                list(Ship.objects.filter(name="Duplicate"))
+        request = RequestFactory().get("/")
+        entry = profile.as_dict(request, HttpResponse())
+        self.assertEqual(entry["queries"], 2)
+        self.assertEqual(entry["duplicates"][0]["count"], 2)
+        self.assertIn("ops/tests.py", entry["duplicates"][0]["origin"])
+
+
+class TemplateCacheTests(SimpleTestCase):
+    def test_templates_use_the_cached_loader(self):
+        [loader] = engines["django"].engine.template_loaders
+        self.assertIsInstance(loader, CachedLoader)
+
+    def test_warm_up_compiles_every_project_template(self):
+        names = template_cache.project_template_names()
+        self.assertIn("ops/includes/highlighted_ships_script.html", names)
+        template_cache.reset()
+        [loader] = engines["django"].engine.template_loaders
+        self.assertEqual(loader.get_template_cache, {})
+
+        errors = template_cache.warm_up()
+        for name in ("ops/ships_allocation.html", "ops/includes/highlighted_ships_script.html"):
+            self.assertNotIn(name, errors)
+            self.assertIn(name, loader.get_template_cache)
+        self.assertEqual(len(loader.get_template_cache), len(names) - len(errors))
+
+
+class DatabasePoolTests(SimpleTestCase):
+    postgres = {"ENGINE": "django.db.backends.postgresql", "NAME": "ckfr", "OPTIONS": {}}
+
+    def test_sqlite_falls_back_to_checked_persistent_connections(self):
+        database = db_pool.configure({"ENGINE": "django.db.backends.sqlite3"}, conn_max_age=120)
+        self.assertEqual(database["CONN_MAX_AGE"], 120)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("pool", database["OPTIONS"])
+        self.assertEqual(db_pool.configure(self.postgres, mode="off")["CONN_MAX_AGE"], 0)
+        with self.assertRaises(ImproperlyConfigured):
+            db_pool.configure(self.postgres, mode="bouncer")
+
+    def test_native_pool_on_postgres(self):
+        with patch("ckfr_site.db_pool.native_pool_available", return_value=True):
+            database = db_pool.configure(self.postgres, max_size=4, timeout=2.5)
+        self.assertEqual(database["OPTIONS"]["pool"], {"min_size": 2, "max_size": 4, "timeout": 2.5})
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertEqual(self.postgres["OPTIONS"], {})
+        self.assertEqual(db_pool.pool_mode(database), "native")
+        with patch("ckfr_site.db_pool.native_pool_available", return_value=False):
+            self.assertEqual(db_pool.configure(self.postgres)["CONN_MAX_AGE"], 600)
+            with self.assertRaises(ImproperlyConfigured):
+                db_pool.configure(self.postgres, mode="native")
+
+    def test_django_builds_the_native_pool_from_the_settings(self):
+        from django.db.backends.postgresql.base import DatabaseWrapper
+        from django.db.utils import ConnectionHandler
+
+        class ConnectionPool:
+            """Stand-in for psycopg_pool's, taking the same keyword arguments."""
+
+            def __init__(self, *, check=None, min_size=4, max_size=None, timeout=30.0, **kwargs):
+                self.check, self.sizes = check, (min_size, max_size, timeout)
+
+            @staticmethod
+            def check_connection(conn):
+                pass
+
+        with patch("ckfr_site.db_pool.native_pool_available", return_value=True):
+            database = db_pool.configure(self.postgres, max_size=4, timeout=2.5)
+        database = ConnectionHandler().configure_settings({"default": database})["default"]
+        wrapper = DatabaseWrapper(database, alias="pooled")
+        psycopg_pool = type("module", (), {"ConnectionPool": ConnectionPool})
+        with patch.dict("sys.modules", {"psycopg_pool": psycopg_pool}), patch.object(
+            DatabaseWrapper, "get_connection_params", return_value={}
+        ):
+            self.addCleanup(DatabaseWrapper._connection_pools.pop, "pooled", None)
+            pool = wrapper.pool
+        self.assertEqual(pool.sizes, (2, 4, 2.5))
+        self.assertEqual(pool.check, ConnectionPool.check_connection)
+
+    def test_dbpool_stats_reports_pool_counters(self):
+        pool = type("Pool", (), {"get_stats": lambda self: {"pool_size": 3, "pool_available": 1}})()
+        with patch.object(connection, "pool", pool, create=True):
+            stats = db_pool.pool_stats(connection)
+            out = StringIO()
+            call_command("dbpool_stats", "--database", "default", stdout=out)
+        self.assertEqual(stats["pool"], {"pool_size": 3, "pool_available": 1})
+        self.assertEqual(stats["mode"], db_pool.pool_mode(connection.settings_dict))
+        self.assertIn("pool_size: 3", out.getvalue())
+
+
+class StaticBundlesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = get_user_model().objects.create_user(
+            username="static-manager", password="pass", is_superuser=True
+        )
+        cls.ship = Ship.objects.create(name="Static Ship", max_crew=1)
+
+    def test_minifiers_keep_statements_on_their_lines(self):
+        source = "(function () {\n  // Comment\n  const url = 'http://x';\n\n  return url;\n})();\n"
+        self.assertEqual(
+            static_bundles.minify_js(source),
+            "(function () {\nconst url = 'http://x';\nreturn url;\n})();\n",
+        )
+        self.assertEqual(
+            static_bundles.minify_css("/* c */\n.a, .b {\n  color: red;\n  margin: 0;\n}\n"),
+            ".a,.b{color:red;margin:0}\n",
+        )
+
+    def test_pages_link_the_bundles_instead_of_inlining_them(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(reverse("ship_detail", args=[self.ship.pk]))
+        for name in ("ckfr_site/css/base.css", "ops/js/slot_update.js", "ops/js/live_updates.js"):
+            self.assertContains(response, f"/static/{name}")
+        self.assertNotContains(response, "<style>")
+        self.assertNotContains(response, "replaceCard(")
+
+    def test_collectstatic_minifies_fingerprints_and_compresses(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "ckfr_site.static_bundles.MinifiedManifestStaticFilesStorage"},
+        }
+        with override_settings(STATIC_ROOT=directory.name, STORAGES=storages):
+            call_command("collectstatic", interactive=False, verbosity=0, ignore_patterns=["admin"])
+            url = static("ops/js/slot_update.js")
+            with self.assertRaisesMessage(ValueError, "Missing staticfiles manifest entry"):
+                static("ops/js/not_collected.js")
+        self.assertRegex(url, r"^/static/ops/js/slot_update\.[0-9a-f]{12}\.js$")
+        built = Path(directory.name, url.removeprefix("/static/"))
+        source = Path(finders.find("ops/js/slot_update.js")).read_text(encoding="utf-8")
+        self.assertEqual(built.read_text(encoding="utf-8"), static_bundles.minify_js(source))
+        self.assertTrue(built.with_name(built.name + ".br").exists())
+        self.assertTrue(built.with_name(built.name + ".gz").exists())
+
+    def test_bench_static_reports_page_savings(self):
+        out = StringIO()
+        call_command("bench_static", "--ships", "2", "--users", "2", stdout=out)
+        self.assertRegex(out.getvalue(), r"ship_detail\s+[\d.]+\s+5\s+")
+        self.assertIn("ops/js/highlighted_ships.js", out.getvalue())
+
+
+class SlotMaterializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ships = [
+            Ship.objects.create(name=f"Materializer Ship {number}", max_crew=10)
+            for number in range(5)
+        ]
+
+    def test_materializes_many_templates_with_constant_queries(self):
+        ShipRoleTemplate.objects.bulk_create(
+            [ShipRoleTemplate(ship=ship, role_name="Artilleur", slots=4) for ship in self.ships]
+        )
+        templates = list(ShipRoleTemplate.objects.filter(ship__in=self.ships))
+        # read existing seats, then savepoint + INSERT + counter UPDATE + release
+        with self.assertNumQueries(5):
+            created = materialize_slots(templates)
+        self.assertEqual(created, 20)
+        self.assertEqual(materialize_slots(templates), 0)
+
+    def test_shrinking_template_prunes_only_unassigned_seats(self):
+        user = get_user_model().objects.create_user(username="seat-holder", password="pass")
+        template = ShipRoleTemplate.objects.create(ship=self.ships[0], role_name="Pilote", slots=3)
+        RoleSlot.objects.filter(ship=self.ships[0], role_name="Pilote", index=3).update(
+            user=user, status="assigned"
+        )
+
+        template.slots = 1
+        template.save()
+
+        self.assertEqual(
+            sorted(RoleSlot.objects.filter(ship=self.ships[0], role_name="Pilote").values_list("index", flat=True)),
+            [1, 3],
+        )
+
+        template.delete()
+        self.assertEqual(
+            list(RoleSlot.objects.filter(ship=self.ships[0], role_name="Pilote").values_list("index", flat=True)),
+            [3],
+        )
+
+    def test_pruning_cost_does_not_depend_on_the_seats_removed(self):
+        small = ShipRoleTemplate.objects.create(ship=self.ships[1], role_name="Pilote", slots=5)
+        large = ShipRoleTemplate.objects.create(ship=self.ships[2], role_name="Pilote", slots=40)
+        queries = []
+        for template in (small, large):
+            template.slots = 1
+            with CaptureQueriesContext(connection) as captured:
+                template.save()
+            queries.append(len(captured))
+        self.assertEqual(queries[0], queries[1])
+        self.assertEqual(recount_seats(), 0)
+        self.assertEqual(Ship.objects.get(pk=self.ships[2].pk).seats_total, 1)
+
+
+class SeatCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            get_user_model().objects.create_user(username=f"seat-user-{number}", password="pass")
+            for number in range(3)
+        ]
+        cls.ships = [Ship.objects.create(name=f"Seat Ship {number}", max_crew=6) for number in range(3)]
+
+    def counters(self):
+        return {
+            ship.pk: (ship.seats_total, ship.seats_open, ship.seats_assigned, ship.seats_confirmed)
+            for ship in Ship.objects.filter(pk__in=[ship.pk for ship in self.ships])
+        }
+
+    def mutate(self, rng, spare_index):
+        statuses = [value for value, _label in RoleSlot.STATUS_CHOICES]
+        slots = list(RoleSlot.objects.filter(ship__in=self.ships))
+        action = rng.randrange(7)
+        if action == 0:
+            ShipRoleTemplate.objects.update_or_create(
+                ship=rng.choice(self.ships),
+                role_name=rng.choice(["Pilote", "Artilleur", "Ingénieur"]),
+                defaults={"slots": rng.randint(0, 4)},
+            )
+        elif action == 1:
+            template = ShipRoleTemplate.objects.filter(ship__in=self.ships).order_by("?").first()
+            if template is not None:
+                template.delete()
+        elif action == 2 and slots:
+            slot = rng.choice(slots)
+            slot.status = rng.choice(statuses)
+            slot.user = rng.choice([None, *self.users])
+            slot.save()
+        elif action == 3 and slots:
+            update_role_slots(
+                [
+                    {"id": slot.pk, "user": None, "status": rng.choice(statuses), "version": slot.version}
+                    for slot in rng.sample(slots, min(len(slots), 3))
+                ]
+            )
+        elif action == 4 and slots:
+            rng.choice(slots).delete()
+        elif action == 5:
+            RoleSlot.objects.create(
+                ship=rng.choice(self.ships),
+                role_name="Renfort",
+                index=spare_index,
+                status=rng.choice(statuses),
+            )
+        elif action == 6 and slots:
+            slot = rng.choice(slots)
+            slot.ship = rng.choice(self.ships)
+            slot.index = spare_index
+            slot.save()
+
+    def test_counters_match_a_full_recount_after_random_mutations(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                for step in range(40):
+                    self.mutate(rng, 1000 + 100 * seed + step)
+                counters = self.counters()
+                self.assertEqual(recount_seats(), 0)
+                self.assertEqual(self.counters(), counters)
+
+    def test_counter_left_too_low_does_not_fail_the_next_save(self):
+        ShipRoleTemplate.objects.create(ship=self.ships[0], role_name="Pilote", slots=1)
+        slot = RoleSlot.objects.get(ship=self.ships[0])
+        # A bulk write that skips the signals: seats_assigned stays at 0.
+        RoleSlot.objects.filter(pk=slot.pk).update(user=self.users[0], status="assigned")
+        update_role_slots([{"id": slot.pk, "user": None, "status": "open", "version": slot.version}])
+        self.assertEqual(self.counters()[self.ships[0].pk][2], 0)
+        recount_seats()
+        self.assertEqual(self.counters()[self.ships[0].pk], (1, 1, 0, 0))
+
+    def test_recount_command_repairs_drift(self):
+        ShipRoleTemplate.objects.create(ship=self.ships[0], role_name="Pilote", slots=2)
+        Ship.objects.filter(pk=self.ships[0].pk).update(seats_total=9, seats_open=0)
+        out = StringIO()
+        call_command("recount_seats", stdout=out)
+        self.assertIn("1 ship(s)", out.getvalue())
+        self.assertEqual(self.counters()[self.ships[0].pk], (2, 2, 0, 0))
+
+
+class AutofillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            get_user_model().objects.create_user(username=f"autofill-{number}", password="pass")
+            for number in range(6)
+        ]
+        cls.first = Ship.objects.create(name="Autofill A", min_crew=2, max_crew=3)
+        cls.second = Ship.objects.create(name="Autofill B", min_crew=2, max_crew=4)
+        ShipRoleTemplate.objects.create(ship=cls.first, role_name="Pilote", slots=1)
+        ShipRoleTemplate.objects.create(ship=cls.first, role_name="Artilleur", slots=3)
+        ShipRoleTemplate.objects.create(ship=cls.second, role_name="Artilleur", slots=4)
+        cls.operation = Operation.objects.create(title="Autofill Op", is_active=True)
+        reconcile_highlighted_ships(cls.operation, {cls.first.pk: {}, cls.second.pk: {}})
+
+    def test_minimum_crews_are_covered_before_filling_up(self):
+        slots = [(ship * 10 + index, ship, "Équipage") for ship in (1, 2) for index in range(4)]
+        assignments = solve([(1, 2, 4), (2, 2, 4)], slots, [101, 102, 103, 104])
+        self.assertEqual(sorted(slot_id // 10 for slot_id in assignments), [1, 1, 2, 2])
+
+    def test_preferences_restrict_roles(self):
+        slots = [(1, 1, "Pilote"), (2, 1, "Artilleur")]
+        assignments = solve([(1, 2, 2)], slots, [101, 102, 103], {101: ["artilleur"], 102: ["Tourelle"]})
+        self.assertEqual(assignments, {1: 103, 2: 101})
+
+    def test_plan_respects_max_crew_and_skips_seated_users(self):
+        seated = RoleSlot.objects.get(ship=self.second, index=1)
+        seated.user = self.users[0]
+        seated.status = "confirmed"
+        seated.save()
+        plan = AutofillPlan(self.operation, [user.pk for user in self.users])
+        self.assertNotIn(self.users[0].pk, plan.pool)
+        added = {row["ship"].pk: row["added"] for row in plan.summary()}
+        self.assertEqual(added, {self.first.pk: 3, self.second.pk: 2})
+        self.assertEqual(plan.unassigned_users, [])
+
+    def test_default_pool_leaves_out_inactive_users(self):
+        inactive = self.users[5]
+        inactive.is_active = False
+        inactive.save()
+        plan = AutofillPlan(self.operation)
+        self.assertEqual(plan.pool, [user.pk for user in self.users[:5]])
+        self.assertNotIn(inactive.pk, plan.assignments.values())
+
+    def test_apply_writes_in_bulk_and_keeps_counters(self):
+        plan = AutofillPlan(self.operation, [user.pk for user in self.users[:4]])
+        # savepoint, users, versions, one UPDATE, counters, reload, release
+        with self.assertNumQueries(7):
+            slots = plan.apply()
+        self.assertEqual({(slot.status, slot.version) for slot in slots}, {("assigned", 1)})
+        self.assertEqual(recount_seats(), 0)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.seats_assigned, self.second.seats_assigned), (2, 2))
+
+    def test_apply_refuses_seats_taken_meanwhile(self):
+        plan = AutofillPlan(self.operation, [user.pk for user in self.users[:2]])
+        taken = next(iter(plan.assignments))
+        update_role_slots([{"id": taken, "user": None, "status": "assigned", "version": 0}])
+        with self.assertRaises(SlotConflict):
+            plan.apply()
+        self.assertEqual(RoleSlot.objects.filter(status="assigned").count(), 1)
+
+    def test_command_previews_unless_asked_to_apply(self):
+        out = StringIO()
+        call_command("autofill_operation", stdout=out)
+        self.assertIn("Preview: 6 seat(s) for 6 available user(s), 2 left open", out.getvalue())
+        self.assertFalse(RoleSlot.objects.filter(user__isnull=False).exists())
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        preferences = Path(directory.name) / "preferences.json"
+        preferences.write_text(json.dumps({"autofill-1": ["Pilote"]}), encoding="utf-8")
+        call_command(
+            "autofill_operation",
+            str(self.operation.pk),
+            "--apply",
+            "--preferences",
+            str(preferences),
+            "--only-listed",
+            stdout=out,
+        )
+        self.assertIn("Applied: 1 seat(s)", out.getvalue())
+        self.assertEqual(RoleSlot.objects.get(user=self.users[1]).role_name, "Pilote")
+
+
+class ShipClassificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = get_user_model().objects.create_user(
+            username="classification-manager", password="pass", is_superuser=True
+        )
+        cls.hauler = Ship.objects.create(
+            name="Classification Hauler", role="Heavy Freight", category="CAP", max_crew=4
+        )
+        cls.fighter = Ship.objects.create(
+            name="Classification Fighter", role="", category="LF", max_crew=1
+        )
+
+    def test_matcher_prefers_tree_order_over_text_position(self):
+        # "carrier" belongs to both "capitaux" and "hauling"; the first wins.
+        self.assertEqual(match_filter_category("Cargo Carrier"), ("military", "capitaux"))
+        self.assertEqual(match_filter_category("Medical, Refuel"), ("support", "medical"))
+        self.assertEqual(match_filter_category("Unknown"), (None, None))
+
+    def test_classification_is_stored_and_kept_in_sync(self):
+        self.assertEqual(
+            (self.hauler.filter_category, self.hauler.filter_subcategory),
+            ("industrial", "hauling"),
+        )
+        self.assertEqual(self.fighter.filter_subcategory_label, "Chasseur")
+
+        self.hauler.role = "Salvage"
+        self.hauler.save(update_fields=["role"])
+        self.hauler.refresh_from_db()
+        self.assertEqual(self.hauler.filter_subcategory, "salvage")
+
+    def test_seeded_ships_are_classified(self):
+        # A starter from an older seed, filed under another category.
+        sabre = Ship.objects.create(name="Aegis Sabre", category="CAP", max_crew=2)
+        get_ship_choices()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("seed_ships_basic", stdout=StringIO())
+        self.assertIsNone(SHIPS.get("choices"))
+        sabre.refresh_from_db()
+        self.assertEqual((sabre.category, sabre.filter_subcategory), ("MF", "chasseur"))
+        self.assertEqual(Ship.objects.get(name="RSI Polaris").filter_subcategory, "capitaux")
+
+    def test_ships_list_filters_in_the_database(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(reverse("ships_list"), {"cat": "military", "subcat": "chasseur"})
+        names = [ship.name for ship in response.context["ships"]]
+        self.assertIn("Classification Fighter", names)
+        self.assertNotIn("Classification Hauler", names)
+        self.assertTrue(
+            all(ship.filter_subcategory == "chasseur" for ship in response.context["ships"])
+        )
+        self.assertContains(response, "Classification Fighter")
+
+
+class ShipCatalogImportTests(TestCase):
+    def write_catalog(self, rows):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "catalog.json"
+        path.write_text(json.dumps(rows), encoding="utf-8")
+        return str(path)
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command("import_ship_catalog", *args, stdout=out)
+        return out.getvalue()
+
+    def test_parse_crew(self):
+        self.assertEqual(parse_crew("3 - 9"), (3, 9))
+        self.assertEqual(parse_crew("4"), (4, 4))
+        self.assertEqual(parse_crew("-"), (0, 0))
+
+    def test_import_upserts_and_skips_unchanged_catalogs(self):
+        Ship.objects.create(name="Catalog Existing", role="Light Fighter", max_crew=1)
+        path = self.write_catalog(
+            [
+                {"name": "Catalog Existing", "manufacturer": "RSI", "role": "Light Fighter", "crew": "1", "cargo": "-"},
+                {"name": "Catalog New", "manufacturer": "MISC", "role": "Heavy Freight", "crew": "2 - 4", "cargo": "696"},
+            ]
+        )
+
+        output = self.run_import(path, "--dry-run")
+        self.assertIn("Dry run: 1 created, 1 updated", output)
+        self.assertFalse(Ship.objects.filter(name="Catalog New").exists())
+
+        self.run_import(path)
+        ship = Ship.objects.get(name="Catalog New")
+        self.assertEqual((ship.min_crew, ship.max_crew, ship.category), (2, 4, "CAP"))
+        self.assertEqual(ship.filter_subcategory, "hauling")
+        self.assertEqual(Ship.objects.get(name="Catalog Existing").manufacturer, "RSI")
+        self.assertEqual(ShipCatalogImport.objects.count(), 1)
+
+        # Only the last import is read; the Ship table is not diffed.
+        with self.assertNumQueries(1):
+            output = self.run_import(path)
+        self.assertIn("already imported", output)
+        self.assertEqual(ShipCatalogImport.objects.count(), 1)
+
+        output = self.run_import(path, "--force")
+        self.assertIn("0 created, 0 updated", output)
+
+    def test_import_drops_the_cached_overview_block(self):
+        ship = Ship.objects.create(name="Catalog Highlighted", role="Light Fighter", max_crew=1)
+        reconcile_highlighted_ships(
+            Operation.objects.create(title="Catalog Op", is_active=True), {ship.pk: {}}
+        )
+        OPERATION.set("stale", "overview")
+        path = self.write_catalog(
+            [{"name": "Catalog Highlighted", "manufacturer": "RSI", "role": "Light Fighter", "crew": "1", "cargo": "4"}]
+        )
+        self.run_import(path)
+        self.assertIsNone(OPERATION.get("overview"))
+
+
+class CargoCapacityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = get_user_model().objects.create_user(
+            username="cargo-manager", password="pass", is_superuser=True
+        )
+        cls.small = Ship.objects.create(name="Cargo Small", cargo_capacity="46", max_crew=1)
+        cls.large = Ship.objects.create(name="Cargo Large", cargo_capacity="696", max_crew=4)
+        cls.unknown = Ship.objects.create(name="Cargo Unknown", cargo_capacity="-", max_crew=1)
+
+    def test_parse_scu(self):
+        self.assertEqual(parse_scu("1 500"), 1500)
+        self.assertEqual(parse_scu("96 SCU"), 96)
+        self.assertIsNone(parse_scu("?"))
+        # Digits that int() rejects
+        self.assertIsNone(parse_scu("96²"))
+        self.assertEqual((self.small.cargo_scu, self.unknown.cargo_scu), (46, None))
+
+        self.small.cargo_capacity = "66"
+        self.small.save(update_fields=["cargo_capacity"])
+        self.small.refresh_from_db()
+        self.assertEqual(self.small.cargo_scu, 66)
+
+    def test_ships_list_filters_and_sorts_by_cargo(self):
+        self.client.force_login(self.manager)
+
+        def listed(params):
+            response = self.client.get(reverse("ships_list"), params)
+            scus = [ship.cargo_scu for ship in response.context["ships"]]
+            names = [ship.name for ship in response.context["ships"] if ship.name.startswith("Cargo ")]
+            return scus, names
+
+        scus, names = listed({"min_scu": "40", "sort": "cargo"})
+        self.assertEqual(scus, sorted(scus, reverse=True))
+        self.assertTrue(all(scu >= 40 for scu in scus))
+        self.assertEqual(names, ["Cargo Large", "Cargo Small"])
+
+        scus, names = listed({"max_scu": "100", "min_scu": "x"})
+        self.assertTrue(all(scu is not None and scu <= 100 for scu in scus))
+        self.assertEqual(names, ["Cargo Small"])
+
+        # A digit that int() rejects is ignored like any other bad bound.
+        self.assertEqual(listed({"max_scu": "100", "min_scu": "²"})[1], ["Cargo Small"])
+
+    def test_highlighted_cargo_capacity_is_one_query(self):
+        operation = Operation.objects.create(title="Cargo Run", is_active=True)
+        for ship in (self.small, self.large, self.unknown):
+            OperationHighlightedShip.objects.create(operation=operation, ship=ship)
+        with self.assertNumQueries(1):
+            totals = highlighted_cargo_capacity(operation)
+        self.assertEqual(totals, {"total": 742, "unknown": 1})
+
+
+@override_settings(OPS_ASSIGNMENTS_CACHE_TIMEOUT=300)
+class MemberAssignmentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = get_user_model().objects.create_user(username="Alpha", password="pass")
+        cls.other = get_user_model().objects.create_user(username="Bravo", password="pass")
+        cls.ship = Ship.objects.create(name="Member Ship", max_crew=2)
+        ShipRoleTemplate.objects.create(ship=cls.ship, role_name="Pilote", slots=2)
+        cls.slot = RoleSlot.objects.get(ship=cls.ship, index=1)
+        cls.slot.user = cls.member
+        cls.slot.status = "assigned"
+        cls.slot.save()
+        cls.operation = Operation.objects.create(title="Member Op", is_active=True)
+        reconcile_highlighted_ships(cls.operation, {cls.ship.pk: {"gunner": ["alpha", "Charlie"]}})
+        past = Operation.objects.create(title="Past Op")
+        reconcile_highlighted_ships(past, {cls.ship.pk: {"pilot": ["Alpha"]}})
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.member)
+
+    def fetch(self):
+        return self.client.get(reverse("my_assignments_json")).json()
+
+    def test_lists_seats_and_active_crew_entries(self):
+        data = self.fetch()
+        self.assertEqual(
+            [(slot["ship_name"], slot["role"], slot["index"], slot["status"]) for slot in data["slots"]],
+            [("Member Ship", "Pilote", 1, "assigned")],
+        )
+        self.assertEqual(
+            [(entry["operation_title"], entry["role"]) for entry in data["crew"]],
+            [("Member Op", "gunner")],
+        )
+
+    def test_page_renders_the_assignments(self):
+        response = self.client.get(reverse("my_assignments"))
+        self.assertContains(response, "Member Ship")
+        self.assertContains(response, "Gunner")
+
+    def test_second_request_is_served_from_cache(self):
+        # session, user, slots, crew
+        with self.assertNumQueries(4):
+            self.fetch()
+        # session, user
+        with self.assertNumQueries(2):
+            self.fetch()
+
+    def test_slot_changes_invalidate_both_holders(self):
+        self.fetch()
+        self.client.force_login(self.other)
+        self.assertEqual(self.fetch()["slots"], [])
+        update_role_slots(
+            [{"id": self.slot.pk, "user": self.other.pk, "status": "confirmed", "version": 0}]
+        )
+        self.assertEqual([slot["status"] for slot in self.fetch()["slots"]], ["confirmed"])
+        self.client.force_login(self.member)
+        self.assertEqual(self.fetch()["slots"], [])
+
+        slot = RoleSlot.objects.get(pk=self.slot.pk)
+        slot.user = self.member
+        slot.save()
+        self.assertEqual(len(self.fetch()["slots"]), 1)
+
+    def test_crew_changes_invalidate_every_member(self):
+        self.fetch()
+        OperationHighlightedCrewAssignment.objects.filter(crew_name="alpha").delete()
+        self.assertEqual(self.fetch()["crew"], [])
+
+    def test_reconcile_invalidates_added_and_removed_members(self):
+        self.assertContains(self.client.get(reverse("my_assignments")), "Gunner")
+        self.client.force_login(self.other)
+        self.assertNotContains(self.client.get(reverse("my_assignments")), "Gunner")
+        with self.captureOnCommitCallbacks(execute=True):
+            reconcile_highlighted_ships(
+                self.operation, {self.ship.pk: {"gunner": ["Bravo", "Charlie"]}}
+            )
+        self.assertContains(self.client.get(reverse("my_assignments")), "Gunner")
+        self.client.force_login(self.member)
+        self.assertNotContains(self.client.get(reverse("my_assignments")), "Gunner")
+
+
+class HighlightedShipReconcilerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ships = [
+            Ship.objects.create(name=f"Reconcile Ship {number:02d}", max_crew=4)
+            for number in range(12)
+        ]
+
+    def _entries(self, ships, suffix=""):
+        return {
+            ship.pk: {"pilot": [f"Pilot {ship.pk}{suffix}"], "gunner": ["G1", "G2"]}
+            for ship in ships
+        }
+
+    def _edit_queries(self, ship_count):
+        operation = Operation.objects.create(title=f"Reconcile {ship_count}")
+        ships = self.ships[:ship_count]
+        reconcile_highlighted_ships(operation, self._entries(ships))
+        # rename every pilot, drop a gunner, swap one ship for another
+        edited = self._entries(ships[1:] + [self.ships[-1]], suffix="'")
+        for roles in edited.values():
+            roles["gunner"] = ["G1"]
+        with CaptureQueriesContext(connection) as queries:
+            reconcile_highlighted_ships(operation, edited)
+        return operation, edited, len(queries)
+
+    def test_edits_only_touch_changed_rows(self):
+        operation = Operation.objects.create(title="Reconcile keep")
+        reconcile_highlighted_ships(operation, self._entries(self.ships[:2]))
+        before = dict(
+            OperationHighlightedCrewAssignment.objects.filter(
+                highlighted_ship__operation=operation, role="gunner", order=1
+            ).values_list("highlighted_ship_id", "pk")
+        )
+        links_before = set(operation.highlighted_ship_links.values_list("pk", flat=True))
+
+        entries = self._entries(self.ships[:2])
+        entries[self.ships[0].pk]["pilot"] = ["Renamed"]
+        reconcile_highlighted_ships(operation, entries)
+
+        self.assertEqual(set(operation.highlighted_ship_links.values_list("pk", flat=True)), links_before)
+        after = dict(
+            OperationHighlightedCrewAssignment.objects.filter(
+                highlighted_ship__operation=operation, role="gunner", order=1
+            ).values_list("highlighted_ship_id", "pk")
+        )
+        self.assertEqual(after, before)
+        link = operation.highlighted_ship_links.get(ship=self.ships[0])
+        self.assertEqual(link.get_crew_list("pilot"), ["Renamed"])
+        self.assertEqual(link.get_crew_list("gunner"), ["G1", "G2"])
+
+    def test_query_count_does_not_grow_with_ships(self):
+        small_operation, small_entries, small = self._edit_queries(2)
+        large_operation, large_entries, large = self._edit_queries(10)
+        self.assertEqual(small, large)
+
+        for operation, entries in ((small_operation, small_entries), (large_operation, large_entries)):
+            stored = {
+                link.ship_id: {role: link.get_crew_list(role) for role in ("pilot", "gunner")}
+                for link in operation.highlighted_ship_links.prefetch_related("crew_assignments")
+            }
+            self.assertEqual(stored, entries)
+
+
+class SharedShipChoicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = get_user_model().objects.create_user(
+            username="ship-choices-manager", password="pass", is_superuser=True
+        )
+        cls.ships = [
+            Ship.objects.create(name=f"Choice Ship {number:02d}", max_crew=2)
+            for number in range(10)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.manager)
+
+    def _edit_page_queries(self, ship_count):
+        operation = Operation.objects.create(title=f"Choices {ship_count}")
+        reconcile_highlighted_ships(
+            operation, {ship.pk: {} for ship in self.ships[:ship_count]}
+        )
+        url = reverse("operation_edit", args=[operation.pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'id="ship-choices"', count=1)
+        self.assertContains(response, 'data-choices="ship-choices"', count=ship_count + 1)
+        return len(queries)
+
+    def test_edit_page_queries_do_not_grow_with_highlighted_ships(self):
+        self.assertEqual(self._edit_page_queries(2), self._edit_page_queries(10))
+
+    def test_bound_formset_loads_submitted_ships_once(self):
+        data = {
+            "ships-TOTAL_FORMS": "3",
+            "ships-INITIAL_FORMS": "0",
+            "ships-0-ship": str(self.ships[0].pk),
+            "ships-1-ship": str(self.ships[1].pk),
+            "ships-2-ship": "999999",
+        }
+        formset = HighlightedShipFormSet(data, prefix="ships")
+        with self.assertNumQueries(1):
+            self.assertFalse(formset.is_valid())
+        self.assertEqual(formset.forms[1].cleaned_data["ship"], self.ships[1])
+        self.assertIn("ship", formset.forms[2].errors)
+
+    def test_cached_choices_follow_ship_changes(self):
+        get_ship_choices()
+        with self.assertNumQueries(0):
+            choices = get_ship_choices()
+        self.assertEqual(choices.labels[str(self.ships[0].pk)], "Choice Ship 00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ships[0].name = "Choice Ship Renamed"
+            self.ships[0].save()
+            # Until the commit, readers keep the committed list.
+            self.assertEqual(get_ship_choices().labels[str(self.ships[0].pk)], "Choice Ship 00")
+        self.assertEqual(get_ship_choices().labels[str(self.ships[0].pk)], "Choice Ship Renamed")
+
+    @override_settings(OPS_SHIP_CHOICES_CACHE_TIMEOUT=60)
+    def test_cached_choices_expire(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            get_ship_choices()
+        self.assertEqual(cache_set.call_args.args[2], 60)
+
+
+class OperationOverviewCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = get_user_model().objects.create_user(
+            username="overview-member", password="pass", is_superuser=True
+        )
+        cls.ship = Ship.objects.create(name="Overview Ship", max_crew=2)
+        cls.operation = Operation.objects.create(title="Overview Op", is_active=True)
+        reconcile_highlighted_ships(cls.operation, {cls.ship.pk: {"pilot": ["Alpha"]}})
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.member)
+
+    def test_block_is_served_from_cache(self):
+        self.assertContains(self.client.get(reverse("operation_overview")), "Alpha")
+        # session, user, operation stamp
+        with self.assertNumQueries(3):
+            self.assertContains(self.client.get(reverse("operation_overview")), "Alpha")
+
+    def test_crew_change_invalidates_the_block(self):
+        self.client.get(reverse("operation_overview"))
+        assignment = OperationHighlightedCrewAssignment.objects.get(crew_name="Alpha")
+        assignment.crew_name = "Bravo"
+        assignment.save()
+        response = self.client.get(reverse("operation_overview"))
+        self.assertContains(response, "Bravo")
+        self.assertNotContains(response, "Alpha")
+
+    def test_ship_change_invalidates_the_block(self):
+        self.client.get(reverse("operation_overview"))
+        self.ship.name = "Renamed Overview Ship"
+        self.ship.save()
+        self.assertContains(self.client.get(reverse("operation_overview")), "Renamed Overview Ship")
+
+    def test_switching_active_operation_bypasses_stale_block(self):
+        self.client.get(reverse("operation_overview"))
+        Operation.objects.create(title="Next Op", is_active=True)
+        response = self.client.get(reverse("operation_overview"))
+        self.assertContains(response, "Next Op")
+        self.assertNotContains(response, "Overview Op")
+
+    @override_settings(OPS_OVERVIEW_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        self.client.get(reverse("operation_overview"))
+        self.assertIsNone(OPERATION.get("overview"))
+
+
+class _StandInRedis:
+    """In-memory stand-in for the part of redis-py used by ``RedisCache``."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expires[key] = time.monotonic() + ex
+        return True
+
+    def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys if self._alive(key))
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def incr(self, key, delta=1):
+        self.data[key] = int(self.data.get(key, 0)) + delta
+        return self.data[key]
+
+    def expire(self, key, timeout):
+        if self._alive(key):
+            self.expires[key] = time.monotonic() + timeout
+        return True
+
+    def persist(self, key):
+        self.expires.pop(key, None)
+        return True
+
+    def flushdb(self):
+        self.data.clear()
+        self.expires.clear()
+        return True
+
+    def pipeline(self):
+        return _StandInPipeline(self)
+
+
+class _StandInPipeline:
+    def __init__(self, server):
+        self.server = server
+        self.calls = []
+
+    def mset(self, mapping):
+        self.calls.append(lambda: [self.server.set(key, value) for key, value in mapping.items()])
+
+    def expire(self, key, timeout):
+        self.calls.append(lambda: self.server.expire(key, timeout))
+
+    def execute(self):
+        return [call() for call in self.calls]
+
+
+class _StandInRedisClient(RedisCacheClient):
+    server = _StandInRedis()
+
+    def __init__(self, servers, **options):
+        self._servers = servers
+        self._serializer = RedisSerializer()
+
+    def get_client(self, key=None, *, write=False):
+        return self.server
+
+
+class StandInRedisCache(RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = _StandInRedisClient
+
+
+class CacheLayerTests(SimpleTestCase):
+    def backends(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return {
+            "locmem": {"BACKEND": cache_url.BACKENDS["locmem"], "LOCATION": "cache-layer"},
+            "file": cache_url.parse(f"file://{directory.name}"),
+            "redis": {"BACKEND": "ops.tests.StandInRedisCache", "LOCATION": "redis://stand-in"},
+        }
+
+    def on_each_backend(self, check):
+        for name, config in self.backends().items():
+            with self.subTest(backend=name), override_settings(
+                CACHES={"default": {**config, "KEY_PREFIX": "ckfr-test"}}
+            ):
+                cache.clear()
+                try:
+                    check()
+                finally:
+                    cache.clear()
+                    reset_stats()
+
+    def test_parse_cache_urls(self):
+        self.assertEqual(cache_url.parse("")["BACKEND"], cache_url.BACKENDS["locmem"])
+        self.assertEqual(cache_url.parse("locmem://ops")["LOCATION"], "ops")
+        self.assertEqual(
+            cache_url.parse("file:///var/cache/ckfr", key_prefix="ckfr"),
+            {
+                "BACKEND": cache_url.BACKENDS["file"],
+                "LOCATION": "/var/cache/ckfr",
+                "KEY_PREFIX": "ckfr",
+            },
+        )
+        self.assertEqual(cache_url.parse("dummy://"), {"BACKEND": cache_url.BACKENDS["dummy"]})
+        with self.assertRaises(ImproperlyConfigured):
+            cache_url.parse("memcached://localhost")
+        with patch("ckfr_site.cache_url.importlib.util.find_spec", return_value=object()):
+            self.assertEqual(
+                cache_url.parse("redis://a:6379/0,redis://b:6379/0")["LOCATION"],
+                ["redis://a:6379/0", "redis://b:6379/0"],
+            )
+        with patch("ckfr_site.cache_url.importlib.util.find_spec", return_value=None):
+            with self.assertRaises(ImproperlyConfigured):
+                cache_url.parse("redis://localhost:6379/0")
+
+    def test_keys_are_namespaced_and_versioned(self):
+        self.assertEqual(SHIPS.key("choices"), f"ops:ships:v{SCHEMA_VERSION}:choices")
+        self.assertNotEqual(SHIPS.key("choices"), USERS.key("choices"))
+
+    def test_namespaces_on_every_backend(self):
+        def check():
+            namespace = Namespace("cache-layer-plain", timeout=60)
+            namespace.set({"a": 1}, "entry")
+            self.assertEqual(namespace.get("entry"), {"a": 1})
+            namespace.delete("entry")
+            self.assertIsNone(namespace.get("entry"))
+
+            versioned = Namespace("cache-layer-versioned", timeout=60, versioned=True)
+            versioned.set([1, 2], 7)
+            versioned.set([3], 8)
+            self.assertEqual(versioned.get(7), [1, 2])
+            versioned.invalidate()
+            self.assertIsNone(versioned.get(7))
+            self.assertIsNone(versioned.get(8))
+
+            computed = []
+            self.assertEqual(versioned.get_or_set((9,), lambda: computed.append(1) or "x"), "x")
+            self.assertEqual(versioned.get_or_set((9,), lambda: computed.append(1) or "y"), "x")
+            self.assertEqual(computed, [1])
+            self.assertEqual(stats()["cache-layer-versioned"], {"hits": 2, "misses": 3})
+
+        self.on_each_backend(check)
+
+    def test_waiters_use_the_value_computed_under_the_lock(self):
+        def check():
+            namespace = Namespace("cache-layer-lock", timeout=60)
+            key = namespace.key("slow")
+            self.assertTrue(cache.add(f"{key}:lock", 1, 10))
+            # Another worker holds the lock and stores the value shortly after.
+            timer = threading.Timer(0.1, lambda: namespace.set("shared", "slow"))
+            timer.start()
+            self.addCleanup(timer.cancel)
+            with patch("ops.cache.LOCK_POLL", 0.01):
+                self.assertEqual(namespace.get_or_set(("slow",), lambda: "own"), "shared")
+            timer.join()
+
+        self.on_each_backend(check)
+
+    def test_dead_lock_holder_is_not_waited_for_forever(self):
+        def check():
+            namespace = Namespace("cache-layer-dead-lock", timeout=60)
+            cache.add(f"{namespace.key('stuck')}:lock", 1, 10)
+            with patch("ops.cache.LOCK_WAIT", 0.05), patch("ops.cache.LOCK_POLL", 0.01):
+                self.assertEqual(namespace.get_or_set(("stuck",), lambda: "own"), "own")
+
+        self.on_each_backend(check)
+
+    @override_settings(OPS_ASSIGNMENTS_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_a_namespace(self):
+        ASSIGNMENTS.set(["seat"], 1)
+        self.assertIsNone(ASSIGNMENTS.get(1))
+        self.assertEqual(ASSIGNMENTS.get_or_set((1,), lambda: ["fresh"]), ["fresh"])
+        self.assertIsNone(ASSIGNMENTS.get(1))
+
+
+class ActiveOperationTests(TestCase):
+    def test_activating_an_operation_deactivates_the_previous_one(self):
+        first = Operation.objects.create(title="First", is_active=True)
+        second = Operation.objects.create(title="Second")
+        second.is_active = True
+        # savepoint, previous active row, the save itself, release
+        with self.assertNumQueries(4):
+            second.save()
+        first.refresh_from_db()
+        self.assertFalse(first.is_active)
+        self.assertEqual(list(Operation.objects.filter(is_active=True)), [second])
+
+    def test_database_rejects_a_second_active_operation(self):
+        Operation.objects.create(title="First", is_active=True)
+        second = Operation.objects.create(title="Second")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Operation.objects.filter(pk=second.pk).update(is_active=True)
+
+
+class QueryPlanTests(TestCase):
+    """The hot lookups are answered from the indexes added in 0016."""
+
+    def plan(self, queryset):
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise always be scanned.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"No plan expectations for {connection.vendor}.")
+        self.assertIn(index_name, self.plan(queryset))
+
+    def test_slots_of_a_role_use_the_unique_index(self):
+        self.assertUsesIndex(
+            RoleSlot.objects.filter(ship_id=1, role_name="Pilote"),
+            "ops_roleslot_ship_id_role_name_index",
+        )
+
+    def test_ordered_slots_of_a_ship_need_no_sort(self):
+        queryset = RoleSlot.objects.filter(ship_id=1).order_by("ship", "role_name", "index")
+        self.assertUsesIndex(queryset, "ops_roleslot_ship_id_role_name_index")
+        self.assertNotIn("TEMP B-TREE", self.plan(queryset))
+        self.assertNotIn("Sort Key", self.plan(queryset))
+
+    def test_slots_of_a_user_by_status_use_the_composite_index(self):
+        self.assertUsesIndex(
+            RoleSlot.objects.filter(user_id=1, status="assigned"),
+            "ops_roleslot_user_status_idx",
+        )
+
+    def test_open_slots_use_the_status_index(self):
+        self.assertUsesIndex(
+            RoleSlot.objects.filter(status="open").values("ship"),
+            "ops_roleslot_status_ship_idx",
+        )
+
+    def test_crew_entries_by_name_use_the_lower_index(self):
+        self.assertUsesIndex(
+            OperationHighlightedCrewAssignment.objects.alias(name=Lower("crew_name")).filter(
+                name="alpha"
+            ),
+            "ops_crew_name_lower_idx",
+        )
+
+    def test_active_operation_uses_the_partial_index(self):
+        self.assertUsesIndex(
+            Operation.objects.filter(is_active=True), "ops_operation_single_active"
+        )
+
+    def test_latest_operation_uses_the_updated_at_index(self):
+        self.assertUsesIndex(
+            Operation.objects.order_by("-updated_at")[:1], "ops_operation_updated_idx"
+        )
+
+
+class ViewBenchmarkTests(TestCase):
+    def test_compare_results_flags_growing_queries_and_slowdowns(self):
+        small = {"ships_list": {"ms": 10.0, "queries": 3, "bytes": 1}}
+        medium = {"ships_list": {"ms": 20.0, "queries": 4, "bytes": 1}}
+        problems = compare_results({"small": small, "medium": medium})
+        self.assertEqual(len(problems), 1)
+        self.assertIn("3 queries at small but 4 at medium", problems[0])
+
+        baseline = {"small": {"ships_list": {"ms": 5.0, "queries": 3, "bytes": 1}}}
+        self.assertEqual(len(compare_results({"small": small}, baseline, threshold=0.5)), 1)
+        self.assertEqual(compare_results({"small": small}, baseline, threshold=1.5), [])
+
+    def test_bench_views_writes_json_results(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = Path(directory.name) / "bench.json"
+        call_command(
+            "bench_views", "--scales", "small", "--repeat", "1", "--output", str(output), stdout=StringIO()
+        )
+        results = json.loads(output.read_text(encoding="utf-8"))["results"]["small"]
+        self.assertEqual(
+            set(results),
+            {"ships_allocation", "ship_detail", "operation_overview", "operations_manage", "ships_list"},
+        )
+        self.assertTrue(all(measured["bytes"] for measured in results.values()))
+
+
+class LiveEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = get_user_model().objects.create_user(username="live-member", password="pass")
+        cls.ship = Ship.objects.create(name="Live Ship", max_crew=2)
+        cls.slot = RoleSlot.objects.create(ship=cls.ship, role_name="Pilote", index=1)
+
+    def test_stream_delivers_events_published_from_another_thread(self):
+        broker = InProcessBroker()
+
+        async def consume():
+            stream = event_stream(broker, heartbeat=5)
+            self.assertEqual(await anext(stream), "retry: 5000\n\n")
+            thread = threading.Thread(target=broker.publish, args=([{"type": "slot", "id": 7}],))
+            thread.start()
+            chunk = await asyncio.wait_for(anext(stream), 5)
+            thread.join()
+            await stream.aclose()
+            return chunk
+
+        chunk = asyncio.run(consume())
+        self.assertTrue(chunk.startswith("event: slot\ndata: "))
+        self.assertEqual(json.loads(chunk.split("data: ", 1)[1])["id"], 7)
+        self.assertEqual(broker.subscriber_count, 0)
+
+    def test_slot_events_describe_current_state_and_deletions(self):
+        RoleSlot.objects.filter(pk=self.slot.pk).update(user=self.member, status="assigned")
+        events = slot_events([self.slot.pk, 999999])
+        self.assertEqual(
+            [(event["type"], event["id"]) for event in events],
+            [("slot", self.slot.pk), ("slot_deleted", 999999)],
+        )
+        self.assertEqual(events[0]["user_label"], "live-member")
+
+    def test_bulk_slot_updates_publish_after_commit(self):
+        published = []
+        broker = InProcessBroker()
+        broker.wants_events = lambda: True
+        broker.publish = published.extend
+        with patch("ops.live.get_broker", return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                update_role_slots(
+                    [{"id": self.slot.pk, "user": None, "status": "confirmed", "version": 0}]
+                )
+        self.assertEqual([(event["id"], event["status"]) for event in published], [(self.slot.pk, "confirmed")])
+
+    def test_wsgi_requests_are_told_not_to_reconnect(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(reverse("live_events")).status_code, 204)
@@ -3,6 +3,8 @@ from . import views
 
 urlpatterns = [
     path("operation/", views.operation_overview, name="operation_overview"),
+    path("me/assignments/", views.my_assignments, name="my_assignments"),
+    path("me/assignments.json", views.my_assignments_json, name="my_assignments_json"),
     path("operations/manage/", views.operations_manage, name="operations_manage"),
     path("operations/<int:pk>/edit/", views.operation_edit, name="operation_edit"),
     path(
@@ -14,5 +16,8 @@ urlpatterns = [
     path("ships/", views.ships_list, name="ships_list"),
     path("ships/allocation/", views.ships_allocation, name="ships_allocation"),
     path("ships/<int:pk>/", views.ship_detail, name="ship_detail"),
+    path("ships/<int:pk>/slots/", views.ship_slots, name="ship_slots"),
     path("slot/<int:pk>/update/", views.role_slot_update, name="role_slot_update"),
+    path("slots/update/", views.role_slots_update, name="role_slots_update"),
+    path("live/", views.live_events, name="live_events"),
 ]
\ No newline at end of file
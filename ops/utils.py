@@ -2,6 +2,12 @@
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import FieldDoesNotExist, FieldError
+from django.db import transaction
+
+from .cache import USERS
+
+# Ordering field per (user model, USERNAME_FIELD), filled at app ready.
+_order_fields: dict[tuple[type, str], str] = {}
 
 
 def resolve_username_lookup():
@@ -14,11 +20,16 @@ def resolve_username_lookup():
     """
 
     user_model = get_user_model()
-    order_field = getattr(user_model, "USERNAME_FIELD", "username")
-    try:
-        user_model._meta.get_field(order_field)
-    except FieldDoesNotExist:
-        order_field = "pk"
+    username_field = getattr(user_model, "USERNAME_FIELD", "username")
+    key = (user_model, username_field)
+    order_field = _order_fields.get(key)
+    if order_field is None:
+        try:
+            user_model._meta.get_field(username_field)
+            order_field = username_field
+        except FieldDoesNotExist:
+            order_field = "pk"
+        _order_fields[key] = order_field
     return user_model, order_field
 
 
@@ -30,4 +41,23 @@ def get_ordered_user_queryset():
     try:
         return manager.order_by(order_field)
     except FieldError:
-        return manager.order_by("pk")
\ No newline at end of file
+        return manager.order_by("pk")
+
+
+def ordered_user_choices() -> list[tuple[int, str]]:
+    """Return ``(pk, label)`` for every user, in picker order.
+
+    The list is built once and kept in the ``users`` cache namespace until
+    ``ops.signals`` drops it after a user or a group changes. Other workers'
+    local caches only drop it after ``OPS_USER_CHOICES_CACHE_TIMEOUT`` seconds.
+    """
+
+    return USERS.get_or_set(
+        ("choices",), lambda: [(user.pk, str(user)) for user in get_ordered_user_queryset()]
+    )
+
+
+def forget_user_choices() -> None:
+    # After the commit: dropped earlier, a concurrent request could cache the
+    # pre-commit list again.
+    transaction.on_commit(lambda: USERS.delete("choices"))
@@ -1,313 +1,82 @@
 """Views for the operations module."""
 
-from collections import OrderedDict
+import json
 
 from django.contrib import messages
 from django.contrib.auth import decorators as auth_decorators
+from django.db.models import Count, F
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 
+from .classification import FILTER_TREE, SUBCATEGORY_LOOKUP
 from .forms import (
     HighlightedShipFormSet,
     OperationForm,
     RoleSlotForm,
+    SharedUserChoices,
     ShipRoleTemplateForm,
 )
+from .live import event_stream
 from .models import (
     Operation,
-    OperationHighlightedCrewAssignment,
     OperationHighlightedShip,
     RoleSlot,
     Ship,
 )
 from .permissions import can_manage_ops
 from .services import (
+    allocation_ships,
+    build_user_choices,
     group_ships_by_category,
+    member_assignments,
     prepare_ship_for_display,
+    reconcile_highlighted_ships,
+    render_operation_block,
+    serialize_slots,
     ships_with_slots,
 )
+from .slots import SlotConflict, SlotUpdateError, update_role_slots
 
-
-FILTER_TREE = OrderedDict(
-    (
-        (
-            "military",
-            {
-                "label": "Militaire",
-                "subcategories": OrderedDict(
-                    (
-                        (
-                            "chasseur",
-                            {
-                                "label": "Chasseur",
-                                "keywords": (
-                                    "fighter",
-                                    "stealth",
-                                    "combat",
-                                    "interceptor",
-                                    "racing",
-                                    "patrol",
-                                    "escort",
-                                    "pursuit",
-                                ),
-                            },
-                        ),
-                        (
-                            "capitaux",
-                            {
-                                "label": "Capitaux",
-                                "keywords": (
-                                    "destroyer",
-                                    "frigate",
-                                    "corvette",
-                                    "carrier",
-                                    "dread",
-                                    "capital",
-                                    "battle",
-                                    "battleship",
-                                ),
-                            },
-                        ),
-                        (
-                            "gunship",
-                            {
-                                "label": "Gun Ship",
-                                "keywords": ("gunship",),
-                            },
-                        ),
-                        (
-                            "bomber",
-                            {
-                                "label": "Bomber",
-                                "keywords": ("bomber",),
-                            },
-                        ),
-                        (
-                            "torpilleur",
-                            {
-                                "label": "Torpilleur",
-                                "keywords": ("torpedo", "torp"),
-                            },
-                        ),
-                        (
-                            "interdicteur",
-                            {
-                                "label": "Interdicteur",
-                                "keywords": (
-                                    "interdict",
-                                    "interdiction",
-                                    "minelayer",
-                                    "quantum enforcement",
-                                    "quantum damp",
-                                ),
-                            },
-                        ),
-                        (
-                            "dropship",
-                            {
-                                "label": "Drop Ship",
-                                "keywords": (
-                                    "dropship",
-                                    "drop ship",
-                                    "boarding",
-                                    "troop",
-                                    "personnel",
-                                    "assault",
-                                ),
-                            },
-                        ),
-                    )
-                ),
-            },
-        ),
-        (
-            "industrial",
-            {
-                "label": "Industriel",
-                "subcategories": OrderedDict(
-                    (
-                        (
-                            "salvage",
-                            {
-                                "label": "Salvage",
-                                "keywords": ("salvage", "scrap"),
-                            },
-                        ),
-                        (
-                            "minage",
-                            {
-                                "label": "Minage",
-                                "keywords": (
-                                    "mining",
-                                    "prospecting",
-                                    "refinery",
-                                ),
-                            },
-                        ),
-                        (
-                            "hauling",
-                            {
-                                "label": "Hauling",
-                                "keywords": (
-                                    "freight",
-                                    "cargo",
-                                    "hauling",
-                                    "transport",
-                                    "courier",
-                                    "logistics",
-                                    "delivery",
-                                    "carrier",
-                                    "merchant",
-                                    "mercantile",
-                                    "trader",
-                                    "commerce",
-                                ),
-                            },
-                        ),
-                    )
-                ),
-            },
-        ),
-        (
-            "support",
-            {
-                "label": "Support",
-                "subcategories": OrderedDict(
-                    (
-                        (
-                            "medical",
-                            {
-                                "label": "Medical",
-                                "keywords": (
-                                    "medical",
-                                    "rescue",
-                                    "hospital",
-                                    "med",
-                                    "triage",
-                                ),
-                            },
-                        ),
-                        (
-                            "refuel",
-                            {
-                                "label": "Refuel",
-                                "keywords": ("refuel", "fuel"),
-                            },
-                        ),
-                        (
-                            "repair",
-                            {
-                                "label": "Repair",
-                                "keywords": (
-                                    "repair",
-                                    "service",
-                                    "tow",
-                                    "tractor",
-                                ),
-                            },
-                        ),
-                        (
-                            "exploration",
-                            {
-                                "label": "Exploration",
-                                "keywords": (
-                                    "explor",
-                                    "expedition",
-                                    "pathfinder",
-                                    "science",
-                                    "survey",
-                                    "touring",
-                                    "recon",
-                                    "scout",
-                                    "reporting",
-                                    "data",
-                                    "observation",
-                                ),
-                            },
-                        ),
-                    )
-                ),
-            },
-        ),
-    )
+SLOT_CONFLICT_MESSAGE = (
+    "La place a été modifiée par quelqu’un d’autre entre-temps. "
+    "Vérifiez son état actuel avant de réessayer."
 )
 
-CATEGORY_FALLBACK = {
-    "LF": ("military", "chasseur"),
-    "MF": ("military", "chasseur"),
-    "HF": ("military", "chasseur"),
-    "CAP": ("military", "capitaux"),
-    "MR": ("support", "exploration"),
-}
-
-SUBCATEGORY_LOOKUP = {
-    sub_slug: {
-        "category": cat_slug,
-        "label": sub_data["label"],
-        "keywords": sub_data["keywords"],
-    }
-    for cat_slug, cat_data in FILTER_TREE.items()
-    for sub_slug, sub_data in cat_data["subcategories"].items()
-}
-
-
-def _match_filter_category(role: str | None) -> tuple[str | None, str | None]:
-    """Return the filter category/subcategory slugs matching the given role."""
-
-    text = (role or "").lower()
-    for cat_slug, cat_data in FILTER_TREE.items():
-        for sub_slug, sub_data in cat_data["subcategories"].items():
-            if any(keyword in text for keyword in sub_data["keywords"]):
-                return cat_slug, sub_slug
-    return None, None
-
-
-def _fallback_filter_category(ship: Ship) -> tuple[str | None, str | None]:
-    """Provide a best-effort category based on the legacy ship category."""
-
-    return CATEGORY_FALLBACK.get(ship.category, (None, None))
-
-
-
-
-def _classify_ship(ship: Ship) -> tuple[str | None, str | None]:
-    """Attach filter metadata to the ship and return the selected slugs."""
-
-    cat_slug, sub_slug = _match_filter_category(ship.role)
-    if not cat_slug:
-        cat_slug, sub_slug = _fallback_filter_category(ship)
-
-    ship.filter_category = cat_slug
-    ship.filter_category_label = (
-        FILTER_TREE.get(cat_slug, {}).get("label") if cat_slug else None
-    )
-    ship.filter_subcategory = sub_slug
-    if sub_slug and sub_slug in SUBCATEGORY_LOOKUP:
-        ship.filter_subcategory_label = SUBCATEGORY_LOOKUP[sub_slug]["label"]
-    else:
-        ship.filter_subcategory_label = None
-    return cat_slug, sub_slug
-
 
 @auth_decorators.login_required
 def operation_overview(request):
     """Display the current operation and its highlighted ship."""
 
-    operation_qs = Operation.objects.prefetch_related(
-        "highlighted_ship_links__ship",
-        "highlighted_ship_links__crew_assignments",
-    )
-    operation = operation_qs.filter(is_active=True).first()
-    if operation is None:
-        operation = operation_qs.order_by("-updated_at").first()
+    stamps = Operation.objects.only("pk", "updated_at")
+    stamp = stamps.filter(is_active=True).first()
+    if stamp is None:
+        stamp = stamps.order_by("-updated_at").first()
 
     context = {
-        "operation": operation,
+        "operation_block": render_operation_block(stamp),
         "can_manage_operations": can_manage_ops(request.user),
     }
     return render(request, "ops/operation_overview.html", context)
 
 
+@auth_decorators.login_required
+def my_assignments(request):
+    """List the seats and crew entries of the current member."""
+
+    context = {"assignments": member_assignments(request.user)}
+    return render(request, "ops/my_assignments.html", context)
+
+
+@auth_decorators.login_required
+def my_assignments_json(request):
+    """Return the seats and crew entries of the current member as JSON."""
+
+    return JsonResponse(member_assignments(request.user))
+
+
 @auth_decorators.login_required
 @auth_decorators.user_passes_test(can_manage_ops)
 def operations_manage(request):
@@ -430,76 +199,110 @@ def operation_delete(request, pk):
 def _store_highlighted_ships(operation: Operation, formset: HighlightedShipFormSet) -> None:
     """Persist highlighted ships (and associated crew) for an operation."""
 
-    operation.highlighted_ship_links.all().delete()
+    entries: dict[int, dict[str, list[str]]] = {}
     for form in formset:
         if not hasattr(form, "cleaned_data"):
             continue
         if form.cleaned_data.get("DELETE"):
             continue
         ship = form.cleaned_data.get("ship")
-        if ship is None:
+        if ship is None or ship.pk in entries:
             continue
-        link = OperationHighlightedShip.objects.create(
-            operation=operation,
-            ship=ship,
-        )
-        crew_assignments = []
-        for role, _ in OperationHighlightedShip.ROLE_CHOICES:
-            for order, name in enumerate(
-                form.cleaned_data.get(f"{role}_entries", []),
-                start=1,
-            ):
-                crew_assignments.append(
-                    OperationHighlightedCrewAssignment(
-                        highlighted_ship=link,
-                        role=role,
-                        crew_name=name,
-                        order=order,
-                    )
-                )
-        if crew_assignments:
-            OperationHighlightedCrewAssignment.objects.bulk_create(crew_assignments)
+        entries[ship.pk] = {
+            role: form.cleaned_data.get(f"{role}_entries", [])
+            for role, _ in OperationHighlightedShip.ROLE_CHOICES
+        }
+    reconcile_highlighted_ships(operation, entries)
 
 
 @auth_decorators.login_required
 def ships_allocation(request):
-    """Display all ships with their role slots and assignments."""
+    """Display ships with their role slots and assignments.
 
-    can_edit = can_manage_ops(request.user)
-    user_queryset = None
-    if can_edit:
-        user_queryset = RoleSlotForm.default_user_queryset()
+    By default only the ship headers and their seat counters are rendered; the
+    slots of a ship are fetched from ``ship_slots`` when it is expanded.
+    ``?full=1`` renders every slot up front, ``?cat=`` limits the page to one
+    category and ``?hide_empty=1`` skips ships without role templates.
+    """
 
-    ships = [
-        prepare_ship_for_display(
-            ship,
-            can_edit=can_edit,
-            user_queryset=user_queryset,
-        )
-        for ship in ships_with_slots()
-    ]
+    can_edit = can_manage_ops(request.user)
+    user_choices = build_user_choices() if can_edit else None
+    lazy = request.GET.get("full") != "1"
+    hide_empty = request.GET.get("hide_empty") == "1"
+    category = request.GET.get("cat")
+    if category not in dict(Ship.CATEGORY_CHOICES):
+        category = None
 
+    ships = allocation_ships(category=category, hide_empty=hide_empty)
+    if not lazy:
+        ships = [
+            prepare_ship_for_display(
+                ship,
+                can_edit=can_edit,
+                user_choices=user_choices,
+            )
+            for ship in ships_with_slots().filter(pk__in=ships.values("pk")).order_by("name")
+        ]
+
+    category_counts = dict(
+        allocation_ships(hide_empty=hide_empty)
+        .values_list("category")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
     context = {
         "grouped_ships": group_ships_by_category(ships),
         "can_edit": can_edit,
+        "user_choices": user_choices,
+        "lazy": lazy,
+        "hide_empty": hide_empty,
+        "current_cat": category,
+        "categories": [
+            {"code": code, "label": label, "count": category_counts[code]}
+            for code, label in Ship.CATEGORY_CHOICES
+            if category_counts.get(code)
+        ],
     }
     return render(request, "ops/ships_allocation.html", context)
 
 
+@auth_decorators.login_required
+def ship_slots(request, pk):
+    """Render the role slots of one ship for the lazy allocation page."""
+
+    ship = get_object_or_404(ships_with_slots(), pk=pk)
+    can_edit = can_manage_ops(request.user)
+    # The page already carries the full user list; the pickers only need the
+    # users currently seated to render their selected option.
+    user_choices = None
+    if can_edit:
+        user_choices = SharedUserChoices(
+            slot.user for slot in ship.role_slots.all() if slot.user_id
+        )
+    ship = prepare_ship_for_display(ship, can_edit=can_edit, user_choices=user_choices)
+
+    next_url = request.GET.get("next", "")
+    context = {
+        "ship": ship,
+        "can_edit": can_edit,
+        "next_url": next_url if _is_safe_next(request, next_url) else reverse("ships_allocation"),
+    }
+    return render(request, "ops/includes/ship_slots.html", context)
+
+
 @auth_decorators.login_required
 def ship_detail(request, pk):
     """Display detailed information for a ship and its role slots."""
 
     ship = get_object_or_404(ships_with_slots(), pk=pk)
     can_edit = can_manage_ops(request.user)
-    user_queryset = RoleSlotForm.default_user_queryset() if can_edit else None
+    user_choices = build_user_choices() if can_edit else None
 
     ship = prepare_ship_for_display(
         ship,
         can_edit=can_edit,
-        user_queryset=user_queryset,
+        user_choices=user_choices,
     )
-    _classify_ship(ship)
 
     role_form = None
     if can_edit:
@@ -520,6 +323,7 @@ def ship_detail(request, pk):
         "ship": ship,
         "can_edit": can_edit,
         "role_form": role_form,
+        "user_choices": user_choices,
     }
     return render(request, "ops/ship_detail.html", context)
 
@@ -527,7 +331,16 @@ def ship_detail(request, pk):
 @auth_decorators.login_required
 @auth_decorators.user_passes_test(can_manage_ops)
 def role_slot_update(request, pk):
-    """Update a role slot assignment and redirect appropriately."""
+    """Update a role slot assignment.
+
+    JSON requests get the updated slot back; form posts redirect as before.
+    """
+
+    if request.method == "POST" and request.content_type == "application/json":
+        payload = _json_body(request)
+        if not isinstance(payload, dict):
+            return JsonResponse({"errors": {"body": "JSON invalide."}}, status=400)
+        return _slot_update_response(request, [{**payload, "id": pk}], payload.get("next"))
 
     slot = get_object_or_404(RoleSlot, pk=pk)
     if request.method != "POST":
@@ -535,19 +348,101 @@ def role_slot_update(request, pk):
 
     form = RoleSlotForm(request.POST, instance=slot)
     if form.is_valid():
-        form.save()
-        messages.success(request, "La place a été mise à jour.")
+        user = form.cleaned_data["user"]
+        version = form.cleaned_data["version"]
+        try:
+            update_role_slots(
+                [
+                    {
+                        "id": slot.pk,
+                        "user": user.pk if user else None,
+                        "status": form.cleaned_data["status"],
+                        "version": slot.version if version is None else version,
+                    }
+                ],
+                user_queryset=form.fields["user"].queryset,
+            )
+        except SlotConflict:
+            messages.error(request, SLOT_CONFLICT_MESSAGE)
+        else:
+            messages.success(request, "La place a été mise à jour.")
     else:
         messages.error(request, "Impossible de mettre à jour la place.")
 
     next_url = request.POST.get("next", "")
-    if next_url and url_has_allowed_host_and_scheme(
+    if _is_safe_next(request, next_url):
+        return redirect(next_url)
+    return redirect("ship_detail", pk=slot.ship_id)
+
+
+@auth_decorators.login_required
+@auth_decorators.user_passes_test(can_manage_ops)
+def role_slots_update(request):
+    """Apply a JSON batch of slot assignments all-or-nothing.
+
+    ``slots`` is either a list of changes carrying their ``id`` or a mapping
+    of slot id to ``{"user", "status", "version"}``.
+    """
+
+    if request.method != "POST":
+        return JsonResponse({"errors": {"method": "POST attendu."}}, status=405)
+    payload = _json_body(request)
+    changes = payload.get("slots") if isinstance(payload, dict) else None
+    if isinstance(changes, dict) and all(isinstance(change, dict) for change in changes.values()):
+        changes = [{**change, "id": slot_id} for slot_id, change in changes.items()]
+    if not isinstance(changes, list):
+        return JsonResponse({"errors": {"body": "JSON invalide."}}, status=400)
+    return _slot_update_response(request, changes, payload.get("next"))
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def _is_safe_next(request, next_url: str | None) -> bool:
+    return bool(next_url) and url_has_allowed_host_and_scheme(
         next_url,
         allowed_hosts={request.get_host()},
         require_https=request.is_secure(),
-    ):
-        return redirect(next_url)
-    return redirect("ship_detail", pk=slot.ship_id)
+    )
+
+
+def _slot_update_response(request, changes, next_url) -> JsonResponse:
+    next_url = next_url if _is_safe_next(request, next_url) else ""
+    try:
+        slots = update_role_slots(changes)
+    except SlotUpdateError as exc:
+        return JsonResponse({"errors": exc.errors}, status=400)
+    except SlotConflict as exc:
+        current = RoleSlot.objects.select_related("user").filter(pk__in=exc.slot_ids)
+        return JsonResponse(
+            {
+                "detail": SLOT_CONFLICT_MESSAGE,
+                "conflicts": serialize_slots(current, request=request, next_url=next_url),
+            },
+            status=409,
+        )
+    return JsonResponse({"slots": serialize_slots(slots, request=request, next_url=next_url)})
+
+
+@auth_decorators.login_required
+async def live_events(request):
+    """Stream slot and crew changes as server-sent events.
+
+    Streams need the ASGI application; under WSGI a 204 tells ``EventSource``
+    not to reconnect and pages simply keep their reload behaviour.
+    """
+
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    return StreamingHttpResponse(
+        event_stream(),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @auth_decorators.login_required
@@ -565,12 +460,53 @@ def ships_list(request):
     elif SUBCATEGORY_LOOKUP[subcategory]["category"] != category:
         subcategory = None
 
-    ships_queryset = Ship.objects.all().order_by("name")
-    ships = []
-    for ship in ships_queryset:
-        ship_cat, ship_subcat = _classify_ship(ship)
+    min_scu = _parse_scu_bound(request.GET.get("min_scu"))
+    max_scu = _parse_scu_bound(request.GET.get("max_scu"))
+    sort = "cargo" if request.GET.get("sort") == "cargo" else "name"
+
+    ships = Ship.objects.all()
+    if category:
+        ships = ships.filter(filter_category=category)
+    if subcategory:
+        ships = ships.filter(filter_subcategory=subcategory)
+    if min_scu is not None:
+        ships = ships.filter(cargo_scu__gte=min_scu)
+    if max_scu is not None:
+        ships = ships.filter(cargo_scu__lte=max_scu)
+    if sort == "cargo":
+        ships = ships.order_by(F("cargo_scu").desc(nulls_last=True), "name")
+    else:
+        ships = ships.order_by("name")
+
+    current_category = None
+    if category:
+        current_category = {
+            "slug": category,
+            "label": FILTER_TREE[category]["label"],
+            "subcategories": [
+                {"slug": sub_slug, "label": sub_data["label"]}
+                for sub_slug, sub_data in FILTER_TREE[category]["subcategories"].items()
+            ],
+        }
 
-        if category and ship_cat != category:
-            continue
-        if subcategory and ship_subcat != subcategory:
-            continue
\ No newline at end of file
+    context = {
+        "ships": ships,
+        "categories": [
+            {"slug": cat_slug, "label": cat_data["label"]}
+            for cat_slug, cat_data in FILTER_TREE.items()
+        ],
+        "current_cat": category,
+        "current_category": current_category,
+        "current_subcat": subcategory,
+        "min_scu": min_scu,
+        "max_scu": max_scu,
+        "sort": sort,
+    }
+    return render(request, "ops/ships_list.html", context)
+
+
+def _parse_scu_bound(value: str | None) -> int | None:
+    """Return a non-negative SCU bound from a query parameter, if valid."""
+
+    value = (value or "").strip()
+    return int(value) if value.isdecimal() else None